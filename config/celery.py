@@ -9,3 +9,6 @@ app = Celery('config')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
 app.autodiscover_tasks()
+
+# Counts opened and reused database connections of the worker processes
+import config.db  # noqa: E402, F401
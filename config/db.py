@@ -0,0 +1,104 @@
+import logging
+import os
+import threading
+import time
+
+from celery.signals import task_prerun, worker_process_init, worker_process_shutdown
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_stats = {
+    'opened': 0,
+    'reused': 0,
+}
+
+
+def get_connection_stats():
+    """
+    Returns the database connection counters of the current process.
+
+    Requests and Celery tasks starting with an open connection that is still usable and within `CONN_MAX_AGE`
+    count as reused, every new connection to the database counts as opened.
+
+    Returns:
+        dict: The process id, the numbers of opened and reused connections and the ratio of reuse.
+    """
+
+    with _lock:
+        stats = dict(_stats)
+
+    uses = stats['opened'] + stats['reused']
+    stats['reuse_ratio'] = round(stats['reused'] / uses, 4) if uses else None
+    stats['pid'] = os.getpid()
+    return stats
+
+
+def count_reused_connections():
+    """
+    Counts the open connections within `CONN_MAX_AGE` that the starting request or task is going to reuse.
+
+    Obsolete connections are closed by Django and Celery on the same signals, so they are not counted.
+    """
+
+    now = time.monotonic()
+    reused = sum(
+        conn.connection is not None and (conn.close_at is None or now < conn.close_at)
+        for conn in connections.all(initialized_only=True)
+    )
+    if reused:
+        with _lock:
+            _stats['reused'] += reused
+
+
+@receiver(connection_created)
+def count_opened_connection(sender, connection, **kwargs):
+    """
+    Counts a new connection to the database.
+    """
+
+    with _lock:
+        _stats['opened'] += 1
+
+
+@receiver(request_started)
+def count_request_connections(sender, **kwargs):
+    """
+    Counts the connections reused by a request.
+    """
+
+    count_reused_connections()
+
+
+@task_prerun.connect
+def count_task_connections(sender=None, **kwargs):
+    """
+    Counts the connections reused by a Celery task.
+    """
+
+    if not getattr(sender.request, 'is_eager', False):
+        count_reused_connections()
+
+
+@worker_process_init.connect
+def reset_worker_connection_stats(**kwargs):
+    """
+    Resets the counters inherited by a forked Celery worker process from the parent process.
+    """
+
+    with _lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+@worker_process_shutdown.connect
+def log_worker_connection_stats(**kwargs):
+    """
+    Logs the database connection counters of a Celery worker process when it exits.
+    """
+
+    logger.info('Database connections of worker process: %s', get_connection_stats())
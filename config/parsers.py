@@ -0,0 +1,52 @@
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class ORJSONParser(BaseParser):
+    """
+    Parser of JSON request content with orjson.
+
+    Attributes:
+        media_type (str): The media type of the parsed content.
+    """
+
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Parses the JSON request content.
+
+        Raises:
+            ParseError: If the content is not valid JSON.
+        """
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parser of MessagePack request content.
+
+    Attributes:
+        media_type (str): The media type of the parsed content.
+    """
+
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Parses the MessagePack request content.
+
+        Raises:
+            ParseError: If the content is not valid MessagePack.
+        """
+
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
@@ -0,0 +1,99 @@
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+)
+
+
+def encode_default(obj):
+    """
+    Converts objects unknown to the fast encoders the same way the default DRF JSON encoder does.
+
+    Dates and times are passed here on purpose, so that they are formatted exactly as by `JSONRenderer`
+    (ISO 8601, datetimes in milliseconds and UTC as 'Z'), and decimals are converted to floats.
+
+    Args:
+        obj: The object to convert.
+
+    Returns:
+        The JSON compatible representation of the object.
+    """
+
+    return JSONEncoder().default(obj)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Renderer producing the same JSON as `rest_framework.renderers.JSONRenderer` with orjson.
+
+    Attributes:
+        media_type (str): The media type of the rendered content.
+        format (str): The format suffix of the renderer.
+        charset (None): JSON is always UTF-8.
+    """
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders the data as compact UTF-8 JSON, indented when requested with the `indent` media type parameter.
+
+        Args:
+            data: The data to render.
+            accepted_media_type (str): The accepted media type with its parameters.
+            renderer_context (dict): The context of the renderer.
+
+        Returns:
+            bytes: The rendered content.
+        """
+
+        if data is None:
+            return b''
+
+        options = ORJSON_OPTIONS
+        if accepted_media_type and 'indent=' in accepted_media_type:
+            options |= orjson.OPT_INDENT_2
+
+        content = orjson.dumps(data, default=encode_default, option=options)
+        # Escaped like by JSONRenderer, as these characters are not valid in JavaScript strings
+        return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renderer producing MessagePack, with values converted the same way as in JSON responses.
+
+    Attributes:
+        media_type (str): The media type of the rendered content.
+        format (str): The format suffix of the renderer.
+        charset (None): MessagePack is binary.
+        render_style (str): Binary content is not shown by the browsable API.
+    """
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders the data as MessagePack.
+
+        Args:
+            data: The data to render.
+            accepted_media_type (str): The accepted media type with its parameters.
+            renderer_context (dict): The context of the renderer.
+
+        Returns:
+            bytes: The rendered content.
+        """
+
+        if data is None:
+            return b''
+
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
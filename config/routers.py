@@ -0,0 +1,119 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+from config import settings
+
+PRIMARY_PIN_KEY = 'db:primary_pin:{}'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def get_replica_alias():
+    """
+    Returns the alias of a randomly chosen replica database.
+    """
+
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+def pin_to_primary(user):
+    """
+    Sends the reads of the user to the primary database for `REPLICA_PIN_TIMEOUT` seconds, so the user reads
+    their own writes while the replicas catch up.
+
+    Args:
+        user (User): The user who has written to the database.
+    """
+
+    if settings.DATABASE_REPLICAS and user.is_authenticated:
+        cache.set(PRIMARY_PIN_KEY.format(user.pk), True, timeout=settings.REPLICA_PIN_TIMEOUT)
+
+
+def is_pinned_to_primary(user):
+    """
+    Returns whether the reads of the user must go to the primary database.
+
+    Args:
+        user (User | None): The user, None for reads not made on behalf of a user.
+
+    Returns:
+        bool: True if the user has recently written to the database.
+    """
+
+    return bool(user is not None and user.is_authenticated and cache.get(PRIMARY_PIN_KEY.format(user.pk)))
+
+
+@contextmanager
+def read_from_replica(user=None, primary=False):
+    """
+    Context manager sending the reads made within it to the replicas, if there are any.
+
+    Reads stay on the primary database for a user who has recently written to it. Only use it for reads that
+    tolerate the replication lag and are not followed by writes based on them.
+
+    Args:
+        user (User | None): The user the reads are made for.
+        primary (bool): Keeps the reads on the primary database, e.g. when the data has just changed.
+    """
+
+    use_replica = bool(settings.DATABASE_REPLICAS) and not primary and not is_pinned_to_primary(user)
+    token = _replica_reads.set(use_replica)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Database router sending the reads within `read_from_replica` to the replicas and everything else to the
+    primary database.
+
+    Methods:
+        db_for_read(model, **hints): Returns a replica within `read_from_replica`, the primary database otherwise.
+        db_for_write(model, **hints): Returns the primary database.
+        allow_relation(obj1, obj2, **hints): Allows relations between objects of the primary and the replicas.
+        allow_migrate(db, app_label, model_name=None, **hints): Allows migrations on the primary database only.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            return get_replica_alias()
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class PrimaryPinMiddleware:
+    """
+    Middleware pinning the reads of a user to the primary database after every successful unsafe request.
+
+    DRF views authenticate the user after the middlewares have run, so the user is checked on the way out.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            user = getattr(request, 'user', None)
+            if user is not None:
+                pin_to_primary(user)
+
+        return response
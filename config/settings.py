@@ -40,6 +40,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -64,6 +65,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'config.routers.PrimaryPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -109,10 +111,43 @@ DATABASES = {
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
         'HOST': os.getenv('DB_DOCKER'),
-        'PASSWORD': os.getenv('DB_PASSWORD')
+        'PASSWORD': os.getenv('DB_PASSWORD'),
+        # Connections are kept open between requests and Celery tasks for that many seconds, 0 closes them
+        # after every request and task. Kept connections are checked before they are reused.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE') or 60),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Connect through PgBouncer in transaction pooling mode, sharing a few server connections between all web and
+# Celery worker processes. Server-side cursors do not survive between the transactions of a pooled connection.
+DB_POOL = os.getenv('DB_POOL') == 'True'
+
+if DB_POOL:
+    DATABASES['default'].update({
+        'HOST': os.getenv('DB_POOL_HOST') or 'pgbouncer',
+        'PORT': os.getenv('DB_POOL_PORT') or '5432',
+        'DISABLE_SERVER_SIDE_CURSORS': True,
+    })
+
+# Read-only replicas of the default database, given as comma separated hosts. List views and the notification
+# sweep read from them, see config/routers.py. In tests the replicas mirror the default database.
+DATABASE_REPLICAS = []
+
+for number, host in enumerate(filter(None, (os.getenv('DB_REPLICA_HOSTS') or '').split(',')), start=1):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'PORT': os.getenv('DB_REPLICA_PORT') or '',
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['config.routers.ReplicaRouter']
+
+# How long the reads of a user go to the default database after the user's writes, in seconds
+REPLICA_PIN_TIMEOUT = 5
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -160,10 +195,44 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.renderers.ORJSONRenderer',
+        'config.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'config.parsers.ORJSONParser',
+        'config.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'TEST_REQUEST_RENDERER_CLASSES': [
+        'rest_framework.renderers.MultiPartRenderer',
+        'rest_framework.renderers.JSONRenderer',
+        'config.renderers.MessagePackRenderer',
     ],
 }
 
+# The maximum number of links in a chain of related habits
+RELATED_HABIT_MAX_DEPTH = 3
+
+# The maximum number of objects in one request to the bulk API views
+BULK_MAX_ITEMS = 100
+
+# The number of rows fetched from the database at once by the streaming export
+EXPORT_CHUNK_SIZE = 2000
+
+# The default and the maximum number of days of the projected habit calendar
+CALENDAR_DEFAULT_DAYS = 30
+CALENDAR_MAX_DAYS = 366
+
+# The number of rows validated and inserted at once by the bulk import of habits
+IMPORT_CHUNK_SIZE = 1000
+# The maximum number of rejected rows described in the report of an import
+IMPORT_MAX_REPORTED_ERRORS = 100
+
 # Token Expiration Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=10000),
@@ -181,6 +250,37 @@ CSRF_TRUSTED_ORIGINS = [
 
 CORS_ALLOW_ALL_ORIGINS = False
 
+# Cache settings. Redis is used when its location is given, e.g. redis://redis:6379/1 for docker,
+# otherwise the local-memory cache of the process is used
+CACHE_LOCATION = os.getenv('CACHE_LOCATION')
+
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_LOCATION,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# How long a page of the public habit feed is cached, in seconds
+PUBLIC_FEED_CACHE_TIMEOUT = 60 * 5
+
+# How long the habit analytics of the admins are cached, in seconds
+HABIT_ANALYTICS_CACHE_TIMEOUT = 60 * 5
+
+# How long resolved users of JWT tokens are kept in the shared cache, in seconds
+AUTH_USER_CACHE_TIMEOUT = 60 * 5
+
+# How long and how many resolved users are kept in the in-process cache of every worker
+AUTH_USER_LOCAL_CACHE_TIMEOUT = 10
+AUTH_USER_LOCAL_CACHE_SIZE = 1024
+
 # Settings for Celery localhost
 # CELERY_BROKER_URL = 'redis://localhost:6379/0'
 # CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
@@ -189,12 +289,47 @@ CORS_ALLOW_ALL_ORIGINS = False
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL_DOCKER')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND_DOCKER')
 
+# The maximum number of due habits processed by one notification subtask
+NOTIFICATION_SHARD_SIZE = 500
+
+# How long before the execution time of a habit the reminder is sent
+NOTIFICATION_LEAD_TIME = timedelta(hours=1)
+
+# Settings for sending the reminders of the notification outbox
+NOTIFICATION_OUTBOX_BATCH_SIZE = 100
+NOTIFICATION_MAX_ATTEMPTS = 5
+# The delay before the first retry of a failed reminder, doubled after every attempt
+NOTIFICATION_RETRY_DELAY = timedelta(minutes=1)
+# How long the reminders claimed by a sender task stay reserved for it, they are claimed again after a crash
+NOTIFICATION_CLAIM_TIMEOUT = timedelta(minutes=5)
+# How long the delivered reminders are kept in the outbox
+NOTIFICATION_OUTBOX_RETENTION = timedelta(days=7)
+
 CELERY_BEAT_SCHEDULE = {
     'send-notification': {
         'task': 'habits.tasks.task_send_notification',
-        'schedule': timedelta(hours=1),
+        'schedule': timedelta(minutes=1),
+    },
+    'send-outbox-notifications': {
+        'task': 'habits.tasks.task_send_outbox_notifications',
+        'schedule': timedelta(minutes=1),
+    },
+    'prune-outbox-notifications': {
+        'task': 'habits.tasks.task_prune_outbox_notifications',
+        'schedule': timedelta(days=1),
     },
 }
 
 # Token for API requests to telegram bot
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
+
+# Settings for delivering notifications through the Telegram API
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL') or 'https://api.telegram.org'
+TELEGRAM_SEND_WORKERS = 8
+TELEGRAM_REQUEST_TIMEOUT = 10
+TELEGRAM_MAX_RETRIES = 3
+# Telegram allows about 30 messages per second in total and 1 message per second to the same chat
+TELEGRAM_GLOBAL_RATE_LIMIT = 30
+TELEGRAM_CHAT_RATE_LIMIT = 1
+# Send the notifications of a shard with AsyncTelegramDeliveryEngine instead of a pool of threads
+TELEGRAM_ASYNC_DELIVERY = os.getenv('TELEGRAM_ASYNC_DELIVERY') == 'True'
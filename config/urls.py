@@ -20,6 +20,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from config.views import DatabaseConnectionStatsAPIView
+
 schema_view = get_schema_view(
     openapi.Info(
         title="App Habits API Documentation",
@@ -38,6 +40,7 @@ urlpatterns = [
     path('', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 
     path('admin/', admin.site.urls),
+    path('db/connections/', DatabaseConnectionStatsAPIView.as_view(), name='db-connections'),
     path('users/', include('users.urls', namespace='users')),
     path('', include('habits.urls', namespace='habits')),
 ]
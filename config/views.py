@@ -0,0 +1,26 @@
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from config.db import get_connection_stats
+from habits.permissions import IsSuperUser
+
+
+class DatabaseConnectionStatsAPIView(APIView):
+    """
+    API view for retrieving the database connection counters of the serving process.
+
+    The counters are kept per process, so with several worker processes every response shows the process that
+    served it, identified by `pid`.
+
+    Attributes:
+        permission_classes (list): The view is available to superusers only.
+    """
+
+    permission_classes = [IsSuperUser]
+
+    def get(self, request):
+        """
+        Returns the numbers of opened and reused connections of the serving process.
+        """
+
+        return Response(get_connection_stats())
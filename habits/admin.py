@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from habits.models import Habit, Award
+from habits.models import Award, Habit, HabitCompletion, HabitStats, NotificationOutbox
 
 
 @admin.register(Habit)
@@ -14,7 +14,7 @@ class HabitAdmin(admin.ModelAdmin):
 
     list_display = (
         'pk', 'user', 'award', 'place', 'execution_time', 'action', 'is_pleasant', 'related_habit', 'frequency',
-        'time_to_complete', 'is_published',)
+        'time_to_complete', 'is_published', 'next_fire_at',)
 
 
 @admin.register(Award)
@@ -27,3 +27,41 @@ class AwardAdmin(admin.ModelAdmin):
     """
 
     list_display = ('pk', 'user', 'reward',)
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the NotificationOutbox model.
+
+    Attributes:
+        list_display (tuple): The tuple of fields to display in the admin list view.
+        list_filter (tuple): The tuple of fields to filter the admin list view by.
+    """
+
+    list_display = ('pk', 'habit', 'fire_at', 'chat_id', 'status', 'attempts', 'next_attempt_at', 'sent_at',)
+    list_filter = ('status',)
+
+
+@admin.register(HabitCompletion)
+class HabitCompletionAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the HabitCompletion model.
+
+    Attributes:
+        list_display (tuple): The tuple of fields to display in the admin list view.
+    """
+
+    list_display = ('pk', 'habit', 'completed_on', 'created_at',)
+
+
+@admin.register(HabitStats)
+class HabitStatsAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the HabitStats model.
+
+    Attributes:
+        list_display (tuple): The tuple of fields to display in the admin list view.
+    """
+
+    list_display = ('habit', 'total_completions', 'current_streak', 'longest_streak', 'last_completed_on',)
@@ -0,0 +1,190 @@
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Q
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay
+from django.utils import timezone
+
+from config import settings
+from config.routers import read_from_replica
+from habits.models import Habit, HabitCompletion, HabitStats
+
+HABIT_ANALYTICS_CACHE_KEY = 'habits:analytics'
+
+# The width of the buckets of the time to complete histogram, in seconds
+TIME_TO_COMPLETE_BUCKET = 10
+
+
+def to_arrays(rows):
+    """
+    Returns the columns of the (value, count) rows of a grouped query as two integer arrays.
+
+    Args:
+        rows (list[tuple[int, int]]): The distinct values and their numbers of occurrences.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The values and the counts.
+    """
+
+    table = np.array(rows, dtype=np.int64).reshape(-1, 2)
+    return table[:, 0], table[:, 1]
+
+
+def get_weighted_percentiles(values, counts, percentiles):
+    """
+    Returns the percentiles of a distribution given as the distinct values and their numbers of occurrences.
+
+    Args:
+        values (np.ndarray): The distinct values.
+        counts (np.ndarray): The number of occurrences of every value.
+        percentiles (Sequence[float]): The percentiles to return, from 0 to 100.
+
+    Returns:
+        list: The value of every percentile, None for every percentile of an empty distribution.
+    """
+
+    if not counts.sum():
+        return [None] * len(percentiles)
+
+    order = np.argsort(values)
+    cumulative = np.cumsum(counts[order])
+    positions = np.searchsorted(cumulative, np.asarray(percentiles) / 100 * cumulative[-1], side='left')
+    return values[order][np.minimum(positions, len(values) - 1)].tolist()
+
+
+def describe_distribution(rows):
+    """
+    Returns the histogram, the mean and the percentiles of a distribution counted by the database.
+
+    Args:
+        rows (list[tuple[int, int]]): The distinct values and their numbers of occurrences.
+
+    Returns:
+        dict: The `histogram` of the values in ascending order, their `mean`, `median` and `p90`.
+    """
+
+    values, counts = to_arrays(rows)
+    # The grouped rows come in no particular order
+    order = np.argsort(values)
+    values, counts = values[order], counts[order]
+    total = counts.sum()
+    median, p90 = get_weighted_percentiles(values, counts, (50, 90))
+
+    return {
+        'histogram': [{'value': value, 'count': count} for value, count in zip(values.tolist(), counts.tolist())],
+        'mean': round(float(values @ counts / total), 2) if total else None,
+        'median': median,
+        'p90': p90,
+    }
+
+
+def query_habit_analytics():
+    """
+    Counts the habits and the completions by the database with a fixed number of aggregate queries.
+
+    Every query returns a single row or one row per distinct value of a bounded column, so neither the number of
+    queries nor the size of the results depends on the number of habits.
+
+    Returns:
+        dict: The totals and the rows of the grouped counts.
+    """
+
+    habits = Habit.objects.order_by()
+    return {
+        'totals': habits.aggregate(
+            total=Count('pk'),
+            pleasant=Count('pk', filter=Q(is_pleasant=True)),
+            with_award=Count('pk', filter=Q(award__isnull=False)),
+            with_related_habit=Count('pk', filter=Q(related_habit__isnull=False)),
+            published=Count('pk', filter=Q(is_published=True)),
+        ),
+        'hours': list(
+            habits.annotate(hour=ExtractHour('execution_time')).values_list('hour').annotate(count=Count('pk'))
+        ),
+        'frequency': list(habits.values_list('frequency').annotate(count=Count('pk'))),
+        'time_to_complete': list(habits.values_list('time_to_complete').annotate(count=Count('pk'))),
+        'weekdays': list(
+            HabitCompletion.objects.order_by().annotate(weekday=ExtractIsoWeekDay('completed_on'))
+            .values_list('weekday').annotate(count=Count('pk'))
+        ),
+        'streaks': HabitStats.objects.aggregate(
+            habits_done=Count('pk', filter=Q(total_completions__gt=0)),
+            mean_longest_streak=Avg('longest_streak'),
+            max_longest_streak=Max('longest_streak'),
+        ),
+    }
+
+
+def build_habit_analytics(raw):
+    """
+    Builds the habit analytics from the counts of the database, with all arithmetic done by NumPy.
+
+    Args:
+        raw (dict): The counts returned by `query_habit_analytics`.
+
+    Returns:
+        dict: The analytics of the habits and the completions.
+    """
+
+    totals = raw['totals']
+    total = totals['total']
+
+    counted = np.array(
+        [totals['pleasant'], total - totals['pleasant'], totals['with_award'], totals['with_related_habit'],
+         totals['published']],
+        dtype=np.float64
+    )
+    shares = np.round(counted / total, 4) if total else np.zeros_like(counted)
+
+    hours = np.zeros(24, dtype=np.int64)
+    hour_indexes, hour_counts = to_arrays(raw['hours'])
+    hours[hour_indexes] = hour_counts
+
+    time_to_complete = describe_distribution(raw['time_to_complete'])
+    seconds, counts = to_arrays(raw['time_to_complete'])
+    buckets = np.bincount(seconds // TIME_TO_COMPLETE_BUCKET, weights=counts).astype(np.int64)
+    time_to_complete['histogram'] = [
+        {'from': index * TIME_TO_COMPLETE_BUCKET, 'to': (index + 1) * TIME_TO_COMPLETE_BUCKET, 'count': count}
+        for index, count in enumerate(buckets.tolist()) if count
+    ]
+
+    weekdays = np.zeros(7, dtype=np.int64)
+    weekday_indexes, weekday_counts = to_arrays(raw['weekdays'])
+    weekdays[weekday_indexes - 1] = weekday_counts
+
+    streaks = raw['streaks']
+    return {
+        'habits': total,
+        'shares': dict(zip(('pleasant', 'useful', 'with_award', 'with_related_habit', 'published'), shares.tolist())),
+        'execution_hours': {
+            'counts': hours.tolist(),
+            'peak_hour': int(hours.argmax()) if total else None,
+        },
+        'frequency': describe_distribution(raw['frequency']),
+        'time_to_complete': time_to_complete,
+        'completions': {
+            'total': int(weekdays.sum()),
+            'per_weekday': weekdays.tolist(),
+            'habits_done': streaks['habits_done'],
+            'mean_longest_streak': (
+                round(float(streaks['mean_longest_streak']), 2) if streaks['mean_longest_streak'] is not None else None
+            ),
+            'max_longest_streak': streaks['max_longest_streak'],
+        },
+        'generated_at': timezone.now().isoformat(),
+    }
+
+
+def get_habit_analytics():
+    """
+    Returns the habit analytics, computed on a replica and cached for `HABIT_ANALYTICS_CACHE_TIMEOUT` seconds.
+
+    Returns:
+        dict: The analytics of the habits and the completions.
+    """
+
+    analytics = cache.get(HABIT_ANALYTICS_CACHE_KEY)
+    if analytics is None:
+        with read_from_replica():
+            analytics = build_habit_analytics(query_habit_analytics())
+        cache.set(HABIT_ANALYTICS_CACHE_KEY, analytics, settings.HABIT_ANALYTICS_CACHE_TIMEOUT)
+    return analytics
@@ -0,0 +1,29 @@
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from habits.analytics import get_habit_analytics
+from habits.permissions import IsSuperUser
+
+
+class HabitAnalyticsAPIView(APIView):
+    """
+    API view for retrieving the analytics of all habits and completions, for superusers only.
+
+    The analytics are counted by the database in a fixed number of queries and cached for
+    `HABIT_ANALYTICS_CACHE_TIMEOUT` seconds.
+
+    Attributes:
+        permission_classes (list): The list of permission classes for the view.
+
+    Methods:
+        get(request): Returns the analytics.
+    """
+
+    permission_classes = [IsSuperUser]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the analytics.
+        """
+
+        return Response(get_habit_analytics())
@@ -0,0 +1,202 @@
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+
+from config.renderers import ORJSONRenderer
+from habits.models import Award, Habit
+from habits.paginators import HabitPaginator
+from habits.serializers.award import AwardSerializer
+from habits.serializers.habit import HabitReadSerializer
+from users.authentication import CachedJWTAuthentication
+
+
+class AsyncAPIView(View):
+    """
+    Base class of the async-native read-only API views.
+
+    DRF views are synchronous, so under ASGI every request to them occupies a thread. These views are coroutines
+    querying the database with the async ORM, so a single worker process serves many concurrent clients. Clients
+    are authenticated with JWT like by the DRF views and get the same JSON error responses.
+
+    Attributes:
+        authentication_class (type): The authentication class used for the requests.
+        renderer (ORJSONRenderer): The renderer of the responses.
+        model (type): The model whose objects are served, required in subclasses.
+        serializer_class (type): The serializer of the objects, required in subclasses. Its `setup_eager_loading`
+            prepares the queryset, which may return model instances or `.values()` rows.
+
+    Methods:
+        dispatch(request, *args, **kwargs): Authenticates the request and calls the handler of its method.
+        get_queryset(): Returns the objects visible to the user, prepared for serialization.
+        serialize(objects): Returns the representation of the objects.
+        render(data, status_code): Returns a JSON response with the data.
+    """
+
+    authentication_class = CachedJWTAuthentication
+    renderer = ORJSONRenderer()
+    model = None
+    serializer_class = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Authenticates the request and calls the handler of its method.
+
+        Returns:
+            HttpResponse: The response of the handler or 401 Unauthorized.
+        """
+
+        authenticator = self.authentication_class()
+        try:
+            user_auth = await sync_to_async(authenticator.authenticate)(request)
+        except exceptions.APIException as exc:
+            user_auth, detail = None, exc.detail
+        else:
+            detail = exceptions.NotAuthenticated.default_detail
+
+        if user_auth is None:
+            response = self.render({'detail': detail}, status.HTTP_401_UNAUTHORIZED)
+            response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+            return response
+
+        request.user, request.auth = user_auth
+        return await super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self):
+        """
+        Returns all objects to a superuser and the own objects to other users, prepared for serialization.
+        """
+
+        assert self.model is not None, (
+            f"'{self.__class__.__name__}' should include a `model` attribute."
+        )
+        assert self.serializer_class is not None, (
+            f"'{self.__class__.__name__}' should include a `serializer_class` attribute."
+        )
+
+        user = self.request.user
+        queryset = self.model.objects.all()
+        if not user.is_superuser:
+            queryset = queryset.filter(user=user)
+        return self.serializer_class.setup_eager_loading(queryset)
+
+    def serialize(self, objects):
+        """
+        Returns the representation of the objects.
+        """
+
+        return self.serializer_class(objects, many=True).data
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        """
+        Returns a JSON response with the data.
+        """
+
+        return HttpResponse(self.renderer.render(data), status=status_code, content_type=self.renderer.media_type)
+
+
+class AsyncListAPIView(AsyncAPIView):
+    """
+    Base class of the async list views with keyset pagination.
+
+    The objects are ordered by primary key and the next page starts after the last one of the current page,
+    given by the `after` query parameter, so every page is fetched with a single indexed query.
+
+    Methods:
+        get(request): Returns a page of the objects.
+    """
+
+    async def get(self, request):
+        """
+        Returns a page of the objects and the URL of the next page.
+
+        Returns:
+            HttpResponse: The `next` URL and the `results` of the page, 400 Bad Request for invalid parameters.
+        """
+
+        try:
+            after = int(request.GET.get('after', 0))
+            page_size = int(request.GET.get(HabitPaginator.page_size_query_param, HabitPaginator.page_size))
+        except ValueError:
+            return self.render({'detail': 'Invalid page.'}, status.HTTP_400_BAD_REQUEST)
+        page_size = min(max(page_size, 1), HabitPaginator.max_page_size)
+
+        objects = [obj async for obj in self.get_queryset().filter(pk__gt=after).order_by('pk')[:page_size + 1]]
+
+        results = self.serialize(objects[:page_size])
+
+        next_url = None
+        if len(objects) > page_size:
+            query = request.GET.copy()
+            query['after'] = results[-1]['pk']
+            next_url = request.build_absolute_uri(f'{request.path}?{urlencode(sorted(query.items()))}')
+
+        return self.render({'next': next_url, 'results': results})
+
+
+class AsyncDetailAPIView(AsyncAPIView):
+    """
+    Base class of the async detail views.
+
+    Methods:
+        get(request, pk): Returns an object.
+    """
+
+    async def get(self, request, pk):
+        """
+        Returns the object with the given primary key if it is visible to the user.
+
+        Returns:
+            HttpResponse: The representation of the object or 404 Not Found.
+        """
+
+        try:
+            obj = await self.get_queryset().aget(pk=pk)
+        except self.model.DoesNotExist:
+            return self.render({'detail': exceptions.NotFound.default_detail}, status.HTTP_404_NOT_FOUND)
+
+        return self.render(self.serialize([obj])[0])
+
+
+class AsyncHabitMixin:
+    """
+    Mixin of the async habit views serving `.values()` rows with `HabitReadSerializer`.
+    """
+
+    model = Habit
+    serializer_class = HabitReadSerializer
+
+
+class AsyncAwardMixin:
+    """
+    Mixin of the async award views serving awards with `AwardSerializer`.
+    """
+
+    model = Award
+    serializer_class = AwardSerializer
+
+
+class AsyncHabitListAPIView(AsyncHabitMixin, AsyncListAPIView):
+    """
+    Async API view for retrieving the habits of the user page by page.
+    """
+
+
+class AsyncHabitDetailAPIView(AsyncHabitMixin, AsyncDetailAPIView):
+    """
+    Async API view for retrieving a habit of the user.
+    """
+
+
+class AsyncAwardListAPIView(AsyncAwardMixin, AsyncListAPIView):
+    """
+    Async API view for retrieving the awards of the user page by page.
+    """
+
+
+class AsyncAwardDetailAPIView(AsyncAwardMixin, AsyncDetailAPIView):
+    """
+    Async API view for retrieving an award of the user.
+    """
@@ -2,22 +2,28 @@ from rest_framework import generics
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 
+from habits.api_views.mixins import BulkCreateMixin, BulkDestroyMixin, BulkUpdateMixin, ConditionalListMixin, \
+    KeysetPaginationMixin, ReplicaReadMixin
 from habits.models import Award
 from habits.permissions import IsOwner, IsSuperUser
 from habits.serializers.award import AwardSerializer
 
 
-class AwardListAPIView(generics.ListAPIView):
+class AwardListAPIView(ReplicaReadMixin, ConditionalListMixin, KeysetPaginationMixin, generics.ListAPIView):
     """
     API view for retrieving a list of awards.
 
+    The list is not paginated unless keyset pagination is requested with `?pagination=cursor`.
+    Responses carry ETag and Last-Modified headers, unchanged lists are answered with 304 Not Modified.
+
     Attributes:
         serializer_class (AwardSerializer): The serializer class for the Award model.
         queryset (QuerySet): The queryset containing all Award objects.
         permission_classes (list): The list of permission classes for the view.
 
     Methods:
-        get_queryset(): Filters awards based on user permissions.
+        get_queryset(): Returns the awards of the user prepared for the serializer.
+        get_owned_queryset(): Filters awards based on user permissions.
             For a superuser, returns all awards; for an authenticated user, returns only those belonging to the user.
     """
 
@@ -26,6 +32,13 @@ class AwardListAPIView(generics.ListAPIView):
     permission_classes = [IsAuthenticated | IsOwner | IsSuperUser]
 
     def get_queryset(self):
+        """
+        Returns the awards of the user prepared for the serializer.
+        """
+
+        return AwardSerializer.setup_eager_loading(self.get_owned_queryset()).order_by('pk')
+
+    def get_owned_queryset(self):
         """
         Filters awards based on user permissions.
         For a superuser, returns all awards; for an authenticated user, returns only those belonging to the user.
@@ -99,3 +112,69 @@ class AwardDestroyAPIView(generics.DestroyAPIView):
 
     queryset = Award.objects.all()
     permission_classes = [IsOwner | IsSuperUser]
+
+
+class AwardBulkCreateAPIView(BulkCreateMixin, generics.CreateAPIView):
+    """
+    API view for creating a list of awards in a single request.
+
+    Attributes:
+        serializer_class (AwardSerializer): The serializer class for the Award model.
+        permission_classes (list): The list of permission classes for the view.
+    """
+
+    serializer_class = AwardSerializer
+    permission_classes = [IsAuthenticated]
+
+
+class AwardBulkUpdateAPIView(BulkUpdateMixin, generics.GenericAPIView):
+    """
+    API view for partially updating a list of awards in a single request.
+
+    Attributes:
+        serializer_class (AwardSerializer): The serializer class for the Award model.
+        permission_classes (list): The list of permission classes for the view.
+
+    Methods:
+        get_queryset(): Returns the awards the user is allowed to update.
+    """
+
+    serializer_class = AwardSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        Returns the awards the user is allowed to update: all awards for a superuser, own awards otherwise.
+
+        The owners are joined to represent the updated awards.
+        """
+
+        user = self.request.user
+        queryset = Award.objects.select_related('user')
+        if user.is_superuser:
+            return queryset
+        return queryset.filter(user=user)
+
+
+class AwardBulkDestroyAPIView(BulkDestroyMixin, generics.GenericAPIView):
+    """
+    API view for deleting a list of awards in a single request.
+
+    Attributes:
+        permission_classes (list): The list of permission classes for the view.
+
+    Methods:
+        get_queryset(): Returns the awards the user is allowed to delete.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        Returns the awards the user is allowed to delete: all awards for a superuser, own awards otherwise.
+        """
+
+        user = self.request.user
+        if user.is_superuser:
+            return Award.objects.all()
+        return Award.objects.filter(user=user)
@@ -0,0 +1,83 @@
+import datetime
+import zoneinfo
+
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from config import settings
+from habits.calendar import CALENDAR_VALUES_FIELDS, HabitCalendar
+from habits.models import Habit
+
+
+class HabitCalendarAPIView(APIView):
+    """
+    API view for retrieving the upcoming occurrences of the habits of the user as JSON or as an iCalendar feed.
+
+    The range is given by the `start` and `end` query parameters, the next `CALENDAR_DEFAULT_DAYS` days by default
+    and at most `CALENDAR_MAX_DAYS` days. The habits are read with a single query and the feed is streamed.
+
+    Attributes:
+        permission_classes (list): The list of permission classes for the view.
+        formats (tuple): The supported formats.
+
+    Methods:
+        get(request): Returns the calendar in the format given by the `file_format` query parameter.
+        get_range(tz): Returns the first and the last day of the calendar.
+    """
+
+    permission_classes = [IsAuthenticated]
+    formats = ('json', 'ics')
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the calendar in the format given by the `file_format` query parameter, JSON by default.
+
+        Raises:
+            ValidationError: If the format is not supported.
+        """
+
+        file_format = request.query_params.get('file_format', 'json')
+        if file_format not in self.formats:
+            raise ValidationError({'file_format': [f'Supported formats: {", ".join(self.formats)}.']})
+
+        tz = zoneinfo.ZoneInfo(request.user.timezone)
+        start, end = self.get_range(tz)
+        habits = list(Habit.objects.filter(user=request.user).order_by('pk').values(*CALENDAR_VALUES_FIELDS))
+        calendar = HabitCalendar(habits, tz, start, end)
+
+        if file_format == 'json':
+            return Response(calendar.as_dict())
+
+        response = StreamingHttpResponse(calendar.iter_ics(), content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="habits.ics"'
+        return response
+
+    def get_range(self, tz):
+        """
+        Returns the first and the last day of the calendar.
+
+        Raises:
+            ValidationError: If a day is invalid or the range is empty or too long.
+        """
+
+        params = self.request.query_params
+        days = {}
+        for name in ('start', 'end'):
+            try:
+                days[name] = parse_date(params[name]) if name in params else None
+            except ValueError:
+                days[name] = None
+            if name in params and days[name] is None:
+                raise ValidationError({name: ['Enter a valid date in the YYYY-MM-DD format.']})
+
+        start = days['start'] or datetime.datetime.now(tz=tz).date()
+        end = days['end'] or start + datetime.timedelta(days=settings.CALENDAR_DEFAULT_DAYS - 1)
+        if end < start:
+            raise ValidationError({'end': ['The end of the range is earlier than its start.']})
+        if (end - start).days >= settings.CALENDAR_MAX_DAYS:
+            raise ValidationError({'end': [f'The range is longer than {settings.CALENDAR_MAX_DAYS} days.']})
+        return start, end
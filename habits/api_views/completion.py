@@ -0,0 +1,127 @@
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from habits.api_views.mixins import get_bulk_items
+from habits.completions import record_completions
+from habits.models import Habit, HabitStats
+from habits.permissions import IsOwner, IsSuperUser
+from habits.serializers.completion import HabitCompletionSerializer, HabitStatsSerializer
+
+
+class HabitCompleteAPIView(generics.GenericAPIView):
+    """
+    API view for marking a habit as done.
+
+    Attributes:
+        serializer_class (HabitCompletionSerializer): The serializer class for the completion.
+        queryset (QuerySet): The queryset containing all Habit objects with their users.
+        permission_classes (list): The list of permission classes for the view.
+
+    Methods:
+        post(request, pk): Records the completion and returns the updated stats of the habit.
+    """
+
+    serializer_class = HabitCompletionSerializer
+    queryset = Habit.objects.select_related('user')
+    permission_classes = [IsOwner | IsSuperUser]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Records that the habit was done on the `completed_on` day, today by default.
+
+        Returns:
+            Response: The updated stats of the habit with status 201.
+        """
+
+        habit = self.get_object()
+        data = {'habit': habit.pk}
+        if 'completed_on' in request.data:
+            data['completed_on'] = request.data['completed_on']
+
+        serializer = self.get_serializer(
+            data=data, context={**self.get_serializer_context(), 'habits': {habit.pk: habit}}
+        )
+        serializer.is_valid(raise_exception=True)
+
+        stats = record_completions([(habit, serializer.validated_data['completed_on'])])
+        return Response(HabitStatsSerializer(stats[0]).data, status=status.HTTP_201_CREATED)
+
+
+class HabitBulkCompleteAPIView(generics.GenericAPIView):
+    """
+    API view for marking a list of habits as done in a single request.
+
+    Attributes:
+        serializer_class (HabitCompletionSerializer): The serializer class for the completions.
+        permission_classes (list): The list of permission classes for the view.
+
+    Methods:
+        get_queryset(): Returns the habits the user is allowed to mark.
+        post(request): Records the completions and returns the updated stats of the habits.
+    """
+
+    serializer_class = HabitCompletionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        Returns the habits the user is allowed to mark: all habits for a superuser, own habits otherwise.
+        """
+
+        user = self.request.user
+        if user.is_superuser:
+            return Habit.objects.select_related('user')
+        return Habit.objects.select_related('user').filter(user=user)
+
+    def post(self, request, *args, **kwargs):
+        """
+        Records all completions of the request in a single transaction, if all of them are valid.
+
+        Returns:
+            Response: The updated stats of the habits with status 201, or the errors of each item with status 400.
+        """
+
+        items = get_bulk_items(request.data)
+        habits = self.get_queryset().in_bulk(
+            [item['habit'] for item in items if isinstance(item, dict) and isinstance(item.get('habit'), int)]
+        )
+
+        serializer = self.get_serializer(
+            data=items, many=True, context={**self.get_serializer_context(), 'habits': habits}
+        )
+        serializer.is_valid(raise_exception=True)
+
+        stats = record_completions([(item['habit'], item['completed_on']) for item in serializer.validated_data])
+        return Response(HabitStatsSerializer(stats, many=True).data, status=status.HTTP_201_CREATED)
+
+
+class HabitStatsAPIView(generics.RetrieveAPIView):
+    """
+    API view for retrieving the stats of a habit.
+
+    The aggregates are kept up to date by every completion, so the stats are read with a single query.
+
+    Attributes:
+        serializer_class (HabitStatsSerializer): The serializer class for the stats.
+        queryset (QuerySet): The queryset containing all Habit objects with their users and stats.
+        permission_classes (list): The list of permission classes for the view.
+
+    Methods:
+        get_object(): Returns the stats of the habit, empty ones if it has never been done.
+    """
+
+    serializer_class = HabitStatsSerializer
+    queryset = Habit.objects.select_related('user', 'stats')
+    permission_classes = [IsOwner | IsSuperUser]
+
+    def get_object(self):
+        """
+        Returns the stats of the habit, empty ones if it has never been done.
+        """
+
+        habit = super().get_object()
+        try:
+            return habit.stats
+        except HabitStats.DoesNotExist:
+            return HabitStats(habit=habit)
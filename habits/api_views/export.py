@@ -0,0 +1,94 @@
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from habits.exporters import AWARD_EXPORT_FIELDS, HABIT_EXPORT_FIELDS, export
+from habits.models import Award, Habit
+
+
+class ExportAPIView(APIView):
+    """
+    Base API view streaming the objects of the user as JSON Lines or CSV.
+
+    The objects are read with a server-side cursor in chunks of `EXPORT_CHUNK_SIZE` rows and written to the
+    response as they are read, so the memory used does not depend on the number of objects.
+
+    Attributes:
+        permission_classes (list): The list of permission classes for the view.
+        model (Model): The exported model, required in subclasses.
+        export_fields (dict): The exported names of the fields mapped to the lookups of their columns, required in
+            subclasses.
+        file_name (str): The name of the exported file without extension.
+        content_types (dict): The content types of the supported formats.
+
+    Methods:
+        get(request): Streams the export in the format given by the `file_format` query parameter.
+        get_queryset(): Returns all objects for a superuser and only the user's objects otherwise.
+    """
+
+    permission_classes = [IsAuthenticated]
+    model = None
+    export_fields = None
+    file_name = None
+    content_types = {
+        'jsonl': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+
+    def get(self, request, *args, **kwargs):
+        """
+        Streams the export in the format given by the `file_format` query parameter, JSON Lines by default.
+
+        Raises:
+            ValidationError: If the format is not supported.
+        """
+
+        file_format = request.query_params.get('file_format', 'jsonl')
+        if file_format not in self.content_types:
+            raise ValidationError({'file_format': [f'Supported formats: {", ".join(self.content_types)}.']})
+
+        assert self.export_fields is not None, (
+            f"'{self.__class__.__name__}' should include an `export_fields` attribute."
+        )
+
+        response = StreamingHttpResponse(
+            export(self.get_queryset(), self.export_fields, file_format),
+            content_type=f'{self.content_types[file_format]}; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{self.file_name}.{file_format}"'
+        return response
+
+    def get_queryset(self):
+        """
+        Returns all objects for a superuser and only the user's objects otherwise.
+        """
+
+        assert self.model is not None, (
+            f"'{self.__class__.__name__}' should include a `model` attribute."
+        )
+
+        user = self.request.user
+        if user.is_superuser:
+            return self.model.objects.all()
+        return self.model.objects.filter(user=user)
+
+
+class HabitExportAPIView(ExportAPIView):
+    """
+    API view streaming the habits of the user as JSON Lines or CSV.
+    """
+
+    model = Habit
+    export_fields = HABIT_EXPORT_FIELDS
+    file_name = 'habits'
+
+
+class AwardExportAPIView(ExportAPIView):
+    """
+    API view streaming the awards of the user as JSON Lines or CSV.
+    """
+
+    model = Award
+    export_fields = AWARD_EXPORT_FIELDS
+    file_name = 'awards'
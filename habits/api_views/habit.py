@@ -1,49 +1,162 @@
-from rest_framework import generics
-from rest_framework.exceptions import PermissionDenied
+import io
+
+from django.core.cache import cache
+from rest_framework import generics, status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from config import settings
+from config.routers import read_from_replica
+from habits.api_views.mixins import BulkCreateMixin, BulkDestroyMixin, BulkUpdateMixin, ConditionalListMixin, \
+    KeysetPaginationMixin, ReadSerializerMixin, ReplicaReadMixin
+from habits.cache import get_public_feed_cache_key, is_public_feed_changed_recently
+from habits.graph import get_related_habit_graph
+from habits.importers import HabitImporter
 from habits.models import Habit
-from habits.paginators import HabitPaginator
+from habits.paginators import HabitPaginator, RankedKeysetPaginator
 from habits.permissions import IsOwner, IsSuperUser
-from habits.serializers.habit import HabitSerializer
+from habits.search import search_habits
+from habits.serializers.habit import HabitReadSerializer, HabitSearchSerializer, HabitSerializer
 
 
-class HabitPublicListAPIView(generics.ListAPIView):
+class HabitPublicListAPIView(ReadSerializerMixin, KeysetPaginationMixin, generics.ListAPIView):
     """
     API view for retrieving a list of public habits.
 
+    Keyset pagination is used instead of page numbers when requested with `?pagination=cursor`.
+    Every page is cached for `PUBLIC_FEED_CACHE_TIMEOUT` seconds; the cache is invalidated by the signals in
+    `habits.signals` whenever a published habit changes.
+
     Attributes:
         serializer_class (HabitSerializer): The serializer class for the Habit model.
+        read_serializer_class (HabitReadSerializer): The serializer class for the responses.
         queryset (QuerySet): The queryset containing all published Habit objects.
         pagination_class (HabitPaginator): The paginator class for paginating the list.
+
+    Methods:
+        get_queryset(): Returns the published habits prepared for the serializer.
+        list(request): Returns the cached page of the feed, querying and caching it on a cache miss.
     """
 
     serializer_class = HabitSerializer
-    queryset = Habit.objects.filter(is_published=True)
+    read_serializer_class = HabitReadSerializer
+    queryset = Habit.objects.filter(is_published=True).order_by('pk')
     pagination_class = HabitPaginator
 
+    def get_queryset(self):
+        """
+        Returns the published habits prepared for the serializer.
+        """
+
+        return self.setup_eager_loading(super().get_queryset())
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns the cached page of the feed, querying and caching it on a cache miss.
+
+        The page is read from a replica unless the feed has just changed and the replicas may lag behind.
+        """
+
+        cache_key = get_public_feed_cache_key(request)
+        data = cache.get(cache_key)
+
+        if data is None:
+            with read_from_replica(primary=is_public_feed_changed_recently()):
+                data = super().list(request, *args, **kwargs).data
+            cache.set(cache_key, data, settings.PUBLIC_FEED_CACHE_TIMEOUT)
+
+        return Response(data)
+
+
+class HabitPublicSearchAPIView(HabitPublicListAPIView):
+    """
+    API view for searching the public habits.
+
+    The habits are filtered by the `time_from`, `time_to`, `frequency` and `is_pleasant` query parameters and
+    searched by the `q` text, see `habits.search`. Search results are ordered by relevance, other results by
+    primary key, and paginated with a cursor. The pages are cached like the pages of the public feed.
+
+    Attributes:
+        pagination_class (RankedKeysetPaginator): The paginator class for paginating the results.
+        keyset_pagination_class (RankedKeysetPaginator): The same paginator, as the results are always paginated
+            with a cursor.
+
+    Methods:
+        get_queryset(): Returns the published habits matching the query parameters.
+    """
+
+    pagination_class = RankedKeysetPaginator
+    keyset_pagination_class = RankedKeysetPaginator
+
+    def get_queryset(self):
+        """
+        Returns the published habits matching the query parameters, with the `rank` of the match if searched.
+
+        Raises:
+            ValidationError: If a query parameter is invalid.
+        """
+
+        params = HabitSearchSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
 
-class HabitListAPIView(generics.ListAPIView):
+        queryset = Habit.objects.filter(is_published=True)
+        if 'time_from' in params:
+            queryset = queryset.filter(execution_time__gte=params['time_from'])
+        if 'time_to' in params:
+            queryset = queryset.filter(execution_time__lte=params['time_to'])
+        if 'frequency' in params:
+            queryset = queryset.filter(frequency=params['frequency'])
+        if params['is_pleasant'] is not None:
+            queryset = queryset.filter(is_pleasant=params['is_pleasant'])
+
+        queryset = self.setup_eager_loading(queryset)
+        if params.get('q'):
+            queryset = search_habits(queryset, params['q'])
+        return queryset
+
+
+class HabitListAPIView(ReplicaReadMixin, ConditionalListMixin, ReadSerializerMixin, KeysetPaginationMixin,
+                       generics.ListAPIView):
     """
     API view for retrieving a list of habits.
 
+    Keyset pagination is used instead of page numbers when requested with `?pagination=cursor`.
+    Responses carry ETag and Last-Modified headers, unchanged lists are answered with 304 Not Modified.
+
     Attributes:
         serializer_class (HabitSerializer): The serializer class for the Habit model.
+        read_serializer_class (HabitReadSerializer): The serializer class for the responses.
         queryset (QuerySet): The queryset containing all Habit objects.
         pagination_class (HabitPaginator): The paginator class for paginating the list.
         permission_classes (list): The list of permission classes for the view.
 
     Methods:
-        get_queryset(): Filters habits based on user permissions.
+        get_queryset(): Returns the habits of the user prepared for the serializer.
+        get_owned_queryset(): Filters habits based on user permissions.
             For a superuser, returns all habits; for an authenticated user, returns only those belonging to the user.
     """
 
     serializer_class = HabitSerializer
+    read_serializer_class = HabitReadSerializer
     queryset = Habit.objects.all()
     pagination_class = HabitPaginator
     permission_classes = [IsAuthenticated | IsOwner | IsSuperUser]
 
     def get_queryset(self):
+        """
+        Returns the habits of the user prepared for the serializer.
+
+        The related objects are loaded with `setup_eager_loading` of the serializer, so a page of any size is
+        fetched in a fixed number of queries.
+        """
+
+        return self.setup_eager_loading(self.get_owned_queryset()).order_by('pk')
+
+    def get_owned_queryset(self):
         """
         Filters habits based on user permissions.
         For a superuser, returns all habits; for an authenticated user, returns only those belonging to the user.
@@ -117,3 +230,143 @@ class HabitDestroyAPIView(generics.DestroyAPIView):
 
     queryset = Habit.objects.all()
     permission_classes = [IsOwner | IsSuperUser]
+
+
+class HabitGraphAPIView(generics.RetrieveAPIView):
+    """
+    API view for retrieving the habits linked to a habit through related habits.
+
+    The chain followed from the habit and the habits linked to it are read with a single recursive query, up to
+    `RELATED_HABIT_MAX_DEPTH` links in each direction. The walks stop at the habits of other users, except for
+    superusers.
+
+    Attributes:
+        queryset (QuerySet): The queryset containing all Habit objects with their users.
+        permission_classes (list): The list of permission classes for the view.
+
+    Methods:
+        retrieve(request): Returns the linked habits.
+    """
+
+    queryset = Habit.objects.select_related('user')
+    permission_classes = [IsOwner | IsSuperUser]
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Returns the chain followed from the habit and the habits linked to it, only the own habits of the user
+        unless the user is a superuser.
+        """
+
+        user = request.user
+        return Response(get_related_habit_graph(self.get_object(), None if user.is_superuser else user.pk))
+
+
+class HabitBulkCreateAPIView(BulkCreateMixin, generics.CreateAPIView):
+    """
+    API view for creating a list of habits in a single request.
+
+    Attributes:
+        serializer_class (HabitSerializer): The serializer class for the Habit model.
+        permission_classes (list): The list of permission classes for the view.
+    """
+
+    serializer_class = HabitSerializer
+    permission_classes = [IsAuthenticated]
+
+
+class HabitBulkUpdateAPIView(BulkUpdateMixin, generics.GenericAPIView):
+    """
+    API view for partially updating a list of habits in a single request.
+
+    Attributes:
+        serializer_class (HabitSerializer): The serializer class for the Habit model.
+        permission_classes (list): The list of permission classes for the view.
+
+    Methods:
+        get_queryset(): Returns the habits the user is allowed to update.
+    """
+
+    serializer_class = HabitSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        Returns the habits the user is allowed to update: all habits for a superuser, own habits otherwise.
+
+        The owners are joined, as their timezones are needed to reschedule the reminders and their emails to
+        represent the updated habits.
+        """
+
+        user = self.request.user
+        queryset = Habit.objects.select_related('user')
+        if user.is_superuser:
+            return queryset
+        return queryset.filter(user=user)
+
+
+class HabitBulkDestroyAPIView(BulkDestroyMixin, generics.GenericAPIView):
+    """
+    API view for deleting a list of habits in a single request.
+
+    Attributes:
+        permission_classes (list): The list of permission classes for the view.
+
+    Methods:
+        get_queryset(): Returns the habits the user is allowed to delete.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        Returns the habits the user is allowed to delete: all habits for a superuser, own habits otherwise.
+        """
+
+        user = self.request.user
+        if user.is_superuser:
+            return Habit.objects.all()
+        return Habit.objects.filter(user=user)
+
+
+class HabitImportAPIView(APIView):
+    """
+    API view for importing habits of the user from an uploaded JSON Lines or CSV file.
+
+    The file is streamed in chunks by `HabitImporter`, so its size is not limited by memory.
+
+    Attributes:
+        permission_classes (list): The list of permission classes for the view.
+        parser_classes (list): The list of parser classes for the view.
+
+    Methods:
+        post(request): Imports the habits from the `file` field and returns the report of the import.
+    """
+
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Imports the habits from the `file` field and returns the report of the import.
+
+        The format is given by the `file_format` field or detected by the extension of the file.
+
+        Raises:
+            ValidationError: If no file is uploaded or the format is not supported.
+        """
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': ['No file was submitted.']})
+
+        file_format = request.data.get('file_format') or ('csv' if upload.name.endswith('.csv') else 'jsonl')
+        if file_format not in HabitImporter.FORMATS:
+            raise ValidationError({'file_format': [f'Supported formats: {", ".join(HabitImporter.FORMATS)}.']})
+
+        lines = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+        report = HabitImporter(request.user).run(lines, file_format)
+
+        return Response(
+            report.as_dict(),
+            status=status.HTTP_201_CREATED if report.created else status.HTTP_400_BAD_REQUEST
+        )
@@ -0,0 +1,368 @@
+from hashlib import sha256
+from urllib.parse import urlencode
+
+from django.db import models, transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator
+
+from config import settings
+from config.routers import read_from_replica
+from habits.cache import get_list_version
+from habits.paginators import KeysetPaginator
+
+
+class ReplicaReadMixin:
+    """
+    Mixin for list API views reading the list from the replicas of the database.
+
+    The reads of a user who has recently written to the database stay on the primary database, see
+    `config.routers`.
+
+    Methods:
+        list(request): Returns the list read from a replica.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns the list read from a replica.
+        """
+
+        with read_from_replica(request.user):
+            return super().list(request, *args, **kwargs)
+
+
+class KeysetPaginationMixin:
+    """
+    Mixin for list API views allowing clients to opt in to keyset pagination.
+
+    Requests with `?pagination=cursor` are paginated by `keyset_pagination_class`, all other requests by the
+    `pagination_class` of the view.
+
+    Attributes:
+        keyset_pagination_class (KeysetPaginator): The paginator class used when keyset pagination is requested.
+        pagination_query_param (str): The query parameter for selecting the pagination mode.
+    """
+
+    keyset_pagination_class = KeysetPaginator
+    pagination_query_param = 'pagination'
+
+    @property
+    def paginator(self):
+        """
+        Returns the paginator instance selected by the pagination query parameter.
+        """
+
+        if not hasattr(self, '_paginator'):
+            request = getattr(self, 'request', None)
+            if request is not None and request.query_params.get(self.pagination_query_param) == 'cursor':
+                self._paginator = self.keyset_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+
+class ConditionalListMixin:
+    """
+    Mixin for list API views answering conditional GET requests.
+
+    The ETag and Last-Modified headers are computed from the number of objects of the user and their latest
+    `updated_at` with a single aggregate query, so unchanged lists are answered with 304 Not Modified without
+    loading or serializing the objects. Views define `get_owned_queryset()` returning the objects of the user.
+    Both also depend on the version of the lists of the user, the time of their last change set by the signals in
+    `habits.signals`, which covers the changes keeping `updated_at`, such as deleting an object or an award or
+    changing the email of a listed user.
+
+    Methods:
+        list(request): Returns 304 Not Modified if the list is unchanged, the list otherwise.
+        get_list_validators(): Returns the ETag and the Last-Modified timestamp of the list.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns 304 Not Modified if the list of the client is unchanged and the list otherwise.
+        """
+
+        etag, last_modified = self.get_list_validators()
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
+
+    def get_list_validators(self):
+        """
+        Returns the ETag and the Last-Modified timestamp of the list.
+
+        The ETag also depends on the user, the query parameters and the accepted media type, so it differs for
+        every page and every format of the list.
+
+        Returns:
+            tuple[str, int]: The quoted ETag and the timestamp.
+        """
+
+        state = self.get_owned_queryset().order_by().aggregate(count=Count('pk'), updated_at=Max('updated_at'))
+        updated_at = state['updated_at']
+
+        user = self.request.user
+        version = get_list_version(user)
+        validator = '|'.join(str(value) for value in (
+            state['count'], updated_at.isoformat() if updated_at else '', version, user.pk, user.email,
+            getattr(user, 'telegram_id', None), self.request.accepted_media_type,
+            urlencode(sorted(self.request.query_params.items())),
+        ))
+
+        etag = quote_etag(sha256(validator.encode()).hexdigest()[:32])
+        last_modified = version // 10 ** 9
+        if updated_at is not None:
+            last_modified = max(last_modified, int(updated_at.timestamp()))
+        return etag, last_modified
+
+
+class ReadSerializerMixin:
+    """
+    Mixin for list API views serializing GET responses with a fast read-only serializer.
+
+    The `serializer_class` of the view is still used for other methods and for the API documentation.
+
+    Attributes:
+        read_serializer_class (BaseSerializer): The serializer class used for GET requests.
+
+    Methods:
+        get_serializer_class(): Returns the read serializer class for GET requests.
+        setup_eager_loading(queryset): Prepares the queryset for the selected serializer class.
+    """
+
+    read_serializer_class = None
+
+    def get_serializer_class(self):
+        """
+        Returns the read serializer class for GET requests and the serializer class of the view otherwise.
+        """
+
+        if self.request.method == 'GET' and not getattr(self, 'swagger_fake_view', False):
+            return self.read_serializer_class
+        return super().get_serializer_class()
+
+    def setup_eager_loading(self, queryset):
+        """
+        Prepares the queryset for the selected serializer class.
+
+        Args:
+            queryset (QuerySet): The queryset of the view.
+
+        Returns:
+            QuerySet: The queryset returned by `setup_eager_loading` of the selected serializer class.
+        """
+
+        return self.get_serializer_class().setup_eager_loading(queryset)
+
+
+class BulkCreateMixin:
+    """
+    Mixin for create API views accepting a list of objects.
+
+    All objects are validated, each one reporting its own errors, and created in a single transaction by the
+    list serializer of the view's serializer.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        Returns the list serializer when the request data is a list.
+        """
+
+        if isinstance(kwargs.get('data'), list):
+            kwargs['many'] = True
+            kwargs['max_length'] = settings.BULK_MAX_ITEMS
+        return super().get_serializer(*args, **kwargs)
+
+    def perform_create(self, serializer):
+        """
+        Creates the objects for the current authenticated user in a single transaction.
+
+        Args:
+            serializer (ListSerializer): The serializer instance.
+        """
+
+        with transaction.atomic():
+            serializer.save(user=self.request.user)
+
+
+class BulkUpdateMixin:
+    """
+    Mixin for API views partially updating a list of objects identified by their `pk`.
+
+    Every object is validated by its own serializer, the errors are reported per object in the order of the
+    request, and the objects are updated with `bulk_update` in a single transaction only if all of them are valid.
+    An object may appear once per request, and the unique sets of fields are also checked between the objects of
+    the request. The updated objects are represented from the instances read by `get_queryset`, so it should load
+    everything the serializer needs.
+
+    Methods:
+        patch(request): Updates the objects.
+    """
+
+    def patch(self, request, *args, **kwargs):
+        """
+        Updates the objects.
+
+        Returns:
+            Response: The updated objects, or the errors of each object with status 400.
+        """
+
+        items = get_bulk_items(request.data)
+        pks = [item.get('pk') if isinstance(item, dict) else None for item in items]
+        instances = self.get_queryset().in_bulk([pk for pk in pks if is_bulk_pk(pk)])
+
+        serializers, errors, updated_pks, unique_keys = [], [], set(), set()
+        for item, pk in zip(items, pks):
+            instance = instances.get(pk) if is_bulk_pk(pk) else None
+            if instance is None:
+                errors.append({'pk': ['Object not found.']})
+                continue
+            if pk in updated_pks:
+                errors.append({'pk': ['Duplicate object.']})
+                continue
+            updated_pks.add(pk)
+
+            serializer = self.get_serializer(instance, data=item, partial=True)
+            if serializer.is_valid():
+                serializers.append(serializer)
+                errors.append(check_unique_in_batch(serializer, unique_keys))
+            else:
+                errors.append(serializer.errors)
+
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        list_serializer = self.get_serializer(many=True)
+        with transaction.atomic():
+            instances = list_serializer.update(
+                [serializer.instance for serializer in serializers],
+                [serializer.validated_data for serializer in serializers]
+            )
+        return Response(self.get_serializer(instances, many=True).data)
+
+
+class BulkDestroyMixin:
+    """
+    Mixin for API views deleting a list of objects identified by their primary keys.
+
+    Methods:
+        delete(request): Deletes the objects.
+    """
+
+    def delete(self, request, *args, **kwargs):
+        """
+        Deletes the objects in a single transaction if all of them are found.
+
+        Returns:
+            Response: Status 204, or the errors of each primary key with status 400.
+        """
+
+        pks = get_bulk_items(request.data)
+        found_pks = set(self.get_queryset().filter(
+            pk__in=[pk for pk in pks if is_bulk_pk(pk)]
+        ).values_list('pk', flat=True))
+
+        errors = [{} if is_bulk_pk(pk) and pk in found_pks else {'pk': ['Object not found.']} for pk in pks]
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            self.get_queryset().filter(pk__in=found_pks).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def get_bulk_items(data):
+    """
+    Checks that the request data of a bulk API view is a list of allowed length.
+
+    Args:
+        data: The request data.
+
+    Returns:
+        list: The request data.
+
+    Raises:
+        ValidationError: If the data is not a list, is empty or is longer than `BULK_MAX_ITEMS`.
+    """
+
+    if not isinstance(data, list) or not data:
+        raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: ['Expected a non-empty list of items.']})
+    if len(data) > settings.BULK_MAX_ITEMS:
+        raise ValidationError(
+            {api_settings.NON_FIELD_ERRORS_KEY: [f'Ensure this list has no more than {settings.BULK_MAX_ITEMS} items.']}
+        )
+    return data
+
+
+def is_bulk_pk(value):
+    """
+    Returns whether a value of the request data of a bulk API view is a primary key.
+
+    JSON booleans are parsed as `bool`, a subclass of `int`, and would otherwise be taken for the keys 0 and 1.
+    """
+
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def check_unique_in_batch(serializer, unique_keys):
+    """
+    Checks that an object of a batch does not repeat a unique set of fields of an earlier object of the batch.
+
+    `UniqueTogetherValidator` checks every object against the database only, so the objects of a batch could
+    otherwise be given the same unique set. Like the validator, sets with a null value are not checked.
+
+    Args:
+        serializer (Serializer): The valid serializer of the object, bound to its instance.
+        unique_keys (set): The unique sets of the earlier objects of the batch, updated with the ones of the object.
+
+    Returns:
+        dict: The errors of the object.
+    """
+
+    keys = []
+    for validator in serializer.get_validators():
+        if not isinstance(validator, UniqueTogetherValidator):
+            continue
+
+        fields = tuple(validator.fields)
+        values = tuple(get_batch_value(serializer, field) for field in fields)
+        if None in values:
+            continue
+        if (fields, values) in unique_keys:
+            return {api_settings.NON_FIELD_ERRORS_KEY: [validator.message.format(field_names=', '.join(fields))]}
+        keys.append((fields, values))
+
+    unique_keys.update(keys)
+    return {}
+
+
+def get_batch_value(serializer, field):
+    """
+    Returns the value a field of an object will have after a partial update, related objects given by their keys.
+
+    Args:
+        serializer (Serializer): The valid serializer of the object, bound to its instance.
+        field (str): The name of the model field.
+
+    Returns:
+        The validated value of the field, or the current value if the field is not updated.
+    """
+
+    if field not in serializer.validated_data:
+        return serializer.instance.serializable_value(field)
+    value = serializer.validated_data[field]
+    return value.pk if isinstance(value, models.Model) else value
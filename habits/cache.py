@@ -0,0 +1,93 @@
+import time
+from hashlib import md5
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+
+from config import settings
+
+PUBLIC_FEED_VERSION_KEY = 'habits:public_feed:version'
+PUBLIC_FEED_CHANGED_KEY = 'habits:public_feed:changed'
+LIST_VERSION_KEY = 'habits:lists:version:{}'
+# The owner of the version of the lists of the superusers, which contain the objects of all users
+ALL_USERS = 'all'
+
+
+def get_public_feed_cache_key(request):
+    """
+    Returns the cache key of a page of the public habit feed.
+
+    The key contains the current version of the feed, so all cached pages are invalidated at once by
+    `invalidate_public_feed`, and the path and the query parameters of the request, so every page and page size
+    of the feed and of its search is cached separately.
+
+    Args:
+        request (Request): The request for the page.
+
+    Returns:
+        str: The cache key.
+    """
+
+    version = cache.get_or_set(PUBLIC_FEED_VERSION_KEY, 1, timeout=None)
+    query = urlencode(sorted(request.query_params.items()))
+    digest = md5(f'{request.get_host()}{request.path}?{query}'.encode(), usedforsecurity=False).hexdigest()
+    return f'habits:public_feed:{version}:{digest}'
+
+
+def invalidate_public_feed():
+    """
+    Invalidates all cached pages of the public habit feed by moving to a new version of the feed.
+
+    The feed is marked as changed for `REPLICA_PIN_TIMEOUT` seconds, so the new pages are not cached from
+    replicas that have not caught up yet.
+    """
+
+    cache.set(PUBLIC_FEED_CHANGED_KEY, True, timeout=settings.REPLICA_PIN_TIMEOUT)
+    try:
+        cache.incr(PUBLIC_FEED_VERSION_KEY)
+    except ValueError:
+        cache.set(PUBLIC_FEED_VERSION_KEY, 1, timeout=None)
+
+
+def is_public_feed_changed_recently():
+    """
+    Returns whether the public habit feed has changed within the last `REPLICA_PIN_TIMEOUT` seconds.
+    """
+
+    return bool(cache.get(PUBLIC_FEED_CHANGED_KEY))
+
+
+def get_list_version(user):
+    """
+    Returns the version of the habit and award lists of a user, a part of the ETags of the lists.
+
+    The version is the time in nanoseconds of the last change of the lists, set by `invalidate_lists` also on the
+    changes which do not touch `updated_at` of the listed objects, such as deletions, so it dates the lists for
+    Last-Modified as well. A missing version starts from the current time, so a version evicted from the cache
+    never repeats.
+
+    Args:
+        user (User): The user requesting the list.
+
+    Returns:
+        int: The version of the lists of the user, shared by all superusers.
+    """
+
+    owner = ALL_USERS if user.is_superuser else user.pk
+    return cache.get_or_set(LIST_VERSION_KEY.format(owner), time.time_ns, timeout=None)
+
+
+def invalidate_lists(user_ids):
+    """
+    Moves the habit and award lists of the users and of the superusers to new versions, the current time.
+
+    The versions only move forward, even if the clock does not.
+
+    Args:
+        user_ids (Iterable[int]): The ids of the users whose lists have changed.
+    """
+
+    now = time.time_ns()
+    for owner in {*user_ids, ALL_USERS}:
+        key = LIST_VERSION_KEY.format(owner)
+        cache.set(key, max(now, cache.get(key, 0) + 1), timeout=None)
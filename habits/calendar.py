@@ -0,0 +1,252 @@
+import datetime
+
+import numpy as np
+
+from config import settings
+from habits.models import get_next_fire_at
+
+# The fields of the `.values()` rows of the habits the calendar is projected from
+CALENDAR_VALUES_FIELDS = ('pk', 'action', 'place', 'execution_time', 'frequency', 'time_to_complete', 'next_fire_at')
+
+
+def escape_ics_text(value):
+    """
+    Escapes a text value of an iCalendar property.
+    """
+
+    return (
+        value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\r', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold_ics_line(line):
+    """
+    Folds an iCalendar content line longer than 75 octets into continuation lines.
+
+    Args:
+        line (str): The content line without the line break.
+
+    Returns:
+        str: The folded line, ending with a line break.
+    """
+
+    folded, current = [], ''
+    for char in line:
+        if len((current + char).encode()) > 75:
+            folded.append(current)
+            current = ' '
+        current += char
+    folded.append(current)
+    return '\r\n'.join(folded) + '\r\n'
+
+
+def project_occurrences(anchors, frequencies, start, end):
+    """
+    Projects the occurrences of periodic events within a range of days, without a loop over the days.
+
+    An event occurs on its anchor day and every `frequency` days after it. The number of occurrences of every event
+    within the range is computed at once, then all occurrences are laid out in a single array.
+
+    Args:
+        anchors (np.ndarray): The first day of every event, as `datetime64[D]`.
+        frequencies (np.ndarray): The period of every event in days.
+        start (datetime.date): The first day of the range.
+        end (datetime.date): The last day of the range.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The index of the event and the day of every occurrence, in the order of the
+            events.
+    """
+
+    start, end = np.datetime64(start, 'D'), np.datetime64(end, 'D')
+    first = np.maximum(-((anchors - start).astype(np.int64) // frequencies), 0)
+    last = (end - anchors).astype(np.int64) // frequencies
+    counts = np.maximum(last - first + 1, 0)
+
+    events = np.repeat(np.arange(len(anchors)), counts)
+    steps = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + first[events]
+    return events, anchors[events] + steps * frequencies[events]
+
+
+def format_ics_values(values, unit):
+    """
+    Formats days or datetimes as iCalendar DATE or DATE-TIME values, without the UTC designator.
+
+    Args:
+        values (np.ndarray): The days or datetimes, as `datetime64`.
+        unit (str): 'D' for days or 's' for datetimes.
+
+    Returns:
+        list[str]: The formatted values.
+    """
+
+    if not len(values):
+        return []
+    return np.char.replace(np.char.replace(np.datetime_as_string(values, unit=unit), '-', ''), ':', '').tolist()
+
+
+def local_to_utc(days, seconds, tz):
+    """
+    Converts local times in a timezone to UTC without converting every occurrence one by one.
+
+    The offset of the timezone is looked up once for every day at midnight and applied to all times of the day.
+    Only the times on the days when the offset changes are converted one by one.
+
+    Args:
+        days (np.ndarray): The local days, as `datetime64[D]`.
+        seconds (np.ndarray): The local times of the day in seconds.
+        tz (zoneinfo.ZoneInfo): The timezone of the local times.
+
+    Returns:
+        np.ndarray: The UTC datetimes, as `datetime64[s]`.
+    """
+
+    local = days.astype('datetime64[s]') + seconds
+    if not len(days):
+        return local
+
+    first = days.min()
+    offsets = np.array(
+        [
+            tz.utcoffset(datetime.datetime.combine(day, datetime.time())).total_seconds()
+            for day in np.arange(first, days.max() + 2).tolist()
+        ],
+        dtype=np.int64
+    )
+    day_indexes = (days - first).astype(np.int64)
+    utc = local - offsets[day_indexes]
+
+    for index in np.flatnonzero(offsets[day_indexes] != offsets[day_indexes + 1]).tolist():
+        local_time = local[index].item()
+        utc[index] = local[index] - int(tz.utcoffset(local_time).total_seconds())
+    return utc
+
+
+class HabitCalendar:
+    """
+    Calendar of the upcoming occurrences of the habits of a user within a range of days.
+
+    A habit occurs at its execution time in the timezone of the user, on the day of its next reminder and every
+    `frequency` days after it. The occurrences are projected with NumPy for all habits at once.
+
+    Attributes:
+        habits (list[dict]): The `.values()` rows of the habits with the `CALENDAR_VALUES_FIELDS` keys.
+        tz (zoneinfo.ZoneInfo): The timezone of the user.
+        start (datetime.date): The first day of the calendar.
+        end (datetime.date): The last day of the calendar.
+        habit_indexes (np.ndarray): The index of the habit of every occurrence.
+        dates (np.ndarray): The day of every occurrence.
+
+    Methods:
+        as_dict(): Returns the days of the occurrences of every habit.
+        iter_ics(): Yields the calendar as an iCalendar feed, one chunk of events at a time.
+    """
+
+    ICS_CHUNK_SIZE = 500
+
+    def __init__(self, habits, tz, start, end, now=None):
+        self.habits = habits
+        self.tz = tz
+        self.start = start
+        self.end = end
+
+        now = now or datetime.datetime.now(tz=datetime.timezone.utc)
+        anchors = np.array([self.get_anchor(habit, now) for habit in habits], dtype='datetime64[D]')
+        frequencies = np.array([max(habit['frequency'], 1) for habit in habits], dtype=np.int64)
+        self.habit_indexes, self.dates = project_occurrences(anchors, frequencies, start, end)
+
+    def get_anchor(self, habit, now):
+        """
+        Returns the local day of the next occurrence of a habit.
+
+        Args:
+            habit (dict): The row of the habit.
+            now (datetime.datetime): The current UTC datetime.
+
+        Returns:
+            datetime.date: The day of the next occurrence.
+        """
+
+        fire_at = habit['next_fire_at'] or get_next_fire_at(habit['execution_time'], self.tz, now)
+        return (fire_at + settings.NOTIFICATION_LEAD_TIME).astimezone(self.tz).date()
+
+    def as_dict(self):
+        """
+        Returns the days of the occurrences of every habit.
+
+        Returns:
+            dict: The timezone, the range and the habits with the ISO formatted days of their occurrences.
+        """
+
+        bounds = np.searchsorted(self.habit_indexes, np.arange(len(self.habits) + 1))
+        days = np.datetime_as_string(self.dates, unit='D').tolist()
+
+        return {
+            'timezone': self.tz.key,
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'habits': [
+                {
+                    'habit': habit['pk'],
+                    'action': habit['action'],
+                    'place': habit['place'],
+                    'execution_time': habit['execution_time'].isoformat(),
+                    'dates': days[bounds[index]:bounds[index + 1]],
+                }
+                for index, habit in enumerate(self.habits)
+            ],
+        }
+
+    def iter_ics(self):
+        """
+        Yields the calendar as an iCalendar feed, one chunk of events at a time.
+
+        The events are ordered by their start. Their start is given in UTC, converted from the execution time on
+        the local day of every occurrence, so the events stay at the execution time over DST changes without
+        a VTIMEZONE component in the feed.
+
+        Yields:
+            str: The parts of the feed.
+        """
+
+        stamp = datetime.datetime.now(tz=datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        # The parts of the events of every habit around the local day and the UTC start of an occurrence
+        events = [
+            (
+                f'BEGIN:VEVENT\r\nUID:{habit["pk"]}-',
+                f'@app_of_habits\r\nDTSTAMP:{stamp}\r\nDTSTART:',
+                'Z\r\n'
+                f'DURATION:PT{habit["time_to_complete"]}S\r\n'
+                + fold_ics_line(f'SUMMARY:{escape_ics_text(habit["action"])}')
+                + fold_ics_line(f'LOCATION:{escape_ics_text(habit["place"])}')
+                + 'END:VEVENT\r\n',
+            )
+            for habit in self.habits
+        ]
+
+        seconds = np.array(
+            [
+                (habit['execution_time'].hour * 60 + habit['execution_time'].minute) * 60
+                + habit['execution_time'].second
+                for habit in self.habits
+            ],
+            dtype=np.int64
+        )
+        order = np.lexsort((seconds[self.habit_indexes], self.dates))
+        habit_indexes = self.habit_indexes[order].tolist()
+        days = format_ics_values(self.dates[order], 'D')
+        starts = local_to_utc(self.dates[order], seconds[self.habit_indexes[order]], self.tz)
+        starts = format_ics_values(starts, 's')
+
+        yield 'BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//app_of_habits//habit calendar//EN\r\nCALSCALE:GREGORIAN\r\n'
+        for chunk_start in range(0, len(days), self.ICS_CHUNK_SIZE):
+            yield ''.join(
+                f'{events[index][0]}{day}{events[index][1]}{start}{events[index][2]}'
+                for index, day, start in zip(
+                    habit_indexes[chunk_start:chunk_start + self.ICS_CHUNK_SIZE],
+                    days[chunk_start:chunk_start + self.ICS_CHUNK_SIZE],
+                    starts[chunk_start:chunk_start + self.ICS_CHUNK_SIZE]
+                )
+            )
+        yield 'END:VCALENDAR\r\n'
@@ -0,0 +1,110 @@
+import zoneinfo
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from habits.models import HabitCompletion, HabitStats
+
+# The fields of `HabitStats` changed by new completions
+STATS_FIELDS = ('total_completions', 'current_streak', 'longest_streak', 'last_completed_on', 'history', 'updated_at')
+
+
+def get_local_today(user):
+    """
+    Returns the current day in the timezone of the user.
+
+    Args:
+        user (User): The user.
+
+    Returns:
+        datetime.date: The current day.
+    """
+
+    return timezone.now().astimezone(zoneinfo.ZoneInfo(user.timezone)).date()
+
+
+def compute_habit_stats(habit, days):
+    """
+    Computes the aggregates of a habit from the full list of its completions.
+
+    It is the reference the incremental updates of `record_completions` are checked and benchmarked against, and
+    the fallback for completions recorded out of order.
+
+    Args:
+        habit (Habit): The habit.
+        days (Iterable[datetime.date]): All days the habit was done.
+
+    Returns:
+        HabitStats: The unsaved aggregates of the habit.
+    """
+
+    stats = HabitStats(habit=habit)
+    for day in sorted(days):
+        stats.add_completion(day, habit.frequency)
+    return stats
+
+
+def record_completions(completions):
+    """
+    Records the days habits were done and updates the aggregates of the habits incrementally.
+
+    The aggregates of the habits are locked for the transaction, so concurrent completions of a habit are applied
+    one after another. Days already recorded are skipped. A completion later than the last one of the habit is
+    added to the aggregates in O(1); an earlier one, e.g. a forgotten day recorded afterwards, makes the aggregates
+    of the habit be recomputed from its completions. Everything is done in a fixed number of queries for any
+    number of habits.
+
+    Args:
+        completions (Iterable[tuple[Habit, datetime.date]]): The habits and the days they were done.
+
+    Returns:
+        list[HabitStats]: The updated aggregates of the habits, in the order of their first completion.
+    """
+
+    days_by_habit = defaultdict(set)
+    habits = {}
+    for habit, day in completions:
+        habits[habit.pk] = habit
+        days_by_habit[habit.pk].add(day)
+
+    if not habits:
+        return []
+
+    with transaction.atomic():
+        HabitStats.objects.bulk_create([HabitStats(habit_id=pk) for pk in habits], ignore_conflicts=True)
+        stats_by_habit = HabitStats.objects.select_for_update().in_bulk(list(habits))
+
+        recorded = set(
+            HabitCompletion.objects.filter(
+                habit_id__in=habits, completed_on__in={day for days in days_by_habit.values() for day in days}
+            ).values_list('habit_id', 'completed_on')
+        )
+        new_completions = [
+            HabitCompletion(habit_id=pk, completed_on=day)
+            for pk, days in days_by_habit.items() for day in sorted(days) if (pk, day) not in recorded
+        ]
+        HabitCompletion.objects.bulk_create(new_completions)
+
+        out_of_order = set()
+        for completion in new_completions:
+            habit = habits[completion.habit_id]
+            if not stats_by_habit[habit.pk].add_completion(completion.completed_on, habit.frequency):
+                out_of_order.add(habit.pk)
+
+        if out_of_order:
+            days_by_habit = defaultdict(list)
+            for pk, day in HabitCompletion.objects.filter(habit_id__in=out_of_order).values_list(
+                    'habit_id', 'completed_on'):
+                days_by_habit[pk].append(day)
+            for pk in out_of_order:
+                stats_by_habit[pk] = compute_habit_stats(habits[pk], days_by_habit[pk])
+
+        stats = [stats_by_habit[pk] for pk in habits]
+        now = timezone.now()
+        for habit_stats in stats:
+            habit_stats.habit = habits[habit_stats.habit_id]
+            habit_stats.updated_at = now
+        HabitStats.objects.bulk_update(stats, STATS_FIELDS)
+
+    return stats
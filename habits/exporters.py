@@ -0,0 +1,108 @@
+import csv
+import datetime
+import json
+
+from config import settings
+
+HABIT_EXPORT_FIELDS = {
+    'pk': 'pk',
+    'user': 'user__email',
+    'award': 'award_id',
+    'place': 'place',
+    'execution_time': 'execution_time',
+    'action': 'action',
+    'is_pleasant': 'is_pleasant',
+    'related_habit': 'related_habit_id',
+    'frequency': 'frequency',
+    'time_to_complete': 'time_to_complete',
+    'is_published': 'is_published',
+}
+
+AWARD_EXPORT_FIELDS = {
+    'pk': 'pk',
+    'user': 'user__email',
+    'reward': 'reward',
+}
+
+
+class Echo:
+    """
+    File-like object returning what is written to it, used to stream the output of `csv.writer`.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(queryset, fields):
+    """
+    Iterates over the rows of a queryset as dicts with a server-side cursor.
+
+    Args:
+        queryset (QuerySet): The queryset to export.
+        fields (dict): The exported names of the fields mapped to the lookups of their columns.
+
+    Yields:
+        dict: The exported row, with times formatted as in the API responses.
+    """
+
+    names = tuple(fields)
+    rows = queryset.order_by('pk').values_list(*fields.values()).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+    for row in rows:
+        yield {
+            name: value.isoformat() if isinstance(value, datetime.time) else value
+            for name, value in zip(names, row)
+        }
+
+
+def stream_jsonl(rows):
+    """
+    Streams rows as JSON Lines.
+
+    Args:
+        rows (Iterable[dict]): The rows to export.
+
+    Yields:
+        str: One line of JSON per row.
+    """
+
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def stream_csv(rows, fields):
+    """
+    Streams rows as CSV with a header line.
+
+    Args:
+        rows (Iterable[dict]): The rows to export.
+        fields (dict): The exported names of the fields, used as the header.
+
+    Yields:
+        str: One line of CSV per row.
+    """
+
+    writer = csv.DictWriter(Echo(), fieldnames=tuple(fields))
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def export(queryset, fields, file_format):
+    """
+    Streams the rows of a queryset in the given format.
+
+    Args:
+        queryset (QuerySet): The objects to export.
+        fields (dict): The exported names of the fields mapped to the lookups of their columns.
+        file_format (str): 'jsonl' or 'csv'.
+
+    Returns:
+        Iterator[str]: The lines of the export.
+    """
+
+    rows = iter_rows(queryset, fields)
+    if file_format == 'csv':
+        return stream_csv(rows, fields)
+    return stream_jsonl(rows)
@@ -0,0 +1,118 @@
+from django.db import connections, router
+
+from config import settings
+from habits.models import Habit
+
+# Walks the links of the related habits from a habit in both directions: `chain` follows `related_habit` from the
+# habit, `linked` goes back to the habits whose chains lead to it. The walks stop after `max_depth` links, so they
+# end on cyclic chains too. `{owner}` is either empty or a condition stopping the walks at the habits of other users.
+RELATED_HABIT_GRAPH_SQL = '''
+WITH RECURSIVE chain(id, depth) AS (
+    SELECT h.id, 1 FROM {table} p JOIN {table} h ON h.id = p.related_habit_id WHERE p.id = %(habit)s {owner}
+    UNION
+    SELECT h.id, c.depth + 1 FROM chain c JOIN {table} p ON p.id = c.id JOIN {table} h ON h.id = p.related_habit_id
+    WHERE c.depth < %(max_depth)s {owner}
+), linked(id, depth) AS (
+    SELECT h.id, 1 FROM {table} h WHERE h.related_habit_id = %(habit)s {owner}
+    UNION
+    SELECT h.id, l.depth + 1 FROM {table} h JOIN linked l ON h.related_habit_id = l.id
+    WHERE l.depth < %(max_depth)s {owner}
+)
+SELECT 'chain', c.depth, h.id, h.action, h.is_pleasant, h.related_habit_id
+FROM chain c JOIN {table} h ON h.id = c.id
+UNION ALL
+SELECT 'linked', l.depth, h.id, h.action, h.is_pleasant, h.related_habit_id
+FROM linked l JOIN {table} h ON h.id = l.id
+ORDER BY 1, 2, 3
+'''
+
+# Measures the chain a habit would be part of if it were linked to a related habit: the number of links after the
+# related habit, the number of links leading to the habit, and whether the chain of the related habit comes back
+# to the habit. The walks are cut one link after the limit, which is enough to tell that it is exceeded.
+RELATED_HABIT_CHECK_SQL = '''
+WITH RECURSIVE chain(id, depth) AS (
+    SELECT CAST(%(related_habit)s AS bigint), 0
+    UNION
+    SELECT h.related_habit_id, c.depth + 1 FROM {table} h JOIN chain c ON h.id = c.id
+    WHERE h.related_habit_id IS NOT NULL AND c.depth <= %(max_depth)s
+), linked(id, depth) AS (
+    SELECT CAST(%(habit)s AS bigint), 0
+    UNION
+    SELECT h.id, l.depth + 1 FROM {table} h JOIN linked l ON h.related_habit_id = l.id WHERE l.depth <= %(max_depth)s
+)
+SELECT
+    (SELECT MAX(depth) FROM chain),
+    (SELECT MAX(depth) FROM linked),
+    EXISTS(SELECT 1 FROM chain WHERE id = %(habit)s)
+'''
+
+
+def check_related_habit(habit_id, related_habit_id):
+    """
+    Checks with a single query that linking a habit to a related habit makes no cycle and no chain longer than
+    `RELATED_HABIT_MAX_DEPTH` links.
+
+    The check reads the primary database, as it is followed by a write.
+
+    Args:
+        habit_id (int | None): The primary key of the habit, None for a new habit.
+        related_habit_id (int): The primary key of the related habit.
+
+    Returns:
+        str | None: The error, None if the link is allowed.
+    """
+
+    if habit_id is not None and habit_id == related_habit_id:
+        return 'A habit cannot be related to itself.'
+
+    max_depth = settings.RELATED_HABIT_MAX_DEPTH
+    with connections[router.db_for_write(Habit)].cursor() as cursor:
+        cursor.execute(
+            RELATED_HABIT_CHECK_SQL.format(table=Habit._meta.db_table),
+            {'habit': habit_id, 'related_habit': related_habit_id, 'max_depth': max_depth}
+        )
+        chain_depth, linked_depth, is_cycle = cursor.fetchone()
+
+    if is_cycle:
+        return 'The chain of the related habit leads back to the habit.'
+    if linked_depth + 1 + chain_depth > max_depth:
+        return f'A chain of related habits cannot be longer than {max_depth} links.'
+    return None
+
+
+def get_related_habit_graph(habit, user_id=None):
+    """
+    Returns the habits linked to a habit in both directions, read with a single query.
+
+    Args:
+        habit (Habit): The habit.
+        user_id (int | None): The user whose habits only are walked through and returned, None for all habits.
+
+    Returns:
+        dict: The `chain` of the habits followed from the habit and the habits `linked` to it, each with the number
+            of links from the habit as `depth`.
+    """
+
+    graph = {'chain': [], 'linked': []}
+    with connections[router.db_for_read(Habit)].cursor() as cursor:
+        cursor.execute(
+            RELATED_HABIT_GRAPH_SQL.format(
+                table=Habit._meta.db_table, owner='' if user_id is None else 'AND h.user_id = %(user)s'
+            ),
+            {'habit': habit.pk, 'user': user_id, 'max_depth': settings.RELATED_HABIT_MAX_DEPTH}
+        )
+        for direction, depth, pk, action, is_pleasant, related_habit in cursor.fetchall():
+            graph[direction].append({
+                'depth': depth,
+                'pk': pk,
+                'action': action,
+                'is_pleasant': bool(is_pleasant),
+                'related_habit': related_habit,
+            })
+
+    return {
+        'habit': habit.pk,
+        'action': habit.action,
+        'related_habit': habit.related_habit_id,
+        **graph,
+    }
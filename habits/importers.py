@@ -0,0 +1,160 @@
+import csv
+import itertools
+import json
+import time
+from dataclasses import dataclass, field
+
+from config import settings
+from habits.cache import invalidate_public_feed
+from habits.models import Award, Habit
+from habits.serializers.habit import HabitImportSerializer
+
+
+@dataclass
+class ImportReport:
+    """
+    Report of a bulk import of habits.
+
+    Attributes:
+        created (int): The number of created habits.
+        rejected (int): The number of rejected rows.
+        errors (list[dict]): The line numbers and errors of the first `IMPORT_MAX_REPORTED_ERRORS` rejected rows.
+        elapsed (float): The duration of the import in seconds.
+    """
+
+    created: int = 0
+    rejected: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return round((self.created + self.rejected) / self.elapsed, 1) if self.elapsed else 0.0
+
+    def reject(self, line, errors):
+        self.rejected += 1
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'elapsed': round(self.elapsed, 3),
+            'rows_per_second': self.rows_per_second,
+        }
+
+
+class HabitImporter:
+    """
+    Imports habits for a user from a JSON Lines or CSV stream.
+
+    The stream is read in chunks of `chunk_size` rows. Every row is validated by `HabitImportSerializer`, which
+    queries the chain of a related habit only, then the awards and related habits referenced by the whole chunk are
+    checked with one query each, and the valid rows of the chunk are inserted with a single `bulk_create`, i.e. three
+    queries per chunk besides the chains. Only the awards and habits of the user can be referenced.
+
+    Attributes:
+        user (User): The owner of the imported habits.
+        chunk_size (int): The number of rows processed at once.
+
+    Methods:
+        run(lines, file_format) -> ImportReport:
+            Imports the habits from the lines of a file.
+    """
+
+    FORMATS = ('jsonl', 'csv')
+    DOES_NOT_EXIST = 'Invalid pk "{}" - object does not exist.'
+    NOT_PLEASANT = 'A related habit should have the hallmark of a pleasant habit'
+
+    def __init__(self, user, chunk_size=None):
+        self.user = user
+        self.chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+
+    def run(self, lines, file_format) -> ImportReport:
+        """
+        Imports the habits from the lines of a file.
+
+        Args:
+            lines (Iterable[str]): The lines of the file.
+            file_format (str): 'jsonl' or 'csv'.
+
+        Returns:
+            ImportReport: The numbers of created habits and rejected rows with their errors.
+        """
+
+        report = ImportReport()
+        started_at = time.perf_counter()
+
+        rows = self._read_csv(lines) if file_format == 'csv' else self._read_jsonl(lines)
+        while chunk := list(itertools.islice(rows, self.chunk_size)):
+            self._import_chunk(chunk, report)
+
+        report.elapsed = time.perf_counter() - started_at
+        return report
+
+    def _import_chunk(self, chunk, report):
+        rows, rejected = [], []
+        for line, data in chunk:
+            if not isinstance(data, dict):
+                rejected.append((line, {'non_field_errors': ['Invalid row.']}))
+                continue
+
+            serializer = HabitImportSerializer(data=data)
+            if serializer.is_valid():
+                rows.append((line, serializer.validated_data))
+            else:
+                rejected.append((line, serializer.errors))
+
+        award_ids = {attrs['award'] for _, attrs in rows if attrs.get('award') is not None}
+        related_habit_ids = {attrs['related_habit'] for _, attrs in rows if attrs.get('related_habit') is not None}
+
+        existing_award_ids = set(
+            Award.objects.filter(pk__in=award_ids, user=self.user).values_list('pk', flat=True)
+        ) if award_ids else set()
+        pleasant_by_habit_id = dict(
+            Habit.objects.filter(pk__in=related_habit_ids, user=self.user).values_list('pk', 'is_pleasant')
+        ) if related_habit_ids else {}
+
+        habits = []
+        for line, attrs in rows:
+            award_id = attrs.pop('award', None)
+            related_habit_id = attrs.pop('related_habit', None)
+
+            if award_id is not None and award_id not in existing_award_ids:
+                rejected.append((line, {'award': [self.DOES_NOT_EXIST.format(award_id)]}))
+            elif related_habit_id is not None and related_habit_id not in pleasant_by_habit_id:
+                rejected.append((line, {'related_habit': [self.DOES_NOT_EXIST.format(related_habit_id)]}))
+            elif related_habit_id is not None and not pleasant_by_habit_id[related_habit_id]:
+                rejected.append((line, {'related_habit': [self.NOT_PLEASANT]}))
+            else:
+                habit = Habit(user=self.user, award_id=award_id, related_habit_id=related_habit_id, **attrs)
+                habit.schedule_next_fire_at()
+                habits.append(habit)
+
+        if habits:
+            Habit.objects.bulk_create(habits)
+        report.created += len(habits)
+
+        for line, errors in sorted(rejected, key=lambda rejection: rejection[0]):
+            report.reject(line, errors)
+
+        if any(habit.is_published for habit in habits):
+            invalidate_public_feed()
+
+    @staticmethod
+    def _read_jsonl(lines):
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError:
+                yield line_number, None
+
+    @staticmethod
+    def _read_csv(lines):
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, {key: value for key, value in row.items() if key is not None and value != ''}
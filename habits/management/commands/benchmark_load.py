@@ -0,0 +1,101 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+from django.core.management import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+
+
+class Command(BaseCommand):
+    """
+    Management command measuring the throughput and latency of an endpoint under concurrent load.
+
+    Run it against the same endpoint served by a WSGI server (e.g. `runserver`) and by uvicorn with
+    `config.asgi:application` to compare them, or against `/habit/list/` and `/habit/async/list/` of one server.
+    """
+
+    help = 'Sends concurrent GET requests to a URL and reports the throughput and the latency percentiles'
+
+    def add_arguments(self, parser):
+        """
+        Add the arguments of the command.
+
+        Args:
+            parser (ArgumentParser): The parser of the command line arguments.
+        """
+
+        parser.add_argument('url', help='Absolute URL of the endpoint')
+        parser.add_argument('--email', help='Email of the user the requests are authenticated as')
+        parser.add_argument('--concurrency', type=int, default=50, help='Number of concurrent clients')
+        parser.add_argument('--requests', type=int, default=2000, help='Total number of requests')
+        parser.add_argument('--timeout', type=float, default=30, help='Timeout of a request in seconds')
+
+    def handle(self, *args, **options):
+        """
+        Handle the command execution.
+
+        Args:
+            args: Command line arguments.
+            options: Command options.
+
+        """
+
+        headers = {}
+        if options['email']:
+            try:
+                user = User.objects.get(email=options['email'])
+            except User.DoesNotExist:
+                raise CommandError(f'User {options["email"]} does not exist')
+            headers['Authorization'] = f'Bearer {AccessToken.for_user(user)}'
+
+        latencies, errors, elapsed = asyncio.run(self.run_load(
+            options['url'], headers, options['concurrency'], options['requests'], options['timeout']
+        ))
+
+        self.stdout.write(f'Requests: {len(latencies)} ok, {errors} failed in {elapsed:.2f} s')
+        self.stdout.write(f'Throughput: {len(latencies) / elapsed:.1f} requests per second')
+        if len(latencies) > 1:
+            percentiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f'Latency: p50 {percentiles[49] * 1000:.1f} ms, p95 {percentiles[94] * 1000:.1f} ms, '
+                f'p99 {percentiles[98] * 1000:.1f} ms'
+            )
+
+    @staticmethod
+    async def run_load(url, headers, concurrency, total, timeout):
+        """
+        Sends the requests from `concurrency` clients sharing a connection pool.
+
+        Returns:
+            tuple[list[float], int, float]: The latencies of the successful requests in seconds, the number of
+                failed requests and the total time in seconds.
+        """
+
+        latencies = []
+        errors = 0
+        remaining = iter(range(total))
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        async with httpx.AsyncClient(headers=headers, timeout=timeout, limits=limits) as client:
+            async def worker():
+                nonlocal errors
+                for _ in remaining:
+                    started_at = time.perf_counter()
+                    try:
+                        response = await client.get(url)
+                    except httpx.HTTPError:
+                        errors += 1
+                        continue
+                    if response.is_success:
+                        latencies.append(time.perf_counter() - started_at)
+                    else:
+                        errors += 1
+
+            started_at = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started_at
+
+        return latencies, errors, elapsed
@@ -0,0 +1,73 @@
+import datetime
+import timeit
+
+from django.core.management import BaseCommand
+
+from habits.models import Habit
+from habits.serializers.habit import HabitReadSerializer, HabitSerializer
+from users.models import User
+
+
+class Command(BaseCommand):
+    """
+    Management command comparing the serialization speed of HabitSerializer and HabitReadSerializer.
+
+    The habits are built in memory, so only the serialization is measured and no database is needed.
+    """
+
+    help = 'Compares the per-row serialization time of HabitSerializer and HabitReadSerializer'
+
+    def add_arguments(self, parser):
+        """
+        Add the arguments of the command.
+
+        Args:
+            parser (ArgumentParser): The parser of the command line arguments.
+        """
+
+        parser.add_argument('--rows', type=int, default=1000, help='Number of serialized habits')
+        parser.add_argument('--repeat', type=int, default=5, help='Number of measurements, the best one is shown')
+
+    def handle(self, *args, **options):
+        """
+        Handle the command execution.
+
+        Args:
+            args: Command line arguments.
+            options: Command options.
+
+        """
+
+        rows = options['rows']
+        user = User(pk=1, email='benchmark@gmail.com', telegram_id=123456789)
+        habits = [
+            Habit(
+                pk=i, user=user, award_id=i if i % 2 else None, place='benchmark_place',
+                execution_time=datetime.time(i % 24, i % 60), action='benchmark_action', is_pleasant=False,
+                related_habit_id=None if i % 2 else i, frequency=1, time_to_complete=60, is_published=True
+            )
+            for i in range(1, rows + 1)
+        ]
+        values = [
+            {
+                'pk': habit.pk, 'user__email': user.email, 'award_id': habit.award_id, 'place': habit.place,
+                'execution_time': habit.execution_time, 'action': habit.action, 'is_pleasant': habit.is_pleasant,
+                'related_habit_id': habit.related_habit_id, 'frequency': habit.frequency,
+                'time_to_complete': habit.time_to_complete, 'is_published': habit.is_published,
+                'user__telegram_id': user.telegram_id,
+            }
+            for habit in habits
+        ]
+
+        timings = {
+            'HabitSerializer': min(timeit.repeat(
+                lambda: HabitSerializer(habits, many=True).data, number=1, repeat=options['repeat']
+            )),
+            'HabitReadSerializer': min(timeit.repeat(
+                lambda: HabitReadSerializer(values, many=True).data, number=1, repeat=options['repeat']
+            )),
+        }
+
+        for name, seconds in timings.items():
+            self.stdout.write(f'{name}: {seconds / rows * 1e6:.2f} µs per row')
+        self.stdout.write(f'Speedup: {timings["HabitSerializer"] / timings["HabitReadSerializer"]:.1f}x')
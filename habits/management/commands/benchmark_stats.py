@@ -0,0 +1,86 @@
+import datetime
+import timeit
+
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from habits.completions import compute_habit_stats, get_local_today, record_completions
+from habits.models import Habit, HabitCompletion, HabitStats
+from users.models import User
+
+
+class Command(BaseCommand):
+    """
+    Management command comparing reading the incremental stats of a habit with recomputing them from its completions.
+
+    A habit with a history of completions is created in a transaction which is rolled back at the end, so the
+    command leaves the database unchanged.
+    """
+
+    help = 'Compares reading the stored stats of a habit with recomputing them from the log of completions'
+
+    def add_arguments(self, parser):
+        """
+        Add the arguments of the command.
+
+        Args:
+            parser (ArgumentParser): The parser of the command line arguments.
+        """
+
+        parser.add_argument('--days', type=int, default=3650, help='Number of days in the history of the habit')
+        parser.add_argument('--number', type=int, default=100, help='Number of reads per measurement')
+        parser.add_argument('--repeat', type=int, default=5, help='Number of measurements, the best one is shown')
+
+    def handle(self, *args, **options):
+        """
+        Handle the command execution.
+
+        Args:
+            args: Command line arguments.
+            options: Command options.
+
+        """
+
+        with transaction.atomic():
+            user = User.objects.create(email='benchmark_stats@gmail.com')
+            habit = Habit.objects.create(
+                user=user, place='benchmark_place', execution_time=datetime.time(8, 0), action='benchmark_action',
+                frequency=1, time_to_complete=60
+            )
+
+            today = get_local_today(user)
+            # The habit is done on four days of every five
+            days = [today - datetime.timedelta(days=i) for i in range(options['days']) if i % 5]
+            HabitCompletion.objects.bulk_create(
+                [HabitCompletion(habit=habit, completed_on=day) for day in days[1:]], batch_size=1000
+            )
+            compute_habit_stats(habit, days[1:]).save()
+
+            write_seconds = timeit.timeit(lambda: record_completions([(habit, days[0])]), number=1)
+
+            def read_stored():
+                stats = HabitStats.objects.select_related('habit').get(pk=habit.pk)
+                return stats.get_current_streak(today, 1), stats.get_adherence(today, 30, 1)
+
+            def recompute():
+                stats = compute_habit_stats(
+                    habit, HabitCompletion.objects.filter(habit=habit).values_list('completed_on', flat=True)
+                )
+                return stats.get_current_streak(today, 1), stats.get_adherence(today, 30, 1)
+
+            if read_stored() != recompute():
+                raise CommandError('The stored stats differ from the recomputed ones')
+            timings = {
+                'Stored stats': min(timeit.repeat(read_stored, number=options['number'], repeat=options['repeat'])),
+                'Recomputed from the log': min(timeit.repeat(
+                    recompute, number=options['number'], repeat=options['repeat']
+                )),
+            }
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'Completions in the log: {len(days)}')
+        self.stdout.write(f'Recording a completion: {write_seconds * 1000:.2f} ms')
+        for name, seconds in timings.items():
+            self.stdout.write(f'{name}: {seconds / options["number"] * 1000:.2f} ms per read')
+        self.stdout.write(f'Speedup: {timings["Recomputed from the log"] / timings["Stored stats"]:.1f}x')
@@ -0,0 +1,54 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+
+from habits.importers import HabitImporter
+from users.models import User
+
+
+class Command(BaseCommand):
+    """
+    Management command for importing habits of a user from a JSON Lines or CSV file.
+    """
+
+    help = 'Imports habits of a user from a JSON Lines or CSV file'
+
+    def add_arguments(self, parser):
+        """
+        Add the arguments of the command.
+
+        Args:
+            parser (ArgumentParser): The parser of the command line arguments.
+        """
+
+        parser.add_argument('path', help='Path to the file to import')
+        parser.add_argument('--user', required=True, help='Email of the owner of the imported habits')
+        parser.add_argument('--file-format', choices=HabitImporter.FORMATS,
+                            help='Format of the file, detected by its extension by default')
+        parser.add_argument('--chunk-size', type=int, help='Number of rows validated and inserted at once')
+
+    def handle(self, *args, **options):
+        """
+        Handle the command execution.
+
+        Args:
+            args: Command line arguments.
+            options: Command options.
+
+        """
+
+        user = User.objects.filter(email=options['user']).first()
+        if user is None:
+            raise CommandError(f'User {options["user"]} does not exist')
+
+        file_format = options['file_format'] or ('csv' if options['path'].endswith('.csv') else 'jsonl')
+
+        with open(options['path'], encoding='utf-8', newline='') as file:
+            report = HabitImporter(user, chunk_size=options['chunk_size']).run(file, file_format)
+
+        for error in report.errors:
+            self.stderr.write(f'Line {error["line"]}: {json.dumps(error["errors"], ensure_ascii=False)}')
+        self.stdout.write(
+            f'Created: {report.created}, rejected: {report.rejected}, '
+            f'elapsed: {report.elapsed:.3f} s, rows per second: {report.rows_per_second}'
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='habit',
+            name='execution_time',
+            field=models.TimeField(db_index=True, verbose_name='время выполнения привычки'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-18 12:40
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_next_fire_at(apps, schema_editor):
+    Habit = apps.get_model('habits', 'Habit')
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+
+    habits = []
+    for habit in Habit.objects.only('pk', 'execution_time').iterator(chunk_size=2000):
+        fire_at = datetime.datetime.combine(
+            now.date(), habit.execution_time, tzinfo=datetime.timezone.utc
+        ) - settings.NOTIFICATION_LEAD_TIME
+        while fire_at <= now:
+            fire_at += datetime.timedelta(days=1)
+        habit.next_fire_at = fire_at
+        habits.append(habit)
+
+    Habit.objects.bulk_update(habits, ['next_fire_at'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0002_habit_execution_time_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='habit',
+            name='next_fire_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='время следующего напоминания'),
+        ),
+        migrations.RunPython(fill_next_fire_at, migrations.RunPython.noop),
+    ]
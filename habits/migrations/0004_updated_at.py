@@ -0,0 +1,31 @@
+# Generated by Django 4.2.8 on 2026-10-18 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0003_habit_next_fire_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='award',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='дата изменения'),
+        ),
+        migrations.AddIndex(
+            model_name='award',
+            index=models.Index(fields=['user', 'updated_at'], name='habits_awar_user_id_909182_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='habit',
+            index=models.Index(fields=['user', 'updated_at'], name='habits_habi_user_id_bbc18b_idx'),
+        ),
+    ]
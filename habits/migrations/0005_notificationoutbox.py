@@ -0,0 +1,39 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0004_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fire_at', models.DateTimeField(verbose_name='время напоминания')),
+                ('chat_id', models.BigIntegerField(verbose_name='telegram id получателя')),
+                ('text', models.TextField(verbose_name='текст напоминания')),
+                ('status', models.CharField(choices=[('pending', 'ожидает отправки'), ('retrying', 'ожидает повторной отправки'), ('sent', 'отправлено'), ('failed', 'не отправлено')], default='pending', max_length=10, verbose_name='статус отправки')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='количество попыток отправки')),
+                ('next_attempt_at', models.DateTimeField(verbose_name='время следующей попытки отправки')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='ошибка последней попытки отправки')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='дата создания')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='дата отправки')),
+                ('habit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='habits.habit', verbose_name='привычка')),
+            ],
+            options={
+                'verbose_name': 'напоминание',
+                'verbose_name_plural': 'напоминания',
+                'indexes': [models.Index(condition=models.Q(('status__in', ['pending', 'retrying'])), fields=['next_attempt_at'], name='unsent_notification_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='notificationoutbox',
+            constraint=models.UniqueConstraint(fields=('habit', 'fire_at'), name='unique_habit_notification'),
+        ),
+    ]
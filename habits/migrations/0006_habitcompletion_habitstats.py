@@ -0,0 +1,47 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0005_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HabitStats',
+            fields=[
+                ('habit', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='habits.habit', verbose_name='привычка')),
+                ('total_completions', models.PositiveIntegerField(default=0, verbose_name='количество выполнений')),
+                ('current_streak', models.PositiveIntegerField(default=0, verbose_name='текущая серия')),
+                ('longest_streak', models.PositiveIntegerField(default=0, verbose_name='самая длинная серия')),
+                ('last_completed_on', models.DateField(blank=True, null=True, verbose_name='дата последнего выполнения')),
+                ('history', models.BigIntegerField(default=0, verbose_name='выполнения за последние дни')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='дата изменения')),
+            ],
+            options={
+                'verbose_name': 'статистика привычки',
+                'verbose_name_plural': 'статистика привычек',
+            },
+        ),
+        migrations.CreateModel(
+            name='HabitCompletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_on', models.DateField(verbose_name='дата выполнения')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='дата создания')),
+                ('habit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completions', to='habits.habit', verbose_name='привычка')),
+            ],
+            options={
+                'verbose_name': 'выполнение привычки',
+                'verbose_name_plural': 'выполнения привычек',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='habitcompletion',
+            constraint=models.UniqueConstraint(fields=('habit', 'completed_on'), name='unique_habit_completion'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+# GIN indexes of the published habits for the search of the public feed, see `habits.search`. They are created on
+# PostgreSQL only, so they are not declared in the `Meta` of the model.
+PUBLISHED = models.Q(is_published=True)
+SEARCH_INDEXES = [
+    GinIndex(SearchVector('action', 'place', config='simple'), name='habit_public_search_idx', condition=PUBLISHED),
+    GinIndex(fields=['action'], opclasses=['gin_trgm_ops'], name='habit_public_action_trgm_idx', condition=PUBLISHED),
+    GinIndex(fields=['place'], opclasses=['gin_trgm_ops'], name='habit_public_place_trgm_idx', condition=PUBLISHED),
+]
+
+
+def add_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    habit = apps.get_model('habits', 'Habit')
+    for index in SEARCH_INDEXES:
+        schema_editor.add_index(habit, index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    habit = apps.get_model('habits', 'Habit')
+    for index in SEARCH_INDEXES:
+        schema_editor.remove_index(habit, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0006_habitcompletion_habitstats'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(add_search_indexes, remove_search_indexes),
+    ]
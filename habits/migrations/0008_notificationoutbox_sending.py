@@ -0,0 +1,30 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0007_habit_public_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notificationoutbox',
+            name='unsent_notification_idx',
+        ),
+        migrations.AlterField(
+            model_name='notificationoutbox',
+            name='status',
+            field=models.CharField(choices=[('pending', 'ожидает отправки'), ('retrying', 'ожидает повторной отправки'), ('sending', 'отправляется'), ('sent', 'отправлено'), ('failed', 'не отправлено')], default='pending', max_length=10, verbose_name='статус отправки'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationoutbox',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'retrying', 'sending'])), fields=['next_attempt_at'], name='unsent_notification_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationoutbox',
+            index=models.Index(condition=models.Q(('status', 'sent')), fields=['sent_at'], name='sent_notification_idx'),
+        ),
+    ]
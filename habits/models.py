@@ -1,3 +1,6 @@
+import datetime
+import zoneinfo
+
 from django.db import models
 
 from config import settings
@@ -5,6 +8,31 @@ from config import settings
 NULLABLE = {'blank': True, 'null': True}
 
 
+def get_next_fire_at(execution_time, tz, now):
+    """
+    Returns the first reminder moment after `now` for an execution time in a timezone.
+
+    Reminders are sent `NOTIFICATION_LEAD_TIME` before the execution time. The days are counted in the timezone,
+    so the reminder keeps its local time over a DST change.
+
+    Args:
+        execution_time (datetime.time): The local execution time of a habit.
+        tz (zoneinfo.ZoneInfo): The timezone of the execution time.
+        now (datetime.datetime): The current UTC datetime.
+
+    Returns:
+        datetime.datetime: The UTC moment of the reminder.
+    """
+
+    fire_at = datetime.datetime.combine(
+        now.astimezone(tz).date(), execution_time, tzinfo=tz
+    ) - settings.NOTIFICATION_LEAD_TIME
+
+    while fire_at <= now:
+        fire_at += datetime.timedelta(days=1)
+    return fire_at.astimezone(datetime.timezone.utc)
+
+
 class Award(models.Model):
     """
     Model for representing awards.
@@ -12,6 +40,7 @@ class Award(models.Model):
     Attributes:
         user (ForeignKey): The user associated with the award.
         reward (TextField): The reward for completing a habit.
+        updated_at (DateTimeField): The moment of the last change of the award.
 
     Methods:
         __str__: Returns a string representation of the award.
@@ -20,12 +49,17 @@ class Award(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name='пользователь')
     reward = models.TextField(verbose_name='вознаграждение за выполнение')
 
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='дата изменения')
+
     def __str__(self):
         return f'{self.user} - {self.reward}'
 
     class Meta:
         verbose_name = 'вознаграждение'
         verbose_name_plural = 'вознаграждения'
+        indexes = [
+            models.Index(fields=['user', 'updated_at']),
+        ]
 
 
 class Habit(models.Model):
@@ -43,16 +77,25 @@ class Habit(models.Model):
         frequency (PositiveIntegerField): The frequency of the habit in days.
         time_to_complete (PositiveIntegerField): The time required to complete the habit.
         is_published (BooleanField): A flag indicating whether the habit is published.
+        next_fire_at (DateTimeField): The moment of the next reminder about the habit.
+        updated_at (DateTimeField): The moment of the last change of the habit.
 
     Methods:
         __str__: Returns a string representation of the habit.
+        get_timezone(): Returns the timezone of the owner of the habit.
+        get_next_fire_at(now, tz=None): Returns the first reminder moment after `now` for the execution time.
+        advance_next_fire_at(now, tz=None): Moves the next reminder forward by the frequency of the habit.
+        from_db(db, field_names, values): Loads a habit and remembers the frequency its reminder was scheduled for.
+        refresh_from_db(using=None, fields=None): Reloads the habit and remembers the frequency it was loaded with.
+        schedule_next_fire_at(): Recomputes the next reminder if the habit is new or its schedule has changed.
+        save(): Recomputes the next reminder if the schedule has changed and saves the habit.
     """
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name='пользователь')
     award = models.ForeignKey(Award, on_delete=models.SET_NULL, verbose_name='вознаграждение', **NULLABLE)
 
     place = models.CharField(max_length=200, verbose_name='место выполнения привычки')
-    execution_time = models.TimeField(verbose_name='время выполнения привычки')
+    execution_time = models.TimeField(db_index=True, verbose_name='время выполнения привычки')
     action = models.TextField(verbose_name='действие')
     is_pleasant = models.BooleanField(default=False, verbose_name='признак приятной привычки')
     related_habit = models.ForeignKey('self', **NULLABLE, on_delete=models.SET_NULL, verbose_name='связанная привычка',
@@ -62,9 +105,324 @@ class Habit(models.Model):
     time_to_complete = models.PositiveIntegerField(verbose_name='время на выполнение')
     is_published = models.BooleanField(default=False, verbose_name='признак публичности')
 
+    next_fire_at = models.DateTimeField(db_index=True, verbose_name='время следующего напоминания', **NULLABLE)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='дата изменения')
+
     def __str__(self):
         return f'{self.user} будет {self.action} в {self.execution_time} в {self.place}'
 
+    def get_timezone(self):
+        """
+        Returns the timezone of the owner of the habit, the execution time of the habit is given in.
+        """
+
+        return zoneinfo.ZoneInfo(self.user.timezone)
+
+    def get_next_fire_at(self, now, tz=None):
+        """
+        Returns the first reminder moment after `now` for the execution time of the habit.
+
+        Reminders are sent `NOTIFICATION_LEAD_TIME` before the execution time in the timezone of the user.
+
+        Args:
+            now (datetime.datetime): The current UTC datetime.
+            tz (zoneinfo.ZoneInfo): The timezone of the user, read from the user of the habit by default.
+
+        Returns:
+            datetime.datetime: The UTC moment of the reminder.
+        """
+
+        return get_next_fire_at(
+            self._meta.get_field('execution_time').to_python(self.execution_time), tz or self.get_timezone(), now
+        )
+
+    def advance_next_fire_at(self, now, tz=None):
+        """
+        Moves the next reminder forward by the frequency of the habit, skipping the reminders missed before `now`.
+
+        The days are counted in the timezone of the user, so the reminder keeps its local time over a DST change.
+
+        Args:
+            now (datetime.datetime): The current UTC datetime.
+            tz (zoneinfo.ZoneInfo): The timezone of the user, read from the user of the habit by default.
+        """
+
+        if self.next_fire_at > now:
+            return
+
+        period = datetime.timedelta(days=max(self.frequency, 1))
+        fire_at = self.next_fire_at.astimezone(tz or self.get_timezone())
+        fire_at += ((now - self.next_fire_at) // period) * period
+        while fire_at <= now:
+            fire_at += period
+        self.next_fire_at = fire_at.astimezone(datetime.timezone.utc)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Loads a habit and remembers the frequency its next reminder was scheduled for, unless it is deferred.
+        """
+
+        instance = super().from_db(db, field_names, values)
+        instance._scheduled_frequency = instance.__dict__.get('frequency')
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        """
+        Reloads the habit from the database and remembers the frequency it was loaded with.
+        """
+
+        super().refresh_from_db(using, fields)
+        if fields is None or 'frequency' in fields:
+            self._scheduled_frequency = self.frequency
+
+    def schedule_next_fire_at(self):
+        """
+        Recomputes the next reminder if the habit is new or its execution time or frequency has changed.
+
+        The execution time is compared with the local time of the next reminder, and the frequency with the one
+        the habit was loaded with.
+        """
+
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
+        if self.next_fire_at is None:
+            self.next_fire_at = self.get_next_fire_at(now)
+        else:
+            tz = self.get_timezone()
+            execution_time = self._meta.get_field('execution_time').to_python(self.execution_time)
+            scheduled_frequency = getattr(self, '_scheduled_frequency', None)
+            if (
+                (self.next_fire_at.astimezone(tz) + settings.NOTIFICATION_LEAD_TIME).time() != execution_time
+                or scheduled_frequency is not None and scheduled_frequency != self.frequency
+            ):
+                self.next_fire_at = self.get_next_fire_at(now, tz)
+        self._scheduled_frequency = self.frequency
+
+    def save(self, *args, **kwargs):
+        """
+        Recomputes the next reminder if the habit is new or its schedule has changed and saves the habit.
+        """
+
+        self.schedule_next_fire_at()
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'привычка'
         verbose_name_plural = 'привычки'
+        indexes = [
+            models.Index(fields=['user', 'updated_at']),
+        ]
+
+
+class NotificationOutbox(models.Model):
+    """
+    Model for representing the reminders waiting to be sent or already sent to users.
+
+    The sweep adds a row for every due reminder in the same transaction that moves the reminder of the habit
+    forward, and the sender tasks deliver the rows. A reminder of a habit is added once, as the pair of the habit
+    and the moment of the reminder is unique.
+
+    A sender task claims the reminders it sends by marking them as being sent until `next_attempt_at`, so the
+    reminders of a crashed task are sent again once the claim expires.
+
+    Attributes:
+        habit (ForeignKey): The habit the reminder is about.
+        fire_at (DateTimeField): The moment the reminder was due.
+        chat_id (BigIntegerField): The Telegram chat ID of the recipient.
+        text (TextField): The text of the reminder.
+        status (CharField): The delivery status of the reminder.
+        attempts (PositiveSmallIntegerField): The number of delivery attempts made.
+        next_attempt_at (DateTimeField): The moment of the next delivery attempt, or the end of the claim of a reminder
+            being sent.
+        last_error (TextField): The error of the last failed attempt.
+        created_at (DateTimeField): The moment the reminder was added.
+        sent_at (DateTimeField): The moment the reminder was delivered.
+
+    Methods:
+        __str__: Returns a string representation of the reminder.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_RETRYING = 'retrying'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'ожидает отправки'),
+        (STATUS_RETRYING, 'ожидает повторной отправки'),
+        (STATUS_SENDING, 'отправляется'),
+        (STATUS_SENT, 'отправлено'),
+        (STATUS_FAILED, 'не отправлено'),
+    )
+    UNSENT_STATUSES = (STATUS_PENDING, STATUS_RETRYING, STATUS_SENDING)
+
+    habit = models.ForeignKey(Habit, on_delete=models.CASCADE, verbose_name='привычка',
+                              related_name='notifications')
+    fire_at = models.DateTimeField(verbose_name='время напоминания')
+    chat_id = models.BigIntegerField(verbose_name='telegram id получателя')
+    text = models.TextField(verbose_name='текст напоминания')
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING,
+                              verbose_name='статус отправки')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='количество попыток отправки')
+    next_attempt_at = models.DateTimeField(verbose_name='время следующей попытки отправки')
+    last_error = models.TextField(verbose_name='ошибка последней попытки отправки', **NULLABLE)
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='дата создания')
+    sent_at = models.DateTimeField(verbose_name='дата отправки', **NULLABLE)
+
+    def __str__(self):
+        return f'{self.habit_id} в {self.fire_at} - {self.status}'
+
+    class Meta:
+        verbose_name = 'напоминание'
+        verbose_name_plural = 'напоминания'
+        constraints = [
+            models.UniqueConstraint(fields=['habit', 'fire_at'], name='unique_habit_notification'),
+        ]
+        indexes = [
+            # Only the unsent reminders are looked up by the sender tasks, so the sent ones are not indexed
+            models.Index(fields=['next_attempt_at'], condition=models.Q(status__in=['pending', 'retrying', 'sending']),
+                         name='unsent_notification_idx'),
+            # The sent reminders are only looked up to be pruned
+            models.Index(fields=['sent_at'], condition=models.Q(status='sent'), name='sent_notification_idx'),
+        ]
+
+
+class HabitCompletion(models.Model):
+    """
+    Model for representing a day a habit was done.
+
+    Attributes:
+        habit (ForeignKey): The habit that was done.
+        completed_on (DateField): The day the habit was done, in the timezone of the user.
+        created_at (DateTimeField): The moment the completion was recorded.
+
+    Methods:
+        __str__: Returns a string representation of the completion.
+    """
+
+    habit = models.ForeignKey(Habit, on_delete=models.CASCADE, verbose_name='привычка', related_name='completions')
+    completed_on = models.DateField(verbose_name='дата выполнения')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='дата создания')
+
+    def __str__(self):
+        return f'{self.habit_id} выполнена {self.completed_on}'
+
+    class Meta:
+        verbose_name = 'выполнение привычки'
+        verbose_name_plural = 'выполнения привычек'
+        constraints = [
+            models.UniqueConstraint(fields=['habit', 'completed_on'], name='unique_habit_completion'),
+        ]
+
+
+class HabitStats(models.Model):
+    """
+    Model for representing the aggregates of the completions of a habit, updated with every new completion.
+
+    A streak is a run of completions no more than `frequency` days apart. The days the habit was done recently are
+    kept as a bitmask, so the adherence is read without scanning the completions.
+
+    Attributes:
+        habit (OneToOneField): The habit the aggregates are about.
+        total_completions (PositiveIntegerField): The number of days the habit was done.
+        current_streak (PositiveIntegerField): The length of the streak ending with the last completion.
+        longest_streak (PositiveIntegerField): The length of the longest streak.
+        last_completed_on (DateField): The last day the habit was done.
+        history (BigIntegerField): The bitmask of the last `HISTORY_DAYS` days up to `last_completed_on`,
+            bit `i` is set if the habit was done `i` days before it.
+        updated_at (DateTimeField): The moment of the last change of the aggregates.
+
+    Methods:
+        __str__: Returns a string representation of the aggregates.
+        add_completion(completed_on, frequency): Adds a completion later than the last one to the aggregates.
+        get_current_streak(today, frequency): Returns the current streak, zero if it has been broken.
+        get_adherence(today, days, frequency): Returns the share of the expected completions done in the last days.
+    """
+
+    # The bitmask is stored in a signed 64-bit column
+    HISTORY_DAYS = 63
+
+    habit = models.OneToOneField(Habit, on_delete=models.CASCADE, primary_key=True, verbose_name='привычка',
+                                 related_name='stats')
+    total_completions = models.PositiveIntegerField(default=0, verbose_name='количество выполнений')
+    current_streak = models.PositiveIntegerField(default=0, verbose_name='текущая серия')
+    longest_streak = models.PositiveIntegerField(default=0, verbose_name='самая длинная серия')
+    last_completed_on = models.DateField(verbose_name='дата последнего выполнения', **NULLABLE)
+    history = models.BigIntegerField(default=0, verbose_name='выполнения за последние дни')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='дата изменения')
+
+    def __str__(self):
+        return f'{self.habit_id}: серия {self.current_streak}, выполнений {self.total_completions}'
+
+    def add_completion(self, completed_on, frequency):
+        """
+        Adds a completion later than the last one to the aggregates.
+
+        Args:
+            completed_on (datetime.date): The day the habit was done.
+            frequency (int): The frequency of the habit in days, 0 counts as daily like for the reminders.
+
+        Returns:
+            bool: False if the completion is not later than the last one and the aggregates have to be recomputed.
+        """
+
+        frequency = max(frequency, 1)
+        if self.last_completed_on is None:
+            self.current_streak = 1
+            self.history = 1
+        elif completed_on > self.last_completed_on:
+            gap = (completed_on - self.last_completed_on).days
+            self.current_streak = self.current_streak + 1 if gap <= frequency else 1
+            self.history = ((self.history << gap) | 1) & ((1 << self.HISTORY_DAYS) - 1)
+        else:
+            return False
+
+        self.total_completions += 1
+        self.longest_streak = max(self.longest_streak, self.current_streak)
+        self.last_completed_on = completed_on
+        return True
+
+    def get_current_streak(self, today, frequency):
+        """
+        Returns the current streak, zero if the habit has not been done for more than `frequency` days.
+
+        Args:
+            today (datetime.date): The current day in the timezone of the user.
+            frequency (int): The frequency of the habit in days, 0 counts as daily like for the reminders.
+        """
+
+        if self.last_completed_on is None or (today - self.last_completed_on).days > max(frequency, 1):
+            return 0
+        return self.current_streak
+
+    def get_adherence(self, today, days, frequency):
+        """
+        Returns the share of the expected completions done in the last days, today included.
+
+        Args:
+            today (datetime.date): The current day in the timezone of the user.
+            days (int): The number of days, at most `HISTORY_DAYS`.
+            frequency (int): The frequency of the habit in days, 0 counts as daily like for the reminders.
+
+        Returns:
+            float: The share from 0 to 1.
+        """
+
+        if self.last_completed_on is None:
+            return 0.0
+
+        # Bit `i` is the day `offset + i` days before today, the bits of the days within the period are counted
+        offset = (today - self.last_completed_on).days
+        first, last = max(-offset, 0), days - offset
+        if last <= first:
+            return 0.0
+
+        done = bin(self.history & ((1 << last) - (1 << first))).count('1')
+        expected = -(-days // max(frequency, 1))
+        return round(min(done / expected, 1.0), 4)
+
+    class Meta:
+        verbose_name = 'статистика привычки'
+        verbose_name_plural = 'статистика привычек'
@@ -0,0 +1,77 @@
+from string import Formatter
+
+# The fields of the `.values()` rows of due habits the reminders are built from
+NOTIFICATION_VALUES_FIELDS = (
+    'pk', 'next_fire_at', 'execution_time', 'frequency', 'action', 'place', 'time_to_complete', 'award__reward',
+    'user__telegram_id', 'user__language', 'user__timezone',
+)
+
+
+class NotificationTemplate:
+    """
+    Template of the text of a reminder in one language, compiled once.
+
+    The templates use the `str.format` syntax with the names of `NOTIFICATION_VALUES_FIELDS`. The field names are
+    checked when the template is created, so a typo fails at import time instead of in the sweep.
+
+    Attributes:
+        text (str): The template of the reminder.
+        award_text (str): The template appended to the reminder when the habit has an award.
+
+    Methods:
+        render(row): Returns the text of the reminder about a habit row.
+    """
+
+    def __init__(self, text, award_text):
+        for template in (text, award_text):
+            names = {name for _, name, _, _ in Formatter().parse(template) if name}
+            unknown = names - set(NOTIFICATION_VALUES_FIELDS)
+            if unknown:
+                raise ValueError(f'Unknown fields in the notification template: {", ".join(sorted(unknown))}')
+
+        self._render = text.format_map
+        self._render_award = award_text.format_map
+
+    def render(self, row):
+        """
+        Returns the text of the reminder about a habit row.
+
+        Args:
+            row (dict): The `.values()` row of a habit with the `NOTIFICATION_VALUES_FIELDS` keys.
+
+        Returns:
+            str: The text of the reminder.
+        """
+
+        if row['award__reward'] is None:
+            return self._render(row)
+        return self._render(row) + self._render_award(row)
+
+
+NOTIFICATION_TEMPLATES = {
+    'ru': NotificationTemplate(
+        'Вам напоминание:\n Вы хотели {action} в {execution_time}\n Где? Это прекрасное место - {place}\n'
+        ' Не ленитесь, это займет всего {time_to_complete} секунд',
+        '\nВ награду вы можете {award__reward}',
+    ),
+    'en': NotificationTemplate(
+        'A reminder for you:\n You wanted to {action} at {execution_time}\n Where? At a wonderful place - {place}\n'
+        " Don't be lazy, it only takes {time_to_complete} seconds",
+        '\nAs a reward you can {award__reward}',
+    ),
+}
+
+
+def render_notifications(rows):
+    """
+    Returns the texts of the reminders about habit rows, each in the language of the owner of the habit.
+
+    Args:
+        rows (Iterable[dict]): The `.values()` rows of habits with the `NOTIFICATION_VALUES_FIELDS` keys.
+
+    Returns:
+        list[str]: The texts of the reminders in the order of the rows.
+    """
+
+    templates = NOTIFICATION_TEMPLATES
+    return [templates[row['user__language']].render(row) for row in rows]
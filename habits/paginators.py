@@ -1,4 +1,11 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from urllib.parse import urlencode
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
 
 
 class HabitPaginator(PageNumberPagination):
@@ -14,3 +21,130 @@ class HabitPaginator(PageNumberPagination):
     page_size = 5
     page_size_query_param = 'page_size'
     max_page_size = 10
+
+
+class KeysetPaginator(CursorPagination):
+    """
+    Cursor (keyset) paginator for habits and awards.
+
+    Pages are selected by comparing the primary key with the cursor instead of an OFFSET, and no COUNT query is
+    made, so any page costs the same as the first one.
+
+    Attributes:
+        page_size (int): The number of objects to include on each page.
+        page_size_query_param (str): The query parameter for specifying the page size.
+        max_page_size (int): The maximum allowed page size.
+        ordering (str): The indexed field the pages are ordered by.
+    """
+
+    page_size = HabitPaginator.page_size
+    page_size_query_param = HabitPaginator.page_size_query_param
+    max_page_size = HabitPaginator.max_page_size
+    ordering = 'pk'
+
+
+class RankedKeysetPaginator(BasePagination):
+    """
+    Keyset paginator for `.values()` rows ordered by a `rank` annotation, the best first, and then by primary key.
+
+    The cursor holds the rank and the primary key of the last row of the page, so the next page is selected by
+    comparing them instead of an OFFSET and no COUNT query is made. Querysets without a `rank` are paginated by
+    primary key only.
+
+    Attributes:
+        page_size (int): The number of rows to include on each page.
+        page_size_query_param (str): The query parameter for specifying the page size.
+        max_page_size (int): The maximum allowed page size.
+        cursor_query_param (str): The query parameter of the cursor.
+
+    Methods:
+        paginate_queryset(queryset, request, view=None): Returns the rows of the page given by the cursor.
+        get_paginated_response(data): Returns the page with the link to the next one.
+    """
+
+    page_size = HabitPaginator.page_size
+    page_size_query_param = HabitPaginator.page_size_query_param
+    max_page_size = HabitPaginator.max_page_size
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Returns the rows of the page given by the cursor, the first page without a cursor.
+
+        Raises:
+            NotFound: If the cursor is invalid.
+        """
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        ranked = 'rank' in queryset.query.annotations
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            rank, pk = cursor
+            if ranked and rank is None:
+                raise NotFound(self.invalid_cursor_message)
+            if ranked:
+                queryset = queryset.filter(Q(rank__lt=rank) | Q(rank=rank, pk__gt=pk))
+            else:
+                queryset = queryset.filter(pk__gt=pk)
+
+        rows = list(queryset.order_by(*(('-rank', 'pk') if ranked else ('pk',)))[:page_size + 1])
+        self.next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_cursor = (rows[-1]['rank'] if ranked else None, rows[-1]['pk'])
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        """
+        Returns the URL of the next page, None on the last page.
+        """
+
+        if self.next_cursor is None:
+            return None
+
+        query = self.request.query_params.copy()
+        query[self.cursor_query_param] = base64.urlsafe_b64encode(json.dumps(self.next_cursor).encode()).decode()
+        return self.request.build_absolute_uri(f'{self.request.path}?{urlencode(sorted(query.items()))}')
+
+    def decode_cursor(self, request):
+        """
+        Returns the rank and the primary key of the cursor, None without a cursor.
+
+        Raises:
+            NotFound: If the cursor is invalid.
+        """
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            rank, pk = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if not isinstance(pk, int) or not isinstance(rank, (int, float, type(None))):
+                raise ValueError
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return rank, pk
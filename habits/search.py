@@ -0,0 +1,46 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import Cast, Greatest
+
+# The text search configuration of the habits, without stemming, as they are written in different languages
+SEARCH_CONFIG = 'simple'
+
+# The document searched by the full-text search, also the expression of the GIN index of the published habits
+SEARCH_VECTOR = SearchVector('action', 'place', config=SEARCH_CONFIG)
+
+
+def search_habits(queryset, text):
+    """
+    Filters habits by a search text matching their `action` or `place` and annotates them with the `rank` of the
+    match.
+
+    On PostgreSQL the text is matched by the full-text search, using the web search syntax, and by the trigram
+    similarity of the text to the most similar part of the action or the place, so misspelled words are found too;
+    both are served by the GIN indexes of the published habits. The rank adds up the text search rank and the best
+    similarity, as a double precision number, so it is kept exactly by the cursors of `RankedKeysetPaginator`.
+    Other databases match the text as a substring and rank all matches the same.
+
+    Args:
+        queryset (QuerySet): The queryset of habits, of `.values()` rows too.
+        text (str): The search text.
+
+    Returns:
+        QuerySet: The matching habits with the `rank` annotation.
+    """
+
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.filter(Q(action__icontains=text) | Q(place__icontains=text)).annotate(
+            rank=Value(0.0, output_field=FloatField())
+        )
+
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.alias(search=SEARCH_VECTOR).filter(
+        Q(search=query) | Q(action__trigram_word_similar=text) | Q(place__trigram_word_similar=text)
+    ).annotate(
+        rank=Cast(
+            SearchRank(SEARCH_VECTOR, query)
+            + Greatest(TrigramWordSimilarity(text, 'action'), TrigramWordSimilarity(text, 'place')),
+            output_field=FloatField()
+        )
+    )
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
 
 from habits.models import Award
+from habits.serializers.bulk import BulkListSerializer
 from users.models import User
 
 
@@ -11,10 +12,28 @@ class AwardSerializer(serializers.ModelSerializer):
 
     Attributes:
         user (SlugRelatedField): SlugRelatedField to represent the user by email.
+
+    Methods:
+        setup_eager_loading(queryset): Returns the queryset loading everything needed for serialization at once.
     """
 
     user = SlugRelatedField(slug_field='email', queryset=User.objects.all(), required=False)
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Returns the queryset loading everything needed for serialization in a single query.
+
+        Args:
+            queryset (QuerySet): The queryset of awards.
+
+        Returns:
+            QuerySet: The queryset with the related user joined and only the serialized columns selected.
+        """
+
+        return queryset.select_related('user').only('pk', 'user__email', 'reward')
+
     class Meta:
         model = Award
         fields = ('pk', 'user', 'reward',)
+        list_serializer_class = BulkListSerializer
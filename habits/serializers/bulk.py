@@ -0,0 +1,72 @@
+from rest_framework import serializers
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    List serializer writing all objects of a batch with bulk queries.
+
+    Attributes:
+        extra_update_fields (tuple): Fields set by `prepare_instances` that are updated in addition to the
+            validated ones.
+
+    Methods:
+        create(validated_data): Creates all objects with `bulk_create`.
+        update(instances, validated_data): Updates all objects with `bulk_update`.
+        prepare_instances(instances): Hook for setting derived fields before the objects are written.
+    """
+
+    extra_update_fields = ()
+
+    def create(self, validated_data):
+        """
+        Creates all objects with `bulk_create`.
+
+        Args:
+            validated_data (list[dict]): The validated data of each object.
+
+        Returns:
+            list: The created objects.
+        """
+
+        model = self.child.Meta.model
+        instances = [model(**attrs) for attrs in validated_data]
+        self.prepare_instances(instances)
+        return model.objects.bulk_create(instances)
+
+    def update(self, instances, validated_data):
+        """
+        Updates all objects with `bulk_update`.
+
+        Args:
+            instances (list): The objects to update.
+            validated_data (list[dict]): The validated data of each object, in the order of `instances`.
+
+        Returns:
+            list: The updated objects.
+        """
+
+        model = self.child.Meta.model
+        fields = set(self.extra_update_fields)
+        for instance, attrs in zip(instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+            fields.update(attrs)
+
+        # bulk_update does not set `auto_now` fields by itself
+        for model_field in model._meta.concrete_fields:
+            if getattr(model_field, 'auto_now', False):
+                for instance in instances:
+                    model_field.pre_save(instance, add=False)
+                fields.add(model_field.name)
+
+        self.prepare_instances(instances)
+        model.objects.bulk_update(instances, fields)
+        return instances
+
+    def prepare_instances(self, instances):
+        """
+        Hook for setting derived fields before the objects are written.
+
+        Args:
+            instances (list): The objects to write.
+        """
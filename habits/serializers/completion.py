@@ -0,0 +1,90 @@
+from rest_framework import serializers
+
+from habits.completions import get_local_today
+from habits.models import HabitStats
+
+
+class HabitCompletionSerializer(serializers.Serializer):
+    """
+    Serializer for marking a habit as done on a day.
+
+    The habits which can be marked are given by the `habits` dictionary of the context, mapping their primary keys
+    to the habits with the users loaded, so the items of a batch are validated without queries.
+
+    Attributes:
+        habit (serializers.IntegerField): The primary key of the habit that was done.
+        completed_on (serializers.DateField): The day the habit was done, today in the timezone of the user by
+            default.
+
+    Methods:
+        validate_habit(value): Returns the habit with the primary key.
+        validate(attrs): Sets the default day and checks that the day is not in the future.
+    """
+
+    habit = serializers.IntegerField()
+    completed_on = serializers.DateField(required=False)
+
+    def validate_habit(self, value):
+        """
+        Returns the habit with the primary key.
+
+        Raises:
+            serializers.ValidationError: If the habit does not exist or cannot be marked by the user.
+        """
+
+        habit = self.context['habits'].get(value)
+        if habit is None:
+            raise serializers.ValidationError(f'Invalid pk "{value}" - object does not exist.')
+        return habit
+
+    def validate(self, attrs):
+        """
+        Sets the default day and checks that the day is not in the future.
+
+        Raises:
+            serializers.ValidationError: If the day is later than today in the timezone of the user.
+        """
+
+        today = get_local_today(attrs['habit'].user)
+        attrs.setdefault('completed_on', today)
+        if attrs['completed_on'] > today:
+            raise serializers.ValidationError({'completed_on': ['The day of the completion is in the future.']})
+        return attrs
+
+
+class HabitStatsSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the HabitStats model.
+
+    The streak and the adherence depend on the current day in the timezone of the user, so they are computed from
+    the stored aggregates when the stats are read.
+
+    Attributes:
+        current_streak (serializers.SerializerMethodField): The current streak, zero if it has been broken.
+        adherence_7d (serializers.SerializerMethodField): The adherence over the last 7 days.
+        adherence_30d (serializers.SerializerMethodField): The adherence over the last 30 days.
+    """
+
+    current_streak = serializers.SerializerMethodField()
+    adherence_7d = serializers.SerializerMethodField()
+    adherence_30d = serializers.SerializerMethodField()
+
+    def to_representation(self, instance):
+        self._today = get_local_today(instance.habit.user)
+        return super().to_representation(instance)
+
+    def get_current_streak(self, obj):
+        return obj.get_current_streak(self._today, obj.habit.frequency)
+
+    def get_adherence_7d(self, obj):
+        return obj.get_adherence(self._today, 7, obj.habit.frequency)
+
+    def get_adherence_30d(self, obj):
+        return obj.get_adherence(self._today, 30, obj.habit.frequency)
+
+    class Meta:
+        model = HabitStats
+        fields = (
+            'habit', 'total_completions', 'current_streak', 'longest_streak', 'last_completed_on', 'adherence_7d',
+            'adherence_30d',
+        )
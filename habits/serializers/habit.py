@@ -3,10 +3,40 @@ from rest_framework.relations import SlugRelatedField
 from rest_framework.validators import UniqueTogetherValidator
 
 from habits import validators
+from habits.cache import invalidate_public_feed
 from habits.models import Habit
+from habits.serializers.bulk import BulkListSerializer
 from users.models import User
 
 
+class HabitListSerializer(BulkListSerializer):
+    """
+    List serializer writing batches of habits with bulk queries.
+
+    Bulk queries bypass `Habit.save` and the model signals, so the next reminders are scheduled and the public
+    habit feed is invalidated here.
+    """
+
+    extra_update_fields = ('next_fire_at',)
+
+    def create(self, validated_data):
+        habits = super().create(validated_data)
+        if any(habit.is_published for habit in habits):
+            invalidate_public_feed()
+        return habits
+
+    def update(self, instances, validated_data):
+        was_published = any(habit.is_published for habit in instances)
+        habits = super().update(instances, validated_data)
+        if was_published or any(habit.is_published for habit in habits):
+            invalidate_public_feed()
+        return habits
+
+    def prepare_instances(self, instances):
+        for habit in instances:
+            habit.schedule_next_fire_at()
+
+
 class HabitSerializer(serializers.ModelSerializer):
     """
     Serializer for the Habit model.
@@ -20,11 +50,13 @@ class HabitSerializer(serializers.ModelSerializer):
 
     Methods:
         get_telegram_id(obj): Returns the telegram_id from the related user.
+        setup_eager_loading(queryset): Returns the queryset loading everything needed for serialization at once.
 
     Meta:
         model (Habit): The Habit model.
         fields (tuple): The tuple of fields for serialization.
         validators (list): List of validators for the serializer.
+        list_serializer_class (HabitListSerializer): The serializer for batches of habits.
     """
 
     time_to_complete = serializers.IntegerField(validators=[validators.validator_time_to_complete])
@@ -55,6 +87,26 @@ class HabitSerializer(serializers.ModelSerializer):
 
         return obj.user.telegram_id if obj.user else None
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Returns the queryset loading everything needed for serialization in a single query.
+
+        The user is joined for `user` and `telegram_id`, while `award` and `related_habit` are represented by
+        the foreign key values and need no joins.
+
+        Args:
+            queryset (QuerySet): The queryset of habits.
+
+        Returns:
+            QuerySet: The queryset with the related user joined and only the serialized columns selected.
+        """
+
+        return queryset.select_related('user').only(
+            'pk', 'user__email', 'user__telegram_id', 'award', 'place', 'execution_time', 'action', 'is_pleasant',
+            'related_habit', 'frequency', 'time_to_complete', 'is_published',
+        )
+
     class Meta:
         model = Habit
         fields = (
@@ -67,5 +119,119 @@ class HabitSerializer(serializers.ModelSerializer):
                 fields=['award', 'related_habit', 'is_pleasant'],
             ),
             validators.validator_exclude_award_and_related_habit,
-            validators.validator_not_award_or_related_habit
+            validators.validator_not_award_or_related_habit,
+            validators.RelatedHabitChainValidator(),
         ]
+
+        list_serializer_class = HabitListSerializer
+
+
+class HabitReadSerializer(serializers.BaseSerializer):
+    """
+    Read-only serializer building the representation of habits straight from `.values()` rows.
+
+    The output is the same as the one of `HabitSerializer`, but no serializer fields are involved, which makes it
+    much faster for long lists.
+
+    Attributes:
+        VALUES_FIELDS (tuple): The fields of the `.values()` rows the representation is built from.
+
+    Methods:
+        setup_eager_loading(queryset): Returns the queryset of `.values()` rows with everything to be serialized.
+        to_representation(row): Returns the representation of a habit row.
+    """
+
+    VALUES_FIELDS = (
+        'pk', 'user__email', 'award_id', 'place', 'execution_time', 'action', 'is_pleasant', 'related_habit_id',
+        'frequency', 'time_to_complete', 'is_published', 'user__telegram_id',
+    )
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Returns the queryset of `.values()` rows with everything to be serialized, fetched in a single query.
+
+        Args:
+            queryset (QuerySet): The queryset of habits.
+
+        Returns:
+            QuerySet: The queryset of dicts with the `VALUES_FIELDS` keys.
+        """
+
+        return queryset.values(*cls.VALUES_FIELDS)
+
+    def to_representation(self, row):
+        """
+        Returns the representation of a habit row.
+
+        Args:
+            row (dict): The `.values()` row of a habit.
+
+        Returns:
+            dict: The same representation as the one of `HabitSerializer`.
+        """
+
+        execution_time = row['execution_time']
+        return {
+            'pk': row['pk'],
+            'user': row['user__email'],
+            'award': row['award_id'],
+            'place': row['place'],
+            'execution_time': execution_time.isoformat() if execution_time is not None else None,
+            'action': row['action'],
+            'is_pleasant': row['is_pleasant'],
+            'related_habit': row['related_habit_id'],
+            'frequency': row['frequency'],
+            'time_to_complete': row['time_to_complete'],
+            'is_published': row['is_published'],
+            'telegram_id': row['user__telegram_id'],
+        }
+
+
+class HabitImportSerializer(serializers.Serializer):
+    """
+    Serializer validating a row of the bulk import of habits.
+
+    The award and the related habit are given by their ids and are checked by `HabitImporter` for a whole chunk
+    of rows at once. Only the chain of a related habit is checked row by row, with one query, as for
+    `HabitSerializer`.
+
+    Meta:
+        validators (list): List of validators for the serializer.
+    """
+
+    place = serializers.CharField(max_length=200)
+    execution_time = serializers.TimeField()
+    action = serializers.CharField()
+    is_pleasant = serializers.BooleanField(default=False)
+    frequency = serializers.IntegerField(default=1, min_value=0, validators=[validators.validator_frequency])
+    time_to_complete = serializers.IntegerField(min_value=0, validators=[validators.validator_time_to_complete])
+    is_published = serializers.BooleanField(default=False)
+    award = serializers.IntegerField(allow_null=True, required=False)
+    related_habit = serializers.IntegerField(allow_null=True, required=False)
+
+    class Meta:
+        validators = [
+            validators.validator_exclude_award_and_related_habit,
+            validators.validator_not_award_or_related_habit,
+            validators.RelatedHabitChainValidator(),
+        ]
+
+
+class HabitSearchSerializer(serializers.Serializer):
+    """
+    Serializer validating the query parameters of the search of the public habit feed.
+
+    Attributes:
+        q (serializers.CharField): The search text matched against the action and the place.
+        time_from (serializers.TimeField): The earliest execution time.
+        time_to (serializers.TimeField): The latest execution time.
+        frequency (serializers.IntegerField): The frequency of the habits.
+        is_pleasant (serializers.BooleanField): Whether the habits are pleasant.
+    """
+
+    q = serializers.CharField(required=False, max_length=200)
+    time_from = serializers.TimeField(required=False)
+    time_to = serializers.TimeField(required=False)
+    frequency = serializers.IntegerField(required=False, min_value=1, validators=[validators.validator_frequency])
+    is_pleasant = serializers.BooleanField(required=False, allow_null=True, default=None)
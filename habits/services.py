@@ -1,6 +1,59 @@
+import asyncio
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import zoneinfo
+
+import httpx
 import requests
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
 
 from config import settings
+from habits.models import Habit, get_next_fire_at
+
+
+def get_habits_due_for_notification(now):
+    """
+    Returns the habits whose next reminder is due.
+
+    The filtering is done by the database using the index on `next_fire_at`, so the cost depends on the number of
+    due habits only.
+
+    Args:
+        now (datetime.datetime): The current UTC datetime.
+
+    Returns:
+        QuerySet: The due habits, with the related user and award already joined.
+    """
+
+    return Habit.objects.filter(next_fire_at__lte=now).select_related('user', 'award')
+
+
+def reschedule_habits(habits, now):
+    """
+    Recomputes the next reminders of habits, e.g. after their owners have changed the timezone.
+
+    The habits sharing a timezone and an execution time share the reminder moment, so it is computed once per
+    (timezone, execution time) group and written with a single UPDATE per group, however many habits there are.
+
+    Args:
+        habits (QuerySet): The habits to reschedule.
+        now (datetime.datetime): The current UTC datetime.
+
+    Returns:
+        int: The number of rescheduled habits.
+    """
+
+    groups = habits.order_by().values_list('user__timezone', 'execution_time').distinct()
+
+    updated = 0
+    for tz_name, execution_time in groups:
+        updated += habits.filter(user__timezone=tz_name, execution_time=execution_time).update(
+            next_fire_at=get_next_fire_at(execution_time, zoneinfo.ZoneInfo(tz_name), now)
+        )
+    return updated
 
 
 class TelegramNotificationBot:
@@ -36,5 +89,393 @@ class TelegramNotificationBot:
             data={
                 'chat_id': chat_id,
                 'text': text
-            }
+            },
+            timeout=settings.TELEGRAM_REQUEST_TIMEOUT
         )
+
+
+class SharedRateLimiter:
+    """
+    Rate limiter shared through the cache by all workers using the same key.
+
+    The time is divided into slots of `1 / rate` seconds, each of them taken by a single operation. An operation
+    takes the earliest free slot with the atomic `cache.add` and waits for the start of the slot, so the operations
+    of all workers are at least `1 / rate` seconds apart. The limiter is shared by all processes when the cache is,
+    i.e. with Redis, and expects the clocks of the workers to be synchronized.
+
+    Attributes:
+        key (str): The cache key prefix of the slots.
+        interval (float): The length of a slot in seconds.
+
+    Methods:
+        reserve() -> float:
+            Takes the earliest free slot and returns the seconds left until its start.
+        areserve() -> float:
+            Takes the earliest free slot without blocking the event loop.
+        acquire() -> None:
+            Blocks until the start of the earliest free slot.
+        aacquire() -> None:
+            Waits until the start of the earliest free slot without blocking the event loop.
+    """
+
+    def __init__(self, key, rate):
+        self.key = key
+        self.interval = 1 / rate
+        self._next_slot = 0
+
+    def reserve(self) -> float:
+        """
+        Takes the earliest free slot and returns the seconds left until its start.
+
+        Returns:
+            float: The delay before the operation.
+        """
+
+        slot = self._get_first_slot()
+        while not cache.add(*self._get_slot_item(slot)):
+            slot += 1
+        return self._take(slot)
+
+    async def areserve(self) -> float:
+        """
+        Takes the earliest free slot and returns the seconds left until its start, without blocking the event loop.
+
+        Returns:
+            float: The delay before the operation.
+        """
+
+        slot = self._get_first_slot()
+        while not await cache.aadd(*self._get_slot_item(slot)):
+            slot += 1
+        return self._take(slot)
+
+    def acquire(self) -> None:
+        """
+        Blocks until the start of the earliest free slot.
+
+        Returns:
+            None
+        """
+
+        time.sleep(self.reserve())
+
+    async def aacquire(self) -> None:
+        """
+        Waits until the start of the earliest free slot without blocking the event loop.
+
+        Returns:
+            None
+        """
+
+        await asyncio.sleep(await self.areserve())
+
+    def _get_first_slot(self):
+        # Slots before the last one taken by this limiter are known to be taken
+        return max(math.ceil(time.time() / self.interval), self._next_slot)
+
+    def _get_slot_item(self, slot):
+        timeout = math.ceil(slot * self.interval - time.time()) + 1
+        return f'{self.key}:{slot}', 1, max(timeout, 1)
+
+    def _take(self, slot):
+        self._next_slot = slot + 1
+        return max(slot * self.interval - time.time(), 0.0)
+
+
+@dataclass(frozen=True)
+class DeliveryResult:
+    """
+    Result of delivering a single message through the Telegram API.
+
+    Attributes:
+        chat_id (int): The chat ID of the recipient.
+        ok (bool): Whether the message was accepted by Telegram.
+        status_code (int | None): The HTTP status code of the last attempt, None if no response was received.
+        attempts (int): The number of attempts made.
+        error (str | None): The description of the error if the message was not delivered.
+    """
+
+    chat_id: int
+    ok: bool
+    status_code: int | None = None
+    attempts: int = 1
+    error: str | None = None
+
+    @property
+    def retryable(self):
+        """
+        Whether the message was not delivered because of a transient error and may be sent again.
+        """
+
+        return not self.ok and (
+            self.status_code is None or self.status_code in BaseTelegramDeliveryEngine.RETRY_STATUS_CODES
+        )
+
+
+class BaseTelegramDeliveryEngine:
+    """
+    Base class of the engines sending batches of messages through the Telegram API.
+
+    Attributes:
+        base_url (str): The base URL of the Telegram API.
+        token (str): The Telegram bot token.
+        max_workers (int): The maximum number of messages sent at once.
+        timeout (float): The timeout of a single HTTP request in seconds.
+        max_retries (int): The maximum number of retries of a single message.
+    """
+
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    MAX_RETRY_DELAY = 30
+    GLOBAL_RATE_LIMIT_KEY = 'telegram:rate:global'
+    CHAT_RATE_LIMIT_KEY = 'telegram:rate:chat:{}'
+
+    def __init__(self, token=None, base_url=None, max_workers=None, timeout=None, max_retries=None,
+                 global_rate=None, chat_rate=None):
+        self.token = token or settings.TELEGRAM_TOKEN
+        self.base_url = (base_url or settings.TELEGRAM_API_URL).rstrip('/')
+        self.max_workers = max_workers or settings.TELEGRAM_SEND_WORKERS
+        self.timeout = timeout or settings.TELEGRAM_REQUEST_TIMEOUT
+        self.max_retries = settings.TELEGRAM_MAX_RETRIES if max_retries is None else max_retries
+
+        self._global_limiter = SharedRateLimiter(
+            self.GLOBAL_RATE_LIMIT_KEY, global_rate or settings.TELEGRAM_GLOBAL_RATE_LIMIT
+        )
+        self._chat_rate = chat_rate or settings.TELEGRAM_CHAT_RATE_LIMIT
+
+    @property
+    def send_message_url(self):
+        return f'{self.base_url}/bot{self.token}/sendMessage'
+
+    def _get_chat_limiter(self, chat_id):
+        return SharedRateLimiter(self.CHAT_RATE_LIMIT_KEY.format(chat_id), self._chat_rate)
+
+    @classmethod
+    def _get_failure(cls, response, reason, retry_delay):
+        """
+        Returns the error of a rejected message and the delay before the retry, None if it must not be retried.
+        """
+
+        payload = cls._get_json(response)
+        error = payload.get('description') or reason
+        if response.status_code not in cls.RETRY_STATUS_CODES:
+            return error, None
+        retry_after = payload.get('parameters', {}).get('retry_after')
+        if retry_after is not None:
+            retry_delay = min(retry_after, cls.MAX_RETRY_DELAY)
+        return error, retry_delay
+
+    @staticmethod
+    def _get_json(response):
+        try:
+            payload = response.json()
+        except ValueError:
+            return {}
+        return payload if isinstance(payload, dict) else {}
+
+
+class TelegramDeliveryEngine(BaseTelegramDeliveryEngine):
+    """
+    Sends batches of messages through the Telegram API.
+
+    The engine reuses pooled HTTP connections of a single session, sends up to `max_workers` messages at once and
+    respects the global and per-chat rate limits of Telegram with rate limiters shared by all workers. Messages
+    rejected with `429 Too Many Requests`, server errors and network errors are retried up to `max_retries` times.
+
+    Methods:
+        send_batch(messages) -> list[DeliveryResult]:
+            Sends (chat_id, text) pairs and returns a result for each of them in the same order.
+        send(chat_id, text) -> DeliveryResult:
+            Sends a single message.
+        close() -> None:
+            Releases the pooled connections.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Releases the pooled connections.
+
+        Returns:
+            None
+        """
+
+        self.session.close()
+
+    def send_batch(self, messages) -> list[DeliveryResult]:
+        """
+        Sends a batch of messages concurrently.
+
+        Args:
+            messages (Iterable[tuple[int, str]]): The (chat_id, text) pairs to send.
+
+        Returns:
+            list[DeliveryResult]: The results in the same order as the messages.
+        """
+
+        messages = list(messages)
+        if not messages:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(messages))) as executor:
+            return list(executor.map(lambda message: self.send(*message), messages))
+
+    def send(self, chat_id, text) -> DeliveryResult:
+        """
+        Sends a single message, waiting for the rate limits and retrying transient failures.
+
+        Args:
+            chat_id (int): The chat ID of the recipient.
+            text (str): The text of the message.
+
+        Returns:
+            DeliveryResult: The result of the delivery.
+        """
+
+        status_code = None
+        error = None
+
+        for attempt in range(1, self.max_retries + 2):
+            self._get_chat_limiter(chat_id).acquire()
+            self._global_limiter.acquire()
+
+            retry_delay = min(2 ** (attempt - 1), self.MAX_RETRY_DELAY)
+            try:
+                response = self.session.post(
+                    url=self.send_message_url,
+                    data={
+                        'chat_id': chat_id,
+                        'text': text
+                    },
+                    timeout=self.timeout
+                )
+            except requests.RequestException as exc:
+                status_code, error = None, str(exc)
+            else:
+                status_code = response.status_code
+                if response.ok:
+                    return DeliveryResult(chat_id=chat_id, ok=True, status_code=status_code, attempts=attempt)
+
+                error, retry_delay = self._get_failure(response, response.reason, retry_delay)
+                if retry_delay is None:
+                    break
+
+            if attempt <= self.max_retries:
+                time.sleep(retry_delay)
+
+        return DeliveryResult(chat_id=chat_id, ok=False, status_code=status_code, attempts=attempt, error=error)
+
+
+class AsyncTelegramDeliveryEngine(BaseTelegramDeliveryEngine):
+    """
+    Sends batches of messages through the Telegram API from a single event loop.
+
+    The engine has the same rate limits and retries as `TelegramDeliveryEngine`, but the messages are sent by
+    coroutines sharing the pooled connections of an `httpx.AsyncClient` instead of a pool of threads, so
+    `max_workers` can be raised without the cost of threads. It must be used within a single event loop.
+
+    Methods:
+        send_batch(messages) -> list[DeliveryResult]:
+            Sends (chat_id, text) pairs concurrently and returns a result for each of them in the same order.
+        send(chat_id, text) -> DeliveryResult:
+            Sends a single message.
+        aclose() -> None:
+            Releases the pooled connections.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._semaphore = asyncio.Semaphore(self.max_workers)
+
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_workers, max_keepalive_connections=self.max_workers)
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Releases the pooled connections.
+
+        Returns:
+            None
+        """
+
+        await self.client.aclose()
+
+    async def send_batch(self, messages) -> list[DeliveryResult]:
+        """
+        Sends a batch of messages concurrently.
+
+        Args:
+            messages (Iterable[tuple[int, str]]): The (chat_id, text) pairs to send.
+
+        Returns:
+            list[DeliveryResult]: The results in the same order as the messages.
+        """
+
+        return list(await asyncio.gather(*(self.send(chat_id, text) for chat_id, text in messages)))
+
+    async def send(self, chat_id, text) -> DeliveryResult:
+        """
+        Sends a single message, waiting for the rate limits and retrying transient failures.
+
+        Args:
+            chat_id (int): The chat ID of the recipient.
+            text (str): The text of the message.
+
+        Returns:
+            DeliveryResult: The result of the delivery.
+        """
+
+        status_code = None
+        error = None
+
+        for attempt in range(1, self.max_retries + 2):
+            retry_delay = min(2 ** (attempt - 1), self.MAX_RETRY_DELAY)
+            try:
+                async with self._semaphore:
+                    # The slots are taken right before the request, so the messages waiting for the semaphore hold
+                    # none and cannot be sent at once after a stall
+                    await self._get_chat_limiter(chat_id).aacquire()
+                    await self._global_limiter.aacquire()
+                    response = await self.client.post(
+                        url=self.send_message_url,
+                        data={
+                            'chat_id': chat_id,
+                            'text': text
+                        }
+                    )
+            except httpx.HTTPError as exc:
+                status_code, error = None, str(exc) or type(exc).__name__
+            else:
+                status_code = response.status_code
+                if response.is_success:
+                    return DeliveryResult(chat_id=chat_id, ok=True, status_code=status_code, attempts=attempt)
+
+                error, retry_delay = self._get_failure(response, response.reason_phrase, retry_delay)
+                if retry_delay is None:
+                    break
+
+            if attempt <= self.max_retries:
+                await asyncio.sleep(retry_delay)
+
+        return DeliveryResult(chat_id=chat_id, ok=False, status_code=status_code, attempts=attempt, error=error)
@@ -0,0 +1,130 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from habits.cache import invalidate_lists, invalidate_public_feed
+from habits.models import Award, Habit
+from habits.services import reschedule_habits
+from users.models import User
+
+
+@receiver(pre_save, sender=Habit)
+def remember_habit_was_published(sender, instance, **kwargs):
+    """
+    Remembers whether an existing habit saved as not published was published before the save.
+    """
+
+    instance._was_published = bool(
+        instance.pk and not instance.is_published and
+        Habit.objects.filter(pk=instance.pk, is_published=True).exists()
+    )
+
+
+@receiver(post_save, sender=Habit)
+def invalidate_public_feed_on_save(sender, instance, **kwargs):
+    """
+    Invalidates the cached public habit feed when a published habit is saved or a habit is unpublished.
+    """
+
+    if instance.is_published or getattr(instance, '_was_published', False):
+        invalidate_public_feed()
+
+
+@receiver(post_delete, sender=Habit)
+def invalidate_public_feed_on_delete(sender, instance, **kwargs):
+    """
+    Invalidates the cached public habit feed when a published habit is deleted or a published habit is related to
+    the deleted one.
+    """
+
+    if instance.is_published or getattr(instance, '_has_published_dependents', False):
+        invalidate_public_feed()
+
+
+@receiver(post_delete, sender=Award)
+def invalidate_public_feed_on_award_delete(sender, instance, **kwargs):
+    """
+    Invalidates the cached public habit feed when an award is deleted, as its habits are set to no award by a
+    single query which sends no signals.
+    """
+
+    invalidate_public_feed()
+
+
+@receiver(post_save, sender=User)
+def invalidate_public_feed_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Invalidates the cached public habit feed showing the email and the telegram_id of a saved user, unless the user
+    is new and has no habits yet or only the last login is saved.
+    """
+
+    if not created and (update_fields is None or set(update_fields) - {'last_login'}):
+        invalidate_public_feed()
+
+
+@receiver(pre_save, sender=User)
+def remember_user_timezone(sender, instance, update_fields=None, **kwargs):
+    """
+    Remembers whether an existing user is saved with another timezone than before the save.
+    """
+
+    instance._timezone_changed = bool(
+        instance.pk and (update_fields is None or 'timezone' in update_fields) and
+        User.objects.filter(pk=instance.pk).exclude(timezone=instance.timezone).exists()
+    )
+
+
+@receiver(post_save, sender=User)
+def reschedule_habits_on_timezone_change(sender, instance, **kwargs):
+    """
+    Reschedules the reminders of the habits of a user whose timezone has changed.
+    """
+
+    if getattr(instance, '_timezone_changed', False):
+        reschedule_habits(Habit.objects.filter(user=instance), timezone.now())
+
+
+@receiver(post_save, sender=Habit)
+@receiver(post_save, sender=Award)
+def invalidate_lists_on_save(sender, instance, **kwargs):
+    """
+    Invalidates the lists of the owner of a saved habit or award.
+    """
+
+    invalidate_lists([instance.user_id])
+
+
+@receiver(pre_delete, sender=Habit)
+@receiver(pre_delete, sender=Award)
+def remember_dependent_users(sender, instance, **kwargs):
+    """
+    Remembers the owners of the habits whose award or related habit is set to null by a deletion, and whether any
+    of these habits is published.
+
+    These habits are updated with a single query which neither sends signals nor touches `updated_at`.
+    """
+
+    field = 'award' if sender is Award else 'related_habit'
+    dependents = set(Habit.objects.filter(**{field: instance}).values_list('user_id', 'is_published').distinct())
+    instance._dependent_user_ids = {user_id for user_id, _ in dependents}
+    instance._has_published_dependents = any(is_published for _, is_published in dependents)
+
+
+@receiver(post_delete, sender=Habit)
+@receiver(post_delete, sender=Award)
+def invalidate_lists_on_delete(sender, instance, **kwargs):
+    """
+    Invalidates the lists of the owner of a deleted habit or award and of the owners of the habits related to it.
+    """
+
+    invalidate_lists({instance.user_id, *getattr(instance, '_dependent_user_ids', ())})
+
+
+@receiver(post_save, sender=User)
+def invalidate_lists_on_user_save(sender, instance, update_fields=None, **kwargs):
+    """
+    Invalidates the lists showing the email and the telegram_id of a saved user, unless only the last login is saved.
+    """
+
+    if update_fields is None or set(update_fields) - {'last_login'}:
+        invalidate_lists([instance.pk])
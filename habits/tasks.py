@@ -1,49 +1,286 @@
+import asyncio
 import datetime
+import zoneinfo
 
-from celery import shared_task
+from celery import group, shared_task
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 
-from habits.models import Habit
-from habits.serializers.habit import HabitSerializer
-from habits.services import TelegramNotificationBot
+from config import settings
+from config.routers import read_from_replica
+from habits.models import Habit, NotificationOutbox
+from habits.notifications import NOTIFICATION_VALUES_FIELDS, render_notifications
+from habits.services import AsyncTelegramDeliveryEngine, TelegramDeliveryEngine, get_habits_due_for_notification
+
+
+def deliver_messages(messages, **options):
+    """
+    Sends the messages with the delivery engine selected by `TELEGRAM_ASYNC_DELIVERY`.
+
+    Args:
+        messages (list[tuple[int, str]]): The (chat_id, text) pairs to send.
+        options: The options of the delivery engine.
+
+    Returns:
+        list[DeliveryResult]: The results in the same order as the messages.
+    """
+
+    if settings.TELEGRAM_ASYNC_DELIVERY:
+        async def send():
+            async with AsyncTelegramDeliveryEngine(**options) as engine:
+                return await engine.send_batch(messages)
+
+        return asyncio.run(send())
+
+    with TelegramDeliveryEngine(**options) as engine:
+        return engine.send_batch(messages)
+
+
+def get_notification_shards(now, shard_size):
+    """
+    Splits the habits due for a notification into ranges of habit ids.
+
+    Args:
+        now (datetime.datetime): The current UTC datetime.
+        shard_size (int): The maximum number of due habits in one range.
+
+    Returns:
+        list[tuple[int, int]]: The inclusive (first_id, last_id) ranges in ascending order.
+    """
+
+    habit_ids = list(
+        get_habits_due_for_notification(now).order_by('pk').values_list('pk', flat=True)
+    )
+
+    return [
+        (shard[0], shard[-1])
+        for shard in (habit_ids[i:i + shard_size] for i in range(0, len(habit_ids), shard_size))
+    ]
 
 
 @shared_task
 def task_send_notification():
     """
-    Celery task to send habit notifications to users.
+    Celery task coordinating the sending of habit notifications to users.
+
+    Runs every minute. Splits the habits whose next reminder is due into ranges of habit
+    ids of at most `NOTIFICATION_SHARD_SIZE` habits and dispatches a `task_send_notification_shard` subtask for each
+    range, so the work is shared by all running workers.
 
-    Retrieves all habits from the database and checks if it's time to send notifications
-    to users based on the difference between the habit execution time and the current time.
-    If the time difference is within a certain range (1 to 2 hours), a notification is sent.
+    The due habits are scanned on a replica of the database. The subtasks select the due habits of their ranges
+    again on the primary database, so a lagging replica can delay a notification by a minute but never repeat it.
 
     Returns:
-        None
+        int: The number of dispatched subtasks.
     """
 
-    habits = Habit.objects.all()
+    now = datetime.datetime.now(tz=timezone.utc)
+    with read_from_replica():
+        shards = get_notification_shards(now, settings.NOTIFICATION_SHARD_SIZE)
 
-    now_time = datetime.datetime.utcnow().replace(tzinfo=timezone.utc).time()
+    if shards:
+        group(
+            task_send_notification_shard.s(now.isoformat(), first_id, last_id) for first_id, last_id in shards
+        ).apply_async()
 
-    for habit in habits:
-        serializer = HabitSerializer(habit)
-        habit_data = serializer.data
-        chat_id = habit_data.get('telegram_id')
+    return len(shards)
+
+
+@shared_task
+def task_send_notification_shard(now, first_id, last_id):
+    """
+    Celery task adding the reminders of the due habits within a range of habit ids to the notification outbox.
+
+    The reminders are added and the next reminder of each habit is moved forward by the frequency of the habit in
+    a single transaction, so a crashed or repeated subtask neither loses nor duplicates reminders. The reminders
+    are sent by `task_send_outbox_notifications`, started once the transaction is committed.
+
+    The habits are loaded as `.values()` rows with the award and the user joined, and the texts are rendered from
+    them by the compiled templates of `habits.notifications`.
+
+    Args:
+        now (str): The ISO formatted UTC datetime the coordinator used to select the due habits.
+        first_id (int): The first habit id of the range.
+        last_id (int): The last habit id of the range.
+
+    Returns:
+        int: The number of reminders added to the outbox.
+    """
+
+    now = datetime.datetime.fromisoformat(now)
+
+    with transaction.atomic():
+        rows = list(
+            get_habits_due_for_notification(now).filter(pk__gte=first_id, pk__lte=last_id).order_by('pk')
+            .select_for_update(skip_locked=True, of=('self',)).values(*NOTIFICATION_VALUES_FIELDS)
+        )
+        habits = []
+        for row in rows:
+            habit = Habit(pk=row['pk'], frequency=row['frequency'], next_fire_at=row['next_fire_at'])
+            habit.advance_next_fire_at(now, zoneinfo.ZoneInfo(row['user__timezone']))
+            habits.append(habit)
+
+        rows = [row for row in rows if row['user__telegram_id'] is not None]
+        notifications = [
+            NotificationOutbox(
+                habit_id=row['pk'],
+                fire_at=row['next_fire_at'],
+                chat_id=row['user__telegram_id'],
+                text=text,
+                next_attempt_at=now
+            )
+            for row, text in zip(rows, render_notifications(rows))
+        ]
+
+        NotificationOutbox.objects.bulk_create(notifications, ignore_conflicts=True)
+        Habit.objects.bulk_update(habits, ['next_fire_at'])
+
+        if notifications:
+            transaction.on_commit(task_send_outbox_notifications.delay)
+
+    return len(notifications)
+
+
+def claim_outbox_batch(batch_size, now):
+    """
+    Claims a batch of the reminders of the outbox which are due for a delivery attempt, in a short transaction.
 
-        habit_execution_time = habit.execution_time
+    The reminders are selected with `SELECT ... FOR UPDATE SKIP LOCKED`, so several sender tasks claim different
+    reminders, and marked as being sent until `NOTIFICATION_CLAIM_TIMEOUT` from now. Reminders left being sent by a
+    crashed task are claimed again once their claim has expired.
 
-        # Creating datetime objects with the same date, for subsequent subtraction
-        now_datetime = datetime.datetime.combine(datetime.date.today(), now_time)
-        habit_execution_datetime = datetime.datetime.combine(datetime.date.today(), habit_execution_time)
+    Args:
+        batch_size (int): The maximum number of claimed reminders.
+        now (datetime.datetime): The current datetime.
 
-        time_difference = habit_execution_datetime - now_datetime
+    Returns:
+        list[NotificationOutbox]: The claimed reminders, with the attempt counted.
+    """
+
+    claimed_until = now + settings.NOTIFICATION_CLAIM_TIMEOUT
+
+    with transaction.atomic():
+        notifications = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status__in=NotificationOutbox.UNSENT_STATUSES, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if notifications:
+            NotificationOutbox.objects.filter(pk__in=[notification.pk for notification in notifications]).update(
+                status=NotificationOutbox.STATUS_SENDING, next_attempt_at=claimed_until, attempts=F('attempts') + 1
+            )
+
+    for notification in notifications:
+        notification.status = NotificationOutbox.STATUS_SENDING
+        notification.next_attempt_at = claimed_until
+        notification.attempts += 1
+    return notifications
+
+
+def send_outbox_batch(batch_size):
+    """
+    Sends a batch of the reminders of the outbox which are due for a delivery attempt.
+
+    The reminders are claimed by `claim_outbox_batch`, sent outside of any transaction, and their new statuses are
+    saved in a second short transaction, so no database connection is held in a transaction while the messages
+    are sent. The statuses are saved only for the reminders still claimed by this batch. Reminders rejected with a
+    transient error are retried after `NOTIFICATION_RETRY_DELAY`, doubled after every attempt, up to
+    `NOTIFICATION_MAX_ATTEMPTS` attempts.
+
+    Args:
+        batch_size (int): The maximum number of reminders sent.
+
+    Returns:
+        tuple[int, int]: The numbers of delivered and of processed reminders.
+    """
+
+    now = timezone.now()
+    notifications = claim_outbox_batch(batch_size, now)
+    if not notifications:
+        return 0, 0
+
+    results = deliver_messages(
+        [(notification.chat_id, notification.text) for notification in notifications], max_retries=0
+    )
+
+    for notification, result in zip(notifications, results):
+        if result.ok:
+            notification.status = NotificationOutbox.STATUS_SENT
+            notification.sent_at = timezone.now()
+            notification.last_error = None
+        elif result.retryable and notification.attempts < settings.NOTIFICATION_MAX_ATTEMPTS:
+            notification.status = NotificationOutbox.STATUS_RETRYING
+            retry_delay = settings.NOTIFICATION_RETRY_DELAY * 2 ** (notification.attempts - 1)
+            notification.next_attempt_at = now + retry_delay
+            notification.last_error = result.error
+        else:
+            notification.status = NotificationOutbox.STATUS_FAILED
+            notification.last_error = result.error
+
+    with transaction.atomic():
+        claimed_ids = set(
+            NotificationOutbox.objects.select_for_update().filter(
+                pk__in=[notification.pk for notification in notifications],
+                status=NotificationOutbox.STATUS_SENDING,
+                next_attempt_at=now + settings.NOTIFICATION_CLAIM_TIMEOUT,
+            ).values_list('pk', flat=True)
+        )
+        NotificationOutbox.objects.bulk_update(
+            [notification for notification in notifications if notification.pk in claimed_ids],
+            ['status', 'next_attempt_at', 'last_error', 'sent_at']
+        )
+
+    return sum(result.ok for result in results), len(notifications)
+
+
+@shared_task
+def task_send_outbox_notifications(batch_size=None):
+    """
+    Celery task sending the reminders of the notification outbox batch by batch until none is due.
+
+    Runs every minute to retry the failed attempts and after every subtask of the sweep. Any number of these tasks
+    can run at once, each of them sends different reminders.
+
+    Args:
+        batch_size (int): The maximum number of reminders sent at once, `NOTIFICATION_OUTBOX_BATCH_SIZE` by default.
+
+    Returns:
+        int: The number of delivered reminders.
+    """
+
+    batch_size = batch_size or settings.NOTIFICATION_OUTBOX_BATCH_SIZE
+    delivered = 0
+
+    while True:
+        batch_delivered, processed = send_outbox_batch(batch_size)
+        delivered += batch_delivered
+        if processed < batch_size:
+            return delivered
+
+
+@shared_task
+def task_prune_outbox_notifications(batch_size=None):
+    """
+    Celery task deleting the reminders delivered more than `NOTIFICATION_OUTBOX_RETENTION` ago.
+
+    Runs every day. The reminders are deleted in batches of `NOTIFICATION_OUTBOX_BATCH_SIZE` reminders, each in its
+    own short query, so the outbox does not grow without bound.
+
+    Args:
+        batch_size (int): The maximum number of reminders deleted at once, `NOTIFICATION_OUTBOX_BATCH_SIZE` by
+            default.
+
+    Returns:
+        int: The number of deleted reminders.
+    """
 
-        if 3600 < time_difference.total_seconds() <= 2 * 3600:
-            text_to_send = (f'Вам напоминание:\n Вы хотели {habit.action} в {habit_execution_time}\n Где? Это'
-                            f' прекрасное место - {habit.place}\n Не ленитесь, это займет всего '
-                            f'{habit.time_to_complete} секунд')
-            if habit.award:
-                text_to_send += f'\nВ награду вы можете {habit.award.reward}'
+    batch_size = batch_size or settings.NOTIFICATION_OUTBOX_BATCH_SIZE
+    sent = NotificationOutbox.objects.filter(
+        status=NotificationOutbox.STATUS_SENT, sent_at__lt=timezone.now() - settings.NOTIFICATION_OUTBOX_RETENTION
+    )
+    deleted = 0
 
-            tg_bot = TelegramNotificationBot()
-            tg_bot.send_habit_notification(text_to_send, chat_id)
+    while notification_ids := list(sent.values_list('pk', flat=True)[:batch_size]):
+        deleted += NotificationOutbox.objects.filter(pk__in=notification_ids).delete()[0]
+    return deleted
@@ -1,8 +1,46 @@
+import csv
+import datetime
+import decimal
+import io
+import json
+import os
+import threading
+import time
+import zoneinfo
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs
+
+import msgpack
+import numpy as np
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, router
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APITestCase, APIClient
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
-from habits.models import Habit, Award
-from users.models import User
+from config import settings
+from config.renderers import ORJSONRenderer
+from config.routers import PRIMARY_PIN_KEY, read_from_replica
+from habits.analytics import build_habit_analytics
+from habits.calendar import escape_ics_text, fold_ics_line, local_to_utc, project_occurrences
+from habits.completions import compute_habit_stats, get_local_today, record_completions
+from habits.graph import check_related_habit
+from habits.importers import HabitImporter
+from habits.models import Award, Habit, HabitCompletion, HabitStats, NotificationOutbox
+from habits.notifications import NOTIFICATION_TEMPLATES, NotificationTemplate, render_notifications
+from habits.paginators import HabitPaginator
+from habits.serializers.habit import HabitReadSerializer, HabitSerializer
+from habits.services import AsyncTelegramDeliveryEngine, DeliveryResult, SharedRateLimiter, TelegramDeliveryEngine, \
+    get_habits_due_for_notification
+from habits.tasks import get_notification_shards, task_prune_outbox_notifications, task_send_notification, \
+    task_send_notification_shard, task_send_outbox_notifications
+from users.models import LANGUAGE_CHOICES, User
 
 
 class HabitTestCase(APITestCase):
@@ -177,6 +215,7 @@ class AwardTestCase(APITestCase):
         setUp(): Creates the test user, client, and sample Award object.
         test_award_create(): Tests the creation of an Award object through the API.
         test_award_list(): Tests the retrieval of a list of Award objects through the API.
+        test_award_list_keyset_pagination(): Tests the retrieval of a list of Award objects with keyset pagination.
         test_award_update(): Tests the update of an Award object through the API.
         test_award_delete(): Tests the deletion of an Award object through the API.
     """
@@ -248,6 +287,36 @@ class AwardTestCase(APITestCase):
             ]
         )
 
+    def test_award_list_keyset_pagination(self):
+        """
+        Test the retrieval of a list of Award objects through the API with keyset pagination.
+        """
+
+        response = self.client.get(
+            '/award/list/',
+            {'pagination': 'cursor'}
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK
+        )
+
+        self.assertEqual(
+            response.json(),
+            {
+                "next": None,
+                "previous": None,
+                "results": [
+                    {
+                        "pk": self.award.pk,
+                        "user": str(self.user.email),
+                        "reward": "test_award_habit"
+                    }
+                ]
+            }
+        )
+
     def test_award_update(self):
         """
         Test the update of an Award object through the API.
@@ -281,3 +350,2570 @@ class AwardTestCase(APITestCase):
             response.status_code,
             status.HTTP_204_NO_CONTENT
         )
+
+
+class HabitListQueryCountTestCase(APITestCase):
+    """
+    Test case for the number of queries made by the habit list API views.
+
+    Methods:
+        setUp(): Creates a test user with authentication and habits with awards and related habits.
+        test_habit_list_query_count(): Tests that the private list makes a fixed number of queries.
+        test_habit_public_list_query_count(): Tests that the public list makes a fixed number of queries.
+        test_habit_list_keyset_pagination(): Tests paging through the list with keyset pagination.
+        test_habit_read_serializer(): Tests that the read serializer returns the output of HabitSerializer.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a test user, a test client and habits with related objects.
+        """
+
+        self.user = User.objects.create(
+            email='test_queries@gmail.com',
+            password='test',
+            telegram_id=123456789
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        pleasant_habit = Habit.objects.create(
+            user=self.user,
+            place='test_place',
+            execution_time='20:00:00',
+            action='take_a_bath',
+            is_pleasant=True,
+            time_to_complete=100,
+            is_published=True
+        )
+        award = Award.objects.create(user=self.user, reward='test_award_habit')
+
+        for i in range(HabitPaginator.max_page_size):
+            Habit.objects.create(
+                user=self.user,
+                award=award if i % 2 else None,
+                related_habit=None if i % 2 else pleasant_habit,
+                place='test_place',
+                execution_time='21:00:00',
+                action=f'run_in_gym_{i}',
+                time_to_complete=100,
+                is_published=True
+            )
+
+    def test_habit_list_query_count(self):
+        """
+        Test that the private list makes the same number of queries for any page size.
+        """
+
+        for page_size in (1, HabitPaginator.page_size, HabitPaginator.max_page_size):
+            with self.assertNumQueries(3):
+                response = self.client.get('/habit/list/', {'page_size': page_size})
+
+            self.assertEqual(len(response.json()['results']), page_size)
+
+    def test_habit_public_list_query_count(self):
+        """
+        Test that the public list makes the same number of queries for any page size.
+        """
+
+        self.client.force_authenticate(user=None)
+
+        for page_size in (1, HabitPaginator.page_size, HabitPaginator.max_page_size):
+            with self.assertNumQueries(2):
+                response = self.client.get('/habit/list/public/', {'page_size': page_size})
+
+            self.assertEqual(len(response.json()['results']), page_size)
+
+    def test_habit_list_keyset_pagination(self):
+        """
+        Test paging through the list with keyset pagination, making a single query per page besides the ETag one.
+        """
+
+        habit_pks = []
+        url = '/habit/list/?pagination=cursor&page_size=3'
+
+        while url:
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+
+            data = response.json()
+            self.assertNotIn('count', data)
+            habit_pks += [habit['pk'] for habit in data['results']]
+            url = data['next']
+
+        self.assertEqual(habit_pks, list(Habit.objects.order_by('pk').values_list('pk', flat=True)))
+
+    def test_habit_read_serializer(self):
+        """
+        Test that the read serializer returns the same output as HabitSerializer.
+        """
+
+        habits = Habit.objects.order_by('pk')
+
+        self.assertEqual(
+            HabitReadSerializer(HabitReadSerializer.setup_eager_loading(habits), many=True).data,
+            HabitSerializer(HabitSerializer.setup_eager_loading(habits), many=True).data
+        )
+
+
+class PublicFeedCacheTestCase(APITestCase):
+    """
+    Test case for caching the public habit feed.
+
+    Methods:
+        setUp(): Creates a test user, a published and a private habit and clears the cache.
+        test_public_feed_cached(): Tests that a cached page is served without queries.
+        test_public_feed_invalidated(): Tests that changes of published habits invalidate the cache.
+        test_public_feed_not_invalidated(): Tests that changes of private habits keep the cache.
+        test_public_feed_invalidated_by_user_and_award(): Tests that saving a user and deleting an award invalidate
+            the cache.
+        test_public_feed_invalidated_by_related_habit(): Tests that deleting the related habit of a published habit
+            invalidates the cache.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a test user, a published and a private habit and clearing the cache.
+        """
+
+        cache.clear()
+        self.user = User.objects.create(
+            email='test_feed@gmail.com',
+            password='test'
+        )
+
+        self.published_habit, self.private_habit = (
+            Habit.objects.create(
+                user=self.user,
+                place='test_place',
+                execution_time='21:00:00',
+                action='run_in_gym',
+                time_to_complete=100,
+                is_published=is_published
+            )
+            for is_published in (True, False)
+        )
+
+    def get_feed_actions(self, **params):
+        """
+        Returns the actions of the habits on a page of the public feed.
+        """
+
+        response = self.client.get('/habit/list/public/', params)
+        return [habit['action'] for habit in response.json()['results']]
+
+    def test_public_feed_cached(self):
+        """
+        Test that a cached page is served without queries and pages of other sizes are cached separately.
+        """
+
+        self.assertEqual(self.get_feed_actions(), ['run_in_gym'])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_feed_actions(), ['run_in_gym'])
+
+        with self.assertNumQueries(2):
+            self.get_feed_actions(page_size=1)
+
+    def test_public_feed_invalidated(self):
+        """
+        Test that publishing, updating, unpublishing and deleting published habits invalidate the cache.
+        """
+
+        self.get_feed_actions()
+
+        self.private_habit.is_published = True
+        self.private_habit.save()
+        self.assertEqual(self.get_feed_actions(), ['run_in_gym', 'run_in_gym'])
+
+        self.published_habit.action = 'read_a_book'
+        self.published_habit.save()
+        self.assertEqual(self.get_feed_actions(), ['read_a_book', 'run_in_gym'])
+
+        self.private_habit.is_published = False
+        self.private_habit.save()
+        self.assertEqual(self.get_feed_actions(), ['read_a_book'])
+
+        self.published_habit.delete()
+        self.assertEqual(self.get_feed_actions(), [])
+
+    def test_public_feed_not_invalidated(self):
+        """
+        Test that saving a habit that is neither published nor was published keeps the cache.
+        """
+
+        self.get_feed_actions()
+
+        self.private_habit.action = 'read_a_book'
+        self.private_habit.save()
+
+        with self.assertNumQueries(0):
+            self.get_feed_actions()
+
+    def test_public_feed_invalidated_by_user_and_award(self):
+        """
+        Test that saving the owner of a published habit and deleting its award invalidate the cache, while saving
+        the last login of the owner keeps it.
+        """
+
+        award = Award.objects.create(user=self.user, reward='test_award')
+        Habit.objects.filter(pk=self.published_habit.pk).update(award=award)
+
+        def get_feed():
+            return self.client.get('/habit/list/public/').json()['results'][0]
+
+        get_feed()
+        self.user.telegram_id = 123
+        self.user.save()
+        self.assertEqual(get_feed()['telegram_id'], 123)
+
+        self.user.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            get_feed()
+
+        award.delete()
+        self.assertIsNone(get_feed()['award'])
+
+    def test_public_feed_invalidated_by_related_habit(self):
+        """
+        Test that deleting a private habit related to a published habit, which sets the related habit of the published
+        habit to null, invalidates the cache.
+        """
+
+        Habit.objects.filter(pk=self.private_habit.pk).update(is_pleasant=True)
+        Habit.objects.filter(pk=self.published_habit.pk).update(related_habit=self.private_habit)
+
+        def get_feed():
+            return self.client.get('/habit/list/public/').json()['results'][0]
+
+        self.assertEqual(get_feed()['related_habit'], self.private_habit.pk)
+        self.private_habit.delete()
+        self.assertIsNone(get_feed()['related_habit'])
+
+
+class ConditionalListTestCase(APITestCase):
+    """
+    Test case for conditional GET requests of the habit and award lists.
+
+    Methods:
+        setUp(): Creates and authenticates a test user with a habit and an award.
+        test_habit_list_not_modified(): Tests that an unchanged list is answered with 304 after a single query.
+        test_habit_list_modified(): Tests that updating and deleting habits changes the ETag.
+        test_habit_list_modified_since(): Tests that deleting a habit moves Last-Modified.
+        test_award_list_not_modified(): Tests conditional GET requests of the award list.
+        test_habit_list_award_deleted(): Tests that deleting an award set on a habit changes the ETag.
+        test_habit_list_superuser_modified(): Tests that changing a listed user changes the ETag of a superuser.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating and authenticating a test user with a habit and an award.
+        """
+
+        self.user = User.objects.create(
+            email='test_etag@gmail.com',
+            password='test'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.habit = Habit.objects.create(
+            user=self.user,
+            place='test_place',
+            execution_time='21:00:00',
+            action='run_in_gym',
+            time_to_complete=100
+        )
+        self.award = Award.objects.create(user=self.user, reward='test_award')
+
+    def test_habit_list_not_modified(self):
+        """
+        Test that an unchanged list is answered with 304 Not Modified after a single query.
+        """
+
+        response = self.client.get('/habit/list/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('Accept', response['Vary'])
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/habit/list/', HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+        response = self.client.get('/habit/list/', {'page_size': 1}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_habit_list_modified(self):
+        """
+        Test that updating and deleting habits changes the ETag of the list.
+        """
+
+        etag = self.client.get('/habit/list/')['ETag']
+
+        Habit.objects.filter(pk=self.habit.pk).update(
+            action='read_a_book', updated_at=self.habit.updated_at + datetime.timedelta(seconds=1)
+        )
+        response = self.client.get('/habit/list/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['results'][0]['action'], 'read_a_book')
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        self.habit.delete()
+        response = self.client.get('/habit/list/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+
+    def test_habit_list_modified_since(self):
+        """
+        Test that deleting a habit, which leaves the `updated_at` of the other habits, moves the Last-Modified of
+        the list for clients sending only If-Modified-Since.
+        """
+
+        Habit.objects.create(
+            user=self.user, place='test_place', execution_time='22:00:00', action='read', time_to_complete=100
+        )
+        last_modified = self.client.get('/habit/list/')['Last-Modified']
+
+        response = self.client.get('/habit/list/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # The deletion happens a few seconds later, as Last-Modified is given in seconds
+        with mock.patch('habits.cache.time.time_ns', return_value=time.time_ns() + 5 * 10 ** 9):
+            self.habit.delete()
+        response = self.client.get('/habit/list/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_award_list_not_modified(self):
+        """
+        Test that an unchanged award list is answered with 304 Not Modified and a changed one with the list.
+        """
+
+        etag = self.client.get('/award/list/')['ETag']
+
+        response = self.client.get('/award/list/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Award.objects.create(user=self.user, reward='test_award_2')
+        response = self.client.get('/award/list/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_habit_list_award_deleted(self):
+        """
+        Test that deleting an award, which sets the award of its habits to null without touching `updated_at`,
+        changes the ETag of the habit list.
+        """
+
+        self.habit.award = self.award
+        self.habit.save()
+        etag = self.client.get('/habit/list/')['ETag']
+
+        self.award.delete()
+        response = self.client.get('/habit/list/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.json()['results'][0]['award'])
+
+    def test_habit_list_superuser_modified(self):
+        """
+        Test that changing the telegram_id of a user whose habits are listed to a superuser changes the ETag.
+        """
+
+        superuser = User.objects.create(email='test_etag_admin@gmail.com', is_superuser=True)
+        self.client.force_authenticate(user=superuser)
+        etag = self.client.get('/habit/list/')['ETag']
+
+        self.user.telegram_id = 123
+        self.user.save()
+        response = self.client.get('/habit/list/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['results'][0]['telegram_id'], 123)
+
+        etag = response['ETag']
+        self.user.save(update_fields=['last_login'])
+        response = self.client.get('/habit/list/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class AsyncAPITestCase(APITestCase):
+    """
+    Test case for the async habit and award views.
+
+    Methods:
+        setUp(): Creates a test user with habits and an award, and a habit of another user.
+        test_async_habit_list(): Tests paging through the habits of the user.
+        test_async_habit_detail(): Tests retrieving a habit and hiding the habits of other users.
+        test_async_award_list(): Tests retrieving the awards of the user.
+        test_async_not_authenticated(): Tests that requests without a valid token are rejected.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a test user with habits and an award, and a habit of another user.
+        """
+
+        self.user = User.objects.create(email='test_async@gmail.com', telegram_id=123456789)
+        self.other_user = User.objects.create(email='test_async_other@gmail.com')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+        self.habits = [
+            Habit.objects.create(
+                user=user,
+                place='test_place',
+                execution_time='21:00:00',
+                action=f'run_in_gym_{i}',
+                time_to_complete=100
+            )
+            for i, user in enumerate((self.user, self.user, self.other_user, self.user))
+        ]
+        self.award = Award.objects.create(user=self.user, reward='test_award')
+
+    def test_async_habit_list(self):
+        """
+        Test paging through the habits of the user, with the same representation as the one of the sync list.
+        """
+
+        response = self.client.get('/habit/async/list/', {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['results'], HabitSerializer(self.habits[:2], many=True).data)
+
+        data = self.client.get(data['next']).json()
+        self.assertEqual([habit['pk'] for habit in data['results']], [self.habits[3].pk])
+        self.assertIsNone(data['next'])
+
+    def test_async_habit_detail(self):
+        """
+        Test retrieving a habit of the user and hiding the habits of other users.
+        """
+
+        response = self.client.get(f'/habit/async/{self.habits[0].pk}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), HabitSerializer(self.habits[0]).data)
+
+        response = self.client.get(f'/habit/async/{self.habits[2].pk}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_async_award_list(self):
+        """
+        Test retrieving the awards of the user and an award by its primary key.
+        """
+
+        response = self.client.get('/award/async/list/')
+        self.assertEqual(
+            response.json(),
+            {'next': None, 'results': [{'pk': self.award.pk, 'user': self.user.email, 'reward': 'test_award'}]}
+        )
+
+        response = self.client.get(f'/award/async/{self.award.pk}/')
+        self.assertEqual(response.json()['reward'], 'test_award')
+
+    def test_async_not_authenticated(self):
+        """
+        Test that requests without a token or with an invalid one are rejected with 401 Unauthorized.
+        """
+
+        self.client.credentials()
+        response = self.client.get('/habit/async/list/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('WWW-Authenticate', response)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        response = self.client.get('/habit/async/list/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class DatabaseConnectionStatsTestCase(APITestCase):
+    """
+    Test case for the database connection counters.
+
+    Methods:
+        setUp(): Creates a superuser and a regular user.
+        test_connection_stats(): Tests that requests with an open connection are counted as reusing it.
+        test_connection_stats_not_superuser(): Tests that the counters are available to superusers only.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a superuser and a regular user.
+        """
+
+        self.superuser = User.objects.create(email='test_db_admin@gmail.com', is_superuser=True)
+        self.user = User.objects.create(email='test_db_user@gmail.com')
+
+    def test_connection_stats(self):
+        """
+        Test that requests starting with an open connection within `CONN_MAX_AGE` are counted as reusing it.
+
+        The connection of the test stays open, so its end of life is set explicitly whatever `CONN_MAX_AGE` is.
+        """
+
+        self.client.force_authenticate(user=self.superuser)
+
+        stats = self.client.get('/db/connections/').json()
+        self.assertEqual(stats['pid'], os.getpid())
+
+        # A connection without a maximum age is reused by every request
+        with mock.patch.object(connection, 'close_at', None):
+            self.client.get('/award/list/')
+            self.assertEqual(self.client.get('/db/connections/').json()['reused'], stats['reused'] + 2)
+
+        # An expired connection is not
+        with mock.patch.object(connection, 'close_at', 0):
+            self.client.get('/award/list/')
+            self.assertEqual(self.client.get('/db/connections/').json()['reused'], stats['reused'] + 2)
+
+    def test_connection_stats_not_superuser(self):
+        """
+        Test that the counters are not available to regular users.
+        """
+
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get('/db/connections/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ReplicaRouterTestCase(APITestCase):
+    """
+    Test case for routing reads to the replicas of the database.
+
+    The replica alias is replaced with the default database, so the routing decisions are tested without a second
+    database.
+
+    Methods:
+        setUp(): Creates and authenticates a test user and configures a replica.
+        test_read_from_replica(): Tests that only the reads within `read_from_replica` go to the replica.
+        test_list_read_from_replica(): Tests that the lists and the notification sweep read from the replica.
+        test_read_your_writes(): Tests that the reads of a user stay on the primary database after the user's writes.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating and authenticating a test user and configuring a replica.
+        """
+
+        cache.clear()
+        self.user = User.objects.create(email='test_replica@gmail.com')
+        self.client.force_authenticate(user=self.user)
+
+        patcher = mock.patch('config.settings.DATABASE_REPLICAS', ['replica_1'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_read_from_replica(self):
+        """
+        Test that the reads within `read_from_replica` go to the replica and all writes to the primary database.
+        """
+
+        self.assertEqual(Habit.objects.all().db, 'default')
+
+        with read_from_replica():
+            self.assertEqual(Habit.objects.all().db, 'replica_1')
+            self.assertEqual(router.db_for_write(Habit), 'default')
+
+            with read_from_replica(primary=True):
+                self.assertEqual(Habit.objects.all().db, 'default')
+
+        with mock.patch('config.settings.DATABASE_REPLICAS', []), read_from_replica():
+            self.assertEqual(Habit.objects.all().db, 'default')
+
+    def test_list_read_from_replica(self):
+        """
+        Test that the habit and award lists, the public feed and the notification sweep read from the replica.
+        """
+
+        with mock.patch('config.routers.get_replica_alias', return_value='default') as get_replica_alias:
+            for url in ('/habit/list/', '/award/list/', '/habit/list/public/'):
+                get_replica_alias.reset_mock()
+                self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+                get_replica_alias.assert_called()
+
+            get_replica_alias.reset_mock()
+            task_send_notification()
+            get_replica_alias.assert_called_once()
+
+    def test_read_your_writes(self):
+        """
+        Test that the reads of a user stay on the primary database after the user's writes until the pin expires.
+        """
+
+        with mock.patch('config.routers.get_replica_alias', return_value='default') as get_replica_alias:
+            self.client.post('/award/create/', {'reward': 'test_award'})
+
+            response = self.client.get('/award/list/')
+            self.assertEqual(response.json()[0]['reward'], 'test_award')
+            get_replica_alias.assert_not_called()
+
+            cache.delete(PRIMARY_PIN_KEY.format(self.user.pk))
+            self.client.get('/award/list/')
+            get_replica_alias.assert_called()
+
+
+class BulkAPITestCase(APITestCase):
+    """
+    Test case for the bulk API views of habits and awards.
+
+    Methods:
+        setUp(): Creates a test user with authentication, another user and habits of both users.
+        test_habit_bulk_create(): Tests creating a list of habits.
+        test_habit_bulk_create_invalid(): Tests that invalid items are reported and nothing is created.
+        test_habit_bulk_update(): Tests partially updating a list of habits.
+        test_habit_bulk_update_owners_joined(): Tests that the owners of the updated habits are not queried one by one.
+        test_habit_bulk_update_not_owner(): Tests that habits of other users are reported as not found.
+        test_habit_bulk_update_invalid_pks(): Tests that booleans and repeated primary keys are rejected.
+        test_habit_bulk_update_not_unique(): Tests that the unique sets of fields are checked within the request.
+        test_habit_bulk_delete(): Tests deleting a list of habits.
+        test_award_bulk_create(): Tests creating a list of awards.
+        test_award_bulk_update(): Tests partially updating a list of awards with their owners joined.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a test user, a test client, another user and habits of both users.
+        """
+
+        self.user = User.objects.create(
+            email='test_bulk@gmail.com',
+            password='test'
+        )
+        self.other_user = User.objects.create(
+            email='test_bulk_other@gmail.com',
+            password='test'
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.habits = [
+            Habit.objects.create(
+                user=user,
+                place='test_place',
+                execution_time='21:00:00',
+                action='run_in_gym',
+                time_to_complete=100
+            )
+            for user in (self.user, self.user, self.other_user)
+        ]
+
+    def test_habit_bulk_create(self):
+        """
+        Test creating a list of habits for the current user with scheduled reminders.
+        """
+
+        data = [
+            {
+                "place": "test_place",
+                "award": None,
+                "execution_time": f"0{i}:00:00",
+                "action": f"run_in_gym_{i}",
+                "is_pleasant": False,
+                "related_habit": None,
+                "frequency": 1,
+                "time_to_complete": 100
+            }
+            for i in range(5)
+        ]
+
+        response = self.client.post('/habit/bulk/create/', data=data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.json()), 5)
+
+        habits = Habit.objects.filter(action__startswith='run_in_gym_', user=self.user)
+        self.assertEqual(habits.count(), 5)
+        self.assertFalse(habits.filter(next_fire_at__isnull=True).exists())
+
+    def test_habit_bulk_create_invalid(self):
+        """
+        Test that errors are reported per item and no habit is created if any item is invalid.
+        """
+
+        data = [
+            {
+                "place": "test_place",
+                "award": None,
+                "execution_time": "21:00:00",
+                "action": "run_in_gym_valid",
+                "is_pleasant": False,
+                "related_habit": None,
+                "frequency": 1,
+                "time_to_complete": time_to_complete
+            }
+            for time_to_complete in (100, 150)
+        ]
+
+        response = self.client.post('/habit/bulk/create/', data=data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()[0], {})
+        self.assertIn('time_to_complete', response.json()[1])
+        self.assertFalse(Habit.objects.filter(action='run_in_gym_valid').exists())
+
+    def test_habit_bulk_update(self):
+        """
+        Test partially updating a list of habits and rescheduling the reminders of changed execution times.
+        """
+
+        data = [
+            {"pk": self.habits[0].pk, "place": "updated_test_place"},
+            {"pk": self.habits[1].pk, "execution_time": "08:30:00"},
+        ]
+
+        response = self.client.patch('/habit/bulk/update/', data=data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([habit['pk'] for habit in response.json()], [self.habits[0].pk, self.habits[1].pk])
+
+        for habit in self.habits:
+            habit.refresh_from_db()
+        self.assertEqual(self.habits[0].place, 'updated_test_place')
+        self.assertEqual(self.habits[1].execution_time, datetime.time(8, 30))
+        self.assertEqual(self.habits[1].next_fire_at.time(), datetime.time(7, 30))
+
+    def test_habit_bulk_update_owners_joined(self):
+        """
+        Test that the owners of the updated habits are joined to reschedule and represent the habits.
+        """
+
+        data = [{"pk": habit.pk, "execution_time": "08:30:00"} for habit in self.habits[:2]]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch('/habit/bulk/update/', data=data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([habit['user'] for habit in response.json()], [self.user.email] * 2)
+        self.assertFalse([query for query in queries.captured_queries if 'FROM "users_user"' in query['sql']])
+
+    def test_habit_bulk_update_not_owner(self):
+        """
+        Test that habits of other users are reported as not found and nothing is updated.
+        """
+
+        data = [
+            {"pk": self.habits[0].pk, "place": "updated_test_place"},
+            {"pk": self.habits[2].pk, "place": "updated_test_place"},
+        ]
+
+        response = self.client.patch('/habit/bulk/update/', data=data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), [{}, {'pk': ['Object not found.']}])
+        self.assertFalse(Habit.objects.filter(place='updated_test_place').exists())
+
+    def test_habit_bulk_update_invalid_pks(self):
+        """
+        Test that booleans are not taken for primary keys and that a habit may be updated once per request.
+        """
+
+        # A habit of the user with the primary key 1, which `True` would be taken for
+        Habit.objects.filter(pk=1).delete()
+        Habit.objects.create(
+            pk=1, user=self.user, place='test_place', execution_time='21:00:00', action='read', time_to_complete=100
+        )
+
+        data = [
+            {"pk": True, "place": "updated_test_place"},
+            {"pk": self.habits[1].pk, "place": "updated_test_place"},
+            {"pk": self.habits[1].pk, "place": "updated_test_place_2"},
+        ]
+
+        response = self.client.patch('/habit/bulk/update/', data=data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), [{'pk': ['Object not found.']}, {}, {'pk': ['Duplicate object.']}])
+        self.assertFalse(Habit.objects.filter(place__startswith='updated_test_place').exists())
+
+        response = self.client.delete('/habit/bulk/delete/', data=[True], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Habit.objects.filter(pk=1).exists())
+
+    def test_habit_bulk_update_not_unique(self):
+        """
+        Test that two habits of a request are not given the same award, related habit and pleasantness.
+        """
+
+        award = Award.objects.create(user=self.user, reward='test_award')
+        related_habit = Habit.objects.create(
+            user=self.user, place='test_place', execution_time='22:00:00', action='rest', is_pleasant=True,
+            time_to_complete=100
+        )
+        data = [{"pk": habit.pk, "award": award.pk, "related_habit": related_habit.pk} for habit in self.habits[:2]]
+
+        # Only the unique set is validated, as the other validators reject habits with both an award and a related habit
+        with mock.patch.object(HabitSerializer.Meta, 'validators', HabitSerializer.Meta.validators[:1]):
+            response = self.client.patch('/habit/bulk/update/', data=data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(),
+            [{}, {'non_field_errors': ['The fields award, related_habit, is_pleasant must make a unique set.']}]
+        )
+        self.assertFalse(Habit.objects.filter(award=award).exists())
+
+    def test_habit_bulk_delete(self):
+        """
+        Test deleting a list of habits of the current user.
+        """
+
+        response = self.client.delete(
+            '/habit/bulk/delete/', data=[self.habits[0].pk, self.habits[1].pk], format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(Habit.objects.all()), [self.habits[2]])
+
+    def test_award_bulk_create(self):
+        """
+        Test creating a list of awards for the current user.
+        """
+
+        response = self.client.post(
+            '/award/bulk/create/',
+            data=[{"reward": "test_award_habit"}, {"reward": "test_award_habit_2"}],
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Award.objects.filter(user=self.user).count(), 2)
+
+    def test_award_bulk_update(self):
+        """
+        Test partially updating a list of awards with their owners joined to represent them.
+        """
+
+        awards = [Award.objects.create(user=self.user, reward=f'test_award_{i}') for i in range(2)]
+        data = [{"pk": award.pk, "reward": f"updated_award_{award.pk}"} for award in awards]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch('/award/bulk/update/', data=data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            [{'pk': award.pk, 'user': self.user.email, 'reward': f'updated_award_{award.pk}'} for award in awards]
+        )
+        self.assertFalse([query for query in queries.captured_queries if 'FROM "users_user"' in query['sql']])
+
+
+class ExportTestCase(APITestCase):
+    """
+    Test case for the streaming export of habits and awards.
+
+    Methods:
+        setUp(): Creates a test user with authentication, an award and habits of the user and of another user.
+        test_habit_export_jsonl(): Tests exporting the user's habits as JSON Lines.
+        test_habit_export_csv(): Tests exporting the user's habits as CSV.
+        test_award_export(): Tests exporting the user's awards.
+        test_export_invalid_format(): Tests that unsupported formats are rejected.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a test user, a test client, an award and habits.
+        """
+
+        self.user = User.objects.create(
+            email='test_export@gmail.com',
+            password='test'
+        )
+        other_user = User.objects.create(
+            email='test_export_other@gmail.com',
+            password='test'
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.award = Award.objects.create(user=self.user, reward='test_award_habit')
+        self.habits = [
+            Habit.objects.create(
+                user=user,
+                award=self.award if user == self.user else None,
+                place='test_place',
+                execution_time='21:00:00',
+                action='run_in_gym',
+                time_to_complete=100
+            )
+            for user in (self.user, self.user, other_user)
+        ]
+
+    def get_export(self, url, **params):
+        """
+        Returns the response and the streamed content of an export.
+        """
+
+        response = self.client.get(url, params)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_habit_export_jsonl(self):
+        """
+        Test exporting the user's habits as JSON Lines in the format of the API responses.
+        """
+
+        response, content = self.get_export('/habit/export/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual(
+            [json.loads(line) for line in content.splitlines()],
+            [
+                {
+                    "pk": habit.pk,
+                    "user": self.user.email,
+                    "award": self.award.pk,
+                    "place": "test_place",
+                    "execution_time": "21:00:00",
+                    "action": "run_in_gym",
+                    "is_pleasant": False,
+                    "related_habit": None,
+                    "frequency": 1,
+                    "time_to_complete": 100,
+                    "is_published": False
+                }
+                for habit in self.habits[:2]
+            ]
+        )
+
+    def test_habit_export_csv(self):
+        """
+        Test exporting the user's habits as CSV with a header line.
+        """
+
+        response, content = self.get_export('/habit/export/', file_format='csv')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="habits.csv"')
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([int(row['pk']) for row in rows], [habit.pk for habit in self.habits[:2]])
+        self.assertEqual(rows[0]['execution_time'], '21:00:00')
+        self.assertEqual(rows[0]['user'], self.user.email)
+
+    def test_award_export(self):
+        """
+        Test exporting the user's awards as JSON Lines.
+        """
+
+        response, content = self.get_export('/award/export/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            json.loads(content),
+            {"pk": self.award.pk, "user": self.user.email, "reward": "test_award_habit"}
+        )
+
+    def test_export_invalid_format(self):
+        """
+        Test that unsupported export formats are rejected.
+        """
+
+        response = self.client.get('/habit/export/', {'file_format': 'xml'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ImportTestCase(APITestCase):
+    """
+    Test case for the bulk import of habits.
+
+    Methods:
+        setUp(): Creates a test user with authentication, an award and a pleasant and a useful habit.
+        test_import_jsonl(): Tests importing valid and invalid rows from JSON Lines in chunks.
+        test_import_csv(): Tests importing habits from an uploaded CSV file.
+        test_import_foreign_ids(): Tests that awards and habits of other users are rejected.
+        test_import_chain_depth(): Tests that chains longer than `RELATED_HABIT_MAX_DEPTH` links are rejected.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a test user, a test client, an award and habits to relate to.
+        """
+
+        self.user = User.objects.create(
+            email='test_import@gmail.com',
+            password='test'
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.award = Award.objects.create(user=self.user, reward='test_award_habit')
+        self.pleasant_habit, self.useful_habit = (
+            Habit.objects.create(
+                user=self.user,
+                place='test_place',
+                execution_time='21:00:00',
+                action='take_a_bath',
+                is_pleasant=is_pleasant,
+                time_to_complete=100
+            )
+            for is_pleasant in (True, False)
+        )
+
+    def test_import_jsonl(self):
+        """
+        Test importing valid rows and rejecting invalid ones with a fixed number of queries per chunk.
+        """
+
+        rows = [
+            {"place": "test_place", "execution_time": "07:00:00", "action": "run", "time_to_complete": 100},
+            {"place": "test_place", "execution_time": "07:00:00", "action": "run", "time_to_complete": 150},
+            {"place": "test_place", "execution_time": "07:00:00", "action": "run", "time_to_complete": 100,
+             "award": self.award.pk},
+            {"place": "test_place", "execution_time": "07:00:00", "action": "run", "time_to_complete": 100,
+             "related_habit": self.pleasant_habit.pk},
+            {"place": "test_place", "execution_time": "07:00:00", "action": "run", "time_to_complete": 100,
+             "related_habit": self.useful_habit.pk},
+            {"place": "test_place", "execution_time": "07:00:00", "action": "run", "time_to_complete": 100,
+             "award": 0},
+        ]
+        lines = [json.dumps(row) + '\n' for row in rows] + ['not json\n']
+
+        # Three queries for the first chunk, two for the second one with no valid row to insert and the chains of
+        # the two related habits
+        with self.assertNumQueries(3 + 2 + 2):
+            report = HabitImporter(self.user, chunk_size=4).run(lines, 'jsonl')
+
+        self.assertEqual(report.created, 3)
+        self.assertEqual([error['line'] for error in report.errors], [2, 5, 6, 7])
+        self.assertIn('time_to_complete', report.errors[0]['errors'])
+        self.assertEqual(
+            Habit.objects.filter(action='run', user=self.user, next_fire_at__isnull=False).count(), 3
+        )
+
+    def test_import_csv(self):
+        """
+        Test importing habits from an uploaded CSV file.
+        """
+
+        content = (
+            'place,execution_time,action,frequency,time_to_complete,is_published,award\n'
+            f'test_place,07:00:00,run,2,100,true,{self.award.pk}\n'
+            'test_place,08:00:00,read,1,60,false,\n'
+        )
+
+        response = self.client.post(
+            '/habit/import/',
+            {'file': SimpleUploadedFile('habits.csv', content.encode(), content_type='text/csv')}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(response.json()['rejected'], 0)
+
+        habit = Habit.objects.get(action='run')
+        self.assertEqual((habit.frequency, habit.is_published, habit.award), (2, True, self.award))
+
+    def test_import_foreign_ids(self):
+        """
+        Test that awards and pleasant habits of other users are rejected as if they did not exist.
+        """
+
+        other_user = User.objects.create(email='test_import_other@gmail.com', password='test')
+        award = Award.objects.create(user=other_user, reward='other_award')
+        habit = Habit.objects.create(
+            user=other_user, place='test_place', execution_time='21:00:00', action='take_a_bath', is_pleasant=True,
+            time_to_complete=100
+        )
+
+        rows = [
+            {"place": "test_place", "execution_time": "07:00:00", "action": "run", "time_to_complete": 100,
+             "award": award.pk},
+            {"place": "test_place", "execution_time": "07:00:00", "action": "run", "time_to_complete": 100,
+             "related_habit": habit.pk},
+        ]
+        report = HabitImporter(self.user).run([json.dumps(row) for row in rows], 'jsonl')
+
+        self.assertEqual(report.created, 0)
+        self.assertEqual(report.errors, [
+            {'line': 1, 'errors': {'award': [HabitImporter.DOES_NOT_EXIST.format(award.pk)]}},
+            {'line': 2, 'errors': {'related_habit': [HabitImporter.DOES_NOT_EXIST.format(habit.pk)]}},
+        ])
+
+    def test_import_chain_depth(self):
+        """
+        Test that rows making a chain of related habits longer than `RELATED_HABIT_MAX_DEPTH` links are rejected,
+        as by `HabitSerializer`.
+        """
+
+        linked_habit = Habit.objects.create(
+            user=self.user, place='test_place', execution_time='21:00:00', action='read', is_pleasant=True,
+            time_to_complete=100
+        )
+        Habit.objects.filter(pk=linked_habit.pk).update(related_habit=self.pleasant_habit)
+
+        row = {"place": "test_place", "execution_time": "07:00:00", "action": "run", "time_to_complete": 100}
+        lines = [json.dumps(dict(row, related_habit=habit.pk)) for habit in (self.pleasant_habit, linked_habit)]
+
+        with mock.patch('config.settings.RELATED_HABIT_MAX_DEPTH', 1):
+            report = HabitImporter(self.user).run(lines, 'jsonl')
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual(
+            report.errors,
+            [{'line': 2, 'errors': {'related_habit': ['A chain of related habits cannot be longer than 1 links.']}}]
+        )
+
+
+class RendererTestCase(APITestCase):
+    """
+    Test case for the orjson and MessagePack renderers and parsers.
+
+    Methods:
+        setUp(): Creates a test user with authentication and a habit.
+        test_orjson_renderer(): Tests that the orjson renderer produces the same JSON as JSONRenderer.
+        test_msgpack_response(): Tests rendering a list as MessagePack when it is accepted.
+        test_msgpack_request(): Tests parsing a MessagePack request.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a test user, a test client and a habit.
+        """
+
+        self.user = User.objects.create(
+            email='test_renderer@gmail.com',
+            password='test'
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.habit = Habit.objects.create(
+            user=self.user,
+            place='парк',
+            execution_time='21:00:00',
+            action='run_in_gym',
+            time_to_complete=100
+        )
+
+    def test_orjson_renderer(self):
+        """
+        Test that the orjson renderer produces the same JSON as JSONRenderer for times, decimals and unicode.
+        """
+
+        data = {
+            'time': datetime.time(21, 0, 30, 123456),
+            'datetime': datetime.datetime(2024, 1, 1, 10, 0, 0, 123456, tzinfo=timezone.utc),
+            'date': datetime.date(2024, 1, 1),
+            'decimal': decimal.Decimal('1.50'),
+            'text': 'привычка \u2028',
+            'list': [1, None, True, 1.5],
+        }
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_msgpack_response(self):
+        """
+        Test rendering the habit list as MessagePack when it is accepted by the client.
+        """
+
+        response = self.client.get('/habit/list/', HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+
+        data = msgpack.unpackb(response.content)
+        self.assertEqual(data['results'][0]['execution_time'], '21:00:00')
+        self.assertEqual(data['results'][0]['place'], 'парк')
+
+    def test_msgpack_request(self):
+        """
+        Test creating an award from a MessagePack request.
+        """
+
+        response = self.client.post('/award/create/', {'reward': 'test_award_habit'}, format='msgpack')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Award.objects.filter(user=self.user, reward='test_award_habit').exists())
+
+
+class NotificationScheduleTestCase(TestCase):
+    """
+    Test case for scheduling the reminders of habits.
+
+    Methods:
+        setUp(): Creates a user with a telegram id and a habit.
+        test_next_fire_at_on_create(): Tests that the next reminder is scheduled when a habit is created.
+        test_next_fire_at_on_update(): Tests that the next reminder is rescheduled only when the schedule changes.
+        test_advance_next_fire_at(): Tests that the next reminder is moved forward by the frequency.
+        test_next_fire_at_in_user_timezone(): Tests that the execution time is taken in the timezone of the user.
+        test_advance_next_fire_at_over_dst(): Tests that the next reminder keeps its local time over a DST change.
+        test_reschedule_on_timezone_change(): Tests that the reminders are rescheduled when the timezone changes.
+        test_due_habits(): Tests that only habits with a due reminder are selected.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a user with a telegram id and a habit.
+        """
+
+        self.now = datetime.datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc)
+        self.user = User.objects.create(
+            email='test_notification@gmail.com',
+            password='test',
+            telegram_id=123456789
+        )
+
+        self.habit = Habit.objects.create(
+            user=self.user,
+            place='test_place',
+            execution_time='21:00:00',
+            action='run_in_gym',
+            frequency=7,
+            time_to_complete=100
+        )
+
+    def test_next_fire_at_on_create(self):
+        """
+        Test that the next reminder is scheduled one hour before the execution time when a habit is created.
+        """
+
+        self.assertEqual(self.habit.next_fire_at.time(), datetime.time(20, 0))
+        self.assertGreater(self.habit.next_fire_at, timezone.now())
+        self.assertLessEqual(self.habit.next_fire_at, timezone.now() + datetime.timedelta(days=1))
+
+        self.assertEqual(
+            self.habit.get_next_fire_at(self.now),
+            datetime.datetime(2024, 1, 1, 20, 0, tzinfo=timezone.utc)
+        )
+        self.assertEqual(
+            self.habit.get_next_fire_at(datetime.datetime(2024, 1, 1, 20, 0, tzinfo=timezone.utc)),
+            datetime.datetime(2024, 1, 2, 20, 0, tzinfo=timezone.utc)
+        )
+
+    def test_next_fire_at_on_update(self):
+        """
+        Test that the next reminder is rescheduled only when the execution time or the frequency of the habit changes.
+        """
+
+        next_fire_at = self.habit.next_fire_at + datetime.timedelta(days=3)
+        Habit.objects.filter(pk=self.habit.pk).update(next_fire_at=next_fire_at)
+        self.habit.refresh_from_db()
+
+        self.habit.place = 'updated_test_place'
+        self.habit.save()
+        self.assertEqual(self.habit.next_fire_at, next_fire_at)
+
+        self.habit.execution_time = datetime.time(8, 30)
+        self.habit.save()
+        self.assertEqual(self.habit.next_fire_at.time(), datetime.time(7, 30))
+        self.assertLessEqual(self.habit.next_fire_at, timezone.now() + datetime.timedelta(days=1))
+
+        next_fire_at = self.habit.next_fire_at + datetime.timedelta(days=3)
+        Habit.objects.filter(pk=self.habit.pk).update(next_fire_at=next_fire_at)
+        for habit in (self.habit, Habit.objects.get(pk=self.habit.pk)):
+            habit.refresh_from_db()
+            habit.frequency = 1
+            habit.save()
+            self.assertEqual(habit.next_fire_at.time(), datetime.time(7, 30))
+            self.assertLessEqual(habit.next_fire_at, timezone.now() + datetime.timedelta(days=1))
+
+            Habit.objects.filter(pk=self.habit.pk).update(next_fire_at=next_fire_at, frequency=7)
+
+    def test_advance_next_fire_at(self):
+        """
+        Test that the next reminder is moved forward by the frequency, skipping the missed reminders.
+        """
+
+        self.habit.next_fire_at = self.now - datetime.timedelta(minutes=1)
+        self.habit.advance_next_fire_at(self.now)
+        self.assertEqual(self.habit.next_fire_at, self.now + datetime.timedelta(days=7, minutes=-1))
+
+        self.habit.next_fire_at = self.now - datetime.timedelta(days=10)
+        self.habit.advance_next_fire_at(self.now)
+        self.assertEqual(self.habit.next_fire_at, self.now + datetime.timedelta(days=4))
+
+    def test_next_fire_at_in_user_timezone(self):
+        """
+        Test that the execution time of a habit is taken in the timezone of the user.
+        """
+
+        self.user.timezone = 'Europe/Minsk'
+        self.user.save()
+        self.habit.refresh_from_db()
+
+        # 21:00 in Minsk (UTC+3) is 18:00 UTC, the reminder is one hour earlier
+        self.assertEqual(
+            self.habit.get_next_fire_at(self.now),
+            datetime.datetime(2024, 1, 1, 17, 0, tzinfo=timezone.utc)
+        )
+        # 20:30 UTC is already January 2 in Minsk
+        self.assertEqual(
+            self.habit.get_next_fire_at(datetime.datetime(2024, 1, 1, 20, 30, tzinfo=timezone.utc)),
+            datetime.datetime(2024, 1, 2, 17, 0, tzinfo=timezone.utc)
+        )
+
+    def test_advance_next_fire_at_over_dst(self):
+        """
+        Test that the next reminder keeps its local time when the offset of the timezone changes.
+        """
+
+        tz = zoneinfo.ZoneInfo('Europe/Berlin')
+        # 20:00 in Berlin on March 30, 2024 is 19:00 UTC, the next day is in summer time (UTC+2)
+        self.habit.frequency = 1
+        self.habit.next_fire_at = datetime.datetime(2024, 3, 30, 19, 0, tzinfo=timezone.utc)
+        self.habit.advance_next_fire_at(datetime.datetime(2024, 3, 30, 19, 0, tzinfo=timezone.utc), tz)
+        self.assertEqual(self.habit.next_fire_at, datetime.datetime(2024, 3, 31, 18, 0, tzinfo=timezone.utc))
+
+    def test_reschedule_on_timezone_change(self):
+        """
+        Test that the reminders of the habits of a user are rescheduled in bulk when the user changes the timezone.
+        """
+
+        Habit.objects.create(
+            user=self.user,
+            place='test_place',
+            execution_time='21:00:00',
+            action='read',
+            frequency=1,
+            time_to_complete=100
+        )
+        Habit.objects.create(
+            user=self.user,
+            place='test_place',
+            execution_time='08:00:00',
+            action='walk',
+            frequency=1,
+            time_to_complete=100
+        )
+
+        self.user.timezone = 'Asia/Tokyo'
+        # One query for the previous timezone, one for the update, one for the groups and one UPDATE per group
+        with self.assertNumQueries(5):
+            self.user.save()
+
+        local_times = {
+            (fire_at.astimezone(zoneinfo.ZoneInfo('Asia/Tokyo')) + settings.NOTIFICATION_LEAD_TIME).time()
+            for fire_at in Habit.objects.filter(user=self.user).values_list('next_fire_at', flat=True)
+        }
+        self.assertEqual(local_times, {datetime.time(21, 0), datetime.time(8, 0)})
+
+        self.user.first_name = 'test'
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['first_name'])
+
+    def test_due_habits(self):
+        """
+        Test that only habits whose next reminder is not later than the current time are selected.
+        """
+
+        Habit.objects.filter(pk=self.habit.pk).update(next_fire_at=self.now)
+        self.assertEqual(list(get_habits_due_for_notification(self.now)), [self.habit])
+
+        Habit.objects.filter(pk=self.habit.pk).update(next_fire_at=self.now + datetime.timedelta(minutes=1))
+        self.assertEqual(list(get_habits_due_for_notification(self.now)), [])
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of a local fake Telegram API server.
+
+    Messages to chat 0 are rejected, the first message to chat 429 is rate limited, all others are accepted.
+    """
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        message = {key: values[0] for key, values in parse_qs(body).items()}
+
+        with self.server.lock:
+            self.server.received.append((self.path, message))
+            first_attempt = sum(m['chat_id'] == message['chat_id'] for _, m in self.server.received) == 1
+
+        if message['chat_id'] == '0':
+            self._reply(400, {'ok': False, 'description': 'Bad Request: chat not found'})
+        elif message['chat_id'] == '429' and first_attempt:
+            self._reply(429, {'ok': False, 'description': 'Too Many Requests', 'parameters': {'retry_after': 0}})
+        else:
+            self._reply(200, {'ok': True, 'result': {}})
+
+    def _reply(self, status_code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TelegramDeliveryEngineTestCase(SimpleTestCase):
+    """
+    Test case for TelegramDeliveryEngine against a local fake Telegram API server.
+
+    Methods:
+        setUp(): Starts the fake server and creates the engine.
+        test_send_batch(): Tests that all messages of a batch are delivered in order.
+        test_send_batch_errors(): Tests that rejected and rate limited messages are reported per message.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by starting the fake server and creating the engine.
+        """
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeTelegramHandler)
+        self.server.received = []
+        self.server.lock = threading.Lock()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.engine = TelegramDeliveryEngine(
+            token='test_token',
+            base_url=f'http://127.0.0.1:{self.server.server_port}',
+            max_workers=4,
+            global_rate=1000,
+            chat_rate=1000
+        )
+        self.addCleanup(self.engine.close)
+
+    def test_send_batch(self):
+        """
+        Test that all messages of a batch are delivered and the results keep the order of the messages.
+        """
+
+        results = self.engine.send_batch([(chat_id, f'text {chat_id}') for chat_id in range(1, 11)])
+
+        self.assertEqual([result.chat_id for result in results], list(range(1, 11)))
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(len(self.server.received), 10)
+        self.assertEqual(self.server.received[0][0], '/bottest_token/sendMessage')
+
+    def test_send_batch_errors(self):
+        """
+        Test that rejected messages are reported and rate limited messages are retried.
+        """
+
+        rejected, rate_limited = self.engine.send_batch([(0, 'text'), (429, 'text')])
+
+        self.assertFalse(rejected.ok)
+        self.assertEqual(rejected.status_code, 400)
+        self.assertEqual(rejected.attempts, 1)
+        self.assertEqual(rejected.error, 'Bad Request: chat not found')
+
+        self.assertTrue(rate_limited.ok)
+        self.assertEqual(rate_limited.attempts, 2)
+
+
+class SharedRateLimiterTestCase(SimpleTestCase):
+    """
+    Test case for the rate limiter shared by the workers through the cache.
+
+    Methods:
+        setUp(): Clears the cache.
+        test_reserve_shared(): Tests that limiters with the same key space their operations by the interval.
+        test_engines_share_limits(): Tests that separate delivery engines wait for the limits of each other.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by clearing the cache.
+        """
+
+        cache.clear()
+
+    def test_reserve_shared(self):
+        """
+        Test that limiters with the same key, as in separate workers, space their operations by the interval, while
+        limiters with other keys are not limited by them.
+        """
+
+        first, second = SharedRateLimiter('test_limiter', rate=10), SharedRateLimiter('test_limiter', rate=10)
+        delays = [first.reserve(), second.reserve(), first.reserve(), second.reserve()]
+
+        for previous, delay in zip(delays, delays[1:]):
+            self.assertAlmostEqual(delay - previous, 0.1, delta=0.02)
+        self.assertLess(SharedRateLimiter('other_limiter', rate=10).reserve(), 0.1)
+
+    def test_engines_share_limits(self):
+        """
+        Test that a delivery engine waits for the slots of the chat taken by another engine.
+        """
+
+        with TelegramDeliveryEngine(token='test', chat_rate=10) as engine:
+            delay = engine._get_chat_limiter(1).reserve()
+
+        with TelegramDeliveryEngine(token='test', chat_rate=10) as engine:
+            self.assertAlmostEqual(engine._get_chat_limiter(1).reserve(), delay + 0.1, delta=0.02)
+            self.assertLess(engine._get_chat_limiter(2).reserve(), 0.1)
+
+
+class AsyncTelegramDeliveryEngineTestCase(SimpleTestCase):
+    """
+    Test case for AsyncTelegramDeliveryEngine against a local fake Telegram API server.
+
+    Methods:
+        setUp(): Starts the fake server.
+        test_send_batch(): Tests that all messages of a batch are delivered in order.
+        test_send_batch_errors(): Tests that rejected and rate limited messages are reported per message.
+        test_rate_limit_slots_taken_by_senders(): Tests that only the messages being sent take rate limit slots.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by starting the fake server.
+        """
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeTelegramHandler)
+        self.server.received = []
+        self.server.lock = threading.Lock()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def get_engine(self):
+        """
+        Returns an engine sending to the fake server, created within the event loop of the test.
+        """
+
+        return AsyncTelegramDeliveryEngine(
+            token='test_token',
+            base_url=f'http://127.0.0.1:{self.server.server_port}',
+            max_workers=4,
+            global_rate=1000,
+            chat_rate=1000
+        )
+
+    async def test_send_batch(self):
+        """
+        Test that all messages of a batch are delivered and the results keep the order of the messages.
+        """
+
+        async with self.get_engine() as engine:
+            results = await engine.send_batch([(chat_id, f'text {chat_id}') for chat_id in range(1, 11)])
+
+        self.assertEqual([result.chat_id for result in results], list(range(1, 11)))
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(len(self.server.received), 10)
+        self.assertEqual(self.server.received[0][0], '/bottest_token/sendMessage')
+
+    async def test_send_batch_errors(self):
+        """
+        Test that rejected messages are reported and rate limited messages are retried.
+        """
+
+        async with self.get_engine() as engine:
+            rejected, rate_limited = await engine.send_batch([(0, 'text'), (429, 'text')])
+
+        self.assertFalse(rejected.ok)
+        self.assertEqual(rejected.status_code, 400)
+        self.assertEqual(rejected.attempts, 1)
+        self.assertEqual(rejected.error, 'Bad Request: chat not found')
+
+        self.assertTrue(rate_limited.ok)
+        self.assertEqual(rate_limited.attempts, 2)
+
+    async def test_rate_limit_slots_taken_by_senders(self):
+        """
+        Test that the rate limit slots are taken by the messages holding the semaphore only, so the messages waiting
+        for it do not send at once later.
+        """
+
+        async with self.get_engine() as engine:
+            free_senders = []
+
+            async def aacquire():
+                free_senders.append(engine._semaphore._value)
+
+            with mock.patch.object(SharedRateLimiter, 'aacquire', side_effect=aacquire):
+                results = await engine.send_batch([(chat_id, 'text') for chat_id in range(1, 11)])
+
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(len(free_senders), 20)
+        self.assertTrue(all(free < engine.max_workers for free in free_senders))
+
+
+class NotificationShardTestCase(TestCase):
+    """
+    Test case for splitting the notification sweep into shards.
+
+    Methods:
+        setUp(): Creates a user with a telegram id, habits with a due reminder and a habit without it.
+        test_get_notification_shards(): Tests that due habits are split into ranges of habit ids.
+        test_send_notification_shard(): Tests that a shard adds only the reminders of its range to the outbox.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a user, habits with a due reminder and a habit without it.
+        """
+
+        self.now = datetime.datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc)
+        self.user = User.objects.create(
+            email='test_shard@gmail.com',
+            password='test',
+            telegram_id=123456789
+        )
+
+        self.habits = [
+            Habit.objects.create(
+                user=self.user,
+                place='test_place',
+                execution_time=execution_time,
+                action='run_in_gym',
+                time_to_complete=100
+            )
+            for execution_time in ('11:10:00', '11:20:00', '18:00:00', '11:30:00', '11:40:00', '11:50:00')
+        ]
+        self.due_habits = [habit for habit in self.habits if habit.execution_time != '18:00:00']
+        for habit in self.due_habits:
+            Habit.objects.filter(pk=habit.pk).update(
+                next_fire_at=self.now - datetime.timedelta(minutes=habit.pk % 60)
+            )
+
+    def test_get_notification_shards(self):
+        """
+        Test that due habits are split into ranges of habit ids of at most the given size.
+        """
+
+        self.assertEqual(
+            get_notification_shards(self.now, 2),
+            [
+                (self.due_habits[0].pk, self.due_habits[1].pk),
+                (self.due_habits[2].pk, self.due_habits[3].pk),
+                (self.due_habits[4].pk, self.due_habits[4].pk),
+            ]
+        )
+
+    def test_send_notification_shard(self):
+        """
+        Test that a shard adds only the reminders of the due habits within its range to the outbox, reschedules the
+        habits and adds nothing when repeated.
+        """
+
+        added = task_send_notification_shard(self.now.isoformat(), self.habits[1].pk, self.habits[3].pk)
+
+        self.assertEqual(added, 2)
+        notifications = list(NotificationOutbox.objects.order_by('habit_id'))
+        self.assertEqual([notification.habit_id for notification in notifications],
+                         [self.habits[1].pk, self.habits[3].pk])
+        self.assertEqual(notifications[0].chat_id, 123456789)
+        self.assertEqual(notifications[0].status, NotificationOutbox.STATUS_PENDING)
+        self.assertIn('11:20:00', notifications[0].text)
+
+        self.habits[1].refresh_from_db()
+        self.habits[4].refresh_from_db()
+        self.assertEqual(notifications[0].fire_at, self.now - datetime.timedelta(minutes=self.habits[1].pk % 60))
+        self.assertGreater(self.habits[1].next_fire_at, self.now)
+        self.assertLessEqual(self.habits[4].next_fire_at, self.now)
+
+        self.assertEqual(
+            task_send_notification_shard(self.now.isoformat(), self.habits[1].pk, self.habits[3].pk), 0
+        )
+        self.assertEqual(NotificationOutbox.objects.count(), 2)
+
+
+class NotificationTemplateTestCase(SimpleTestCase):
+    """
+    Test case for rendering the texts of reminders from compiled templates.
+
+    Methods:
+        test_render_notifications(): Tests rendering reminders in the language of every user.
+        test_unknown_field(): Tests that templates with unknown fields are rejected.
+    """
+
+    def test_render_notifications(self):
+        """
+        Test that every language has a template and reminders are rendered in the language of the user.
+        """
+
+        self.assertEqual(set(NOTIFICATION_TEMPLATES), {language for language, _ in LANGUAGE_CHOICES})
+
+        row = {
+            'pk': 1, 'next_fire_at': None, 'execution_time': datetime.time(11, 20), 'frequency': 1,
+            'action': 'run_in_gym', 'place': 'test_place', 'time_to_complete': 100, 'award__reward': None,
+            'user__telegram_id': 1, 'user__language': 'ru',
+        }
+
+        self.assertEqual(
+            render_notifications([row, {**row, 'award__reward': 'eat_a_cake'}, {**row, 'user__language': 'en'}]),
+            [
+                'Вам напоминание:\n Вы хотели run_in_gym в 11:20:00\n Где? Это прекрасное место - test_place\n'
+                ' Не ленитесь, это займет всего 100 секунд',
+                'Вам напоминание:\n Вы хотели run_in_gym в 11:20:00\n Где? Это прекрасное место - test_place\n'
+                ' Не ленитесь, это займет всего 100 секунд\nВ награду вы можете eat_a_cake',
+                'A reminder for you:\n You wanted to run_in_gym at 11:20:00\n Where? At a wonderful place - '
+                "test_place\n Don't be lazy, it only takes 100 seconds",
+            ]
+        )
+
+    def test_unknown_field(self):
+        """
+        Test that a template with a field missing from the habit rows is rejected when it is created.
+        """
+
+        with self.assertRaises(ValueError):
+            NotificationTemplate('{action} {user__email}', '')
+
+
+class NotificationOutboxTestCase(TestCase):
+    """
+    Test case for sending the reminders of the notification outbox.
+
+    Methods:
+        setUp(): Creates a habit and pending reminders about it.
+        test_send_outbox_notifications(): Tests that reminders are marked sent, retrying or failed.
+        test_send_outbox_notifications_retry(): Tests that reminders are retried until the attempts are exhausted.
+        test_send_outbox_notifications_claimed(): Tests that reminders are sent outside of transactions and that
+            claimed reminders are sent again only after their claim expires.
+        test_prune_outbox_notifications(): Tests that only reminders delivered before the retention are deleted.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a habit and pending reminders about it to chats 1, 429 and 0.
+        """
+
+        self.user = User.objects.create(email='test_outbox@gmail.com', telegram_id=1)
+        self.habit = Habit.objects.create(
+            user=self.user,
+            place='test_place',
+            execution_time='11:00:00',
+            action='run_in_gym',
+            time_to_complete=100
+        )
+        now = timezone.now()
+        self.notifications = NotificationOutbox.objects.bulk_create(
+            NotificationOutbox(
+                habit=self.habit,
+                fire_at=now - datetime.timedelta(days=i),
+                chat_id=chat_id,
+                text='text',
+                next_attempt_at=now
+            )
+            for i, chat_id in enumerate((1, 429, 0))
+        )
+
+    @staticmethod
+    def send_batch(messages):
+        """
+        Accepts the messages to chat 1, rate limits the ones to chat 429 and rejects all others.
+        """
+
+        return [
+            DeliveryResult(chat_id, True, 200) if chat_id == 1 else
+            DeliveryResult(chat_id, False, 429, error='Too Many Requests') if chat_id == 429 else
+            DeliveryResult(chat_id, False, 400, error='Bad Request: chat not found')
+            for chat_id, _ in messages
+        ]
+
+    def get_statuses(self):
+        return dict(NotificationOutbox.objects.values_list('chat_id', 'status'))
+
+    def test_send_outbox_notifications(self):
+        """
+        Test that delivered reminders are marked sent, rate limited ones retrying and rejected ones failed, and that
+        reminders waiting for a retry are not sent again before their time.
+        """
+
+        with mock.patch.object(TelegramDeliveryEngine, 'send_batch', side_effect=self.send_batch) as send_batch:
+            self.assertEqual(task_send_outbox_notifications(batch_size=2), 1)
+            self.assertEqual(send_batch.call_count, 2)
+
+            self.assertEqual(task_send_outbox_notifications(), 0)
+            self.assertEqual(send_batch.call_count, 2)
+
+        self.assertEqual(self.get_statuses(), {
+            1: NotificationOutbox.STATUS_SENT,
+            429: NotificationOutbox.STATUS_RETRYING,
+            0: NotificationOutbox.STATUS_FAILED,
+        })
+
+        retrying = NotificationOutbox.objects.get(chat_id=429)
+        self.assertEqual(retrying.attempts, 1)
+        self.assertEqual(retrying.last_error, 'Too Many Requests')
+        self.assertGreater(retrying.next_attempt_at, timezone.now())
+        self.assertIsNotNone(NotificationOutbox.objects.get(chat_id=1).sent_at)
+
+    def test_send_outbox_notifications_retry(self):
+        """
+        Test that a reminder failing with a transient error is retried until `NOTIFICATION_MAX_ATTEMPTS` attempts.
+        """
+
+        with mock.patch.object(TelegramDeliveryEngine, 'send_batch', side_effect=self.send_batch):
+            for _ in range(settings.NOTIFICATION_MAX_ATTEMPTS):
+                NotificationOutbox.objects.filter(chat_id=429).update(next_attempt_at=timezone.now())
+                task_send_outbox_notifications()
+
+        notification = NotificationOutbox.objects.get(chat_id=429)
+        self.assertEqual(notification.status, NotificationOutbox.STATUS_FAILED)
+        self.assertEqual(notification.attempts, settings.NOTIFICATION_MAX_ATTEMPTS)
+
+    def test_send_outbox_notifications_claimed(self):
+        """
+        Test that reminders are sent outside of any transaction of the task, and that reminders claimed by a crashed
+        task are sent again only once their claim has expired.
+        """
+
+        atomic_blocks = len(connection.atomic_blocks)
+
+        def send_batch(messages):
+            self.assertEqual(len(connection.atomic_blocks), atomic_blocks)
+            return self.send_batch(messages)
+
+        with mock.patch.object(TelegramDeliveryEngine, 'send_batch', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                task_send_outbox_notifications()
+
+        self.assertEqual(set(self.get_statuses().values()), {NotificationOutbox.STATUS_SENDING})
+
+        with mock.patch.object(TelegramDeliveryEngine, 'send_batch', side_effect=send_batch) as mock_send_batch:
+            self.assertEqual(task_send_outbox_notifications(), 0)
+            self.assertEqual(mock_send_batch.call_count, 0)
+
+            NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(task_send_outbox_notifications(), 1)
+            self.assertEqual(mock_send_batch.call_count, 1)
+
+        self.assertEqual(NotificationOutbox.objects.get(chat_id=1).attempts, 2)
+        self.assertEqual(self.get_statuses()[1], NotificationOutbox.STATUS_SENT)
+
+    def test_prune_outbox_notifications(self):
+        """
+        Test that only the reminders delivered before `NOTIFICATION_OUTBOX_RETENTION` are deleted.
+        """
+
+        now = timezone.now()
+        NotificationOutbox.objects.filter(chat_id=1).update(
+            status=NotificationOutbox.STATUS_SENT, sent_at=now - settings.NOTIFICATION_OUTBOX_RETENTION * 2
+        )
+        NotificationOutbox.objects.filter(chat_id=429).update(status=NotificationOutbox.STATUS_SENT, sent_at=now)
+        NotificationOutbox.objects.filter(chat_id=0).update(status=NotificationOutbox.STATUS_FAILED)
+
+        self.assertEqual(task_prune_outbox_notifications(batch_size=1), 1)
+        self.assertEqual(set(self.get_statuses()), {429, 0})
+
+
+class HabitCompletionTestCase(APITestCase):
+    """
+    Test case for the completions of habits and their incremental stats.
+
+    Methods:
+        setUp(): Creates two users with a habit each and authenticates the first one.
+        test_complete(): Tests marking a habit as done through the API.
+        test_streaks_and_adherence(): Tests the streaks and the adherence kept by the incremental updates.
+        test_out_of_order_completion(): Tests that an earlier completion makes the stats be recomputed.
+        test_bulk_complete(): Tests marking a list of habits as done in a fixed number of queries.
+        test_stats(): Tests retrieving the stats of a habit through the API.
+        test_stats_frequency_zero(): Tests that a habit with a frequency of 0 is counted as a daily habit.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating two users with a habit each and authenticating the first one.
+        """
+
+        self.user = User.objects.create(email='test_completion@gmail.com', password='test')
+        self.other_user = User.objects.create(email='test_other_completion@gmail.com', password='test')
+        self.habits = [
+            Habit.objects.create(
+                user=user, place='test_place', execution_time='08:00:00', action=f'run_{i}', frequency=1,
+                time_to_complete=100
+            )
+            for i, user in enumerate((self.user, self.user, self.other_user))
+        ]
+        self.today = get_local_today(self.user)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_complete(self):
+        """
+        Test that a habit is marked as done today by default, only once a day and not in the future.
+        """
+
+        for _ in range(2):
+            response = self.client.post(f'/habit/complete/{self.habits[0].pk}/')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(
+                response.json(),
+                {
+                    'habit': self.habits[0].pk, 'total_completions': 1, 'current_streak': 1, 'longest_streak': 1,
+                    'last_completed_on': self.today.isoformat(), 'adherence_7d': 0.1429, 'adherence_30d': 0.0333,
+                }
+            )
+        self.assertEqual(HabitCompletion.objects.filter(habit=self.habits[0]).count(), 1)
+
+        response = self.client.post(
+            f'/habit/complete/{self.habits[0].pk}/',
+            {'completed_on': (self.today + datetime.timedelta(days=1)).isoformat()}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(f'/habit/complete/{self.habits[2].pk}/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_streaks_and_adherence(self):
+        """
+        Test the streaks and the adherence kept by the incremental updates of the stats.
+        """
+
+        habit = self.habits[0]
+        for days_ago in (9, 8, 7, 5, 4, 3, 2, 1):
+            stats = record_completions([(habit, self.today - datetime.timedelta(days=days_ago))])[0]
+
+        self.assertEqual(stats.total_completions, 8)
+        self.assertEqual(stats.longest_streak, 5)
+        self.assertEqual(stats.get_current_streak(self.today, habit.frequency), 5)
+        self.assertEqual(stats.get_current_streak(self.today + datetime.timedelta(days=2), habit.frequency), 0)
+        self.assertEqual(stats.get_adherence(self.today, 7, habit.frequency), round(5 / 7, 4))
+        self.assertEqual(stats.get_adherence(self.today, 30, habit.frequency), round(8 / 30, 4))
+
+        # Every other day is enough for a habit done every two days
+        self.assertEqual(stats.get_adherence(self.today, 7, 2), 1.0)
+
+        stats.refresh_from_db()
+        expected = compute_habit_stats(habit, HabitCompletion.objects.values_list('completed_on', flat=True))
+        for field in ('total_completions', 'current_streak', 'longest_streak', 'last_completed_on', 'history'):
+            self.assertEqual(getattr(stats, field), getattr(expected, field))
+
+    def test_out_of_order_completion(self):
+        """
+        Test that a completion earlier than the last one makes the stats of the habit be recomputed.
+        """
+
+        habit = self.habits[0]
+        record_completions([(habit, self.today - datetime.timedelta(days=3)), (habit, self.today)])
+        stats = record_completions([(habit, self.today - datetime.timedelta(days=1))])[0]
+        self.assertEqual((stats.current_streak, stats.longest_streak), (2, 2))
+
+        stats = record_completions([(habit, self.today - datetime.timedelta(days=2))])[0]
+        self.assertEqual((stats.total_completions, stats.current_streak, stats.longest_streak), (4, 4, 4))
+        self.assertEqual(stats.get_adherence(self.today, 7, habit.frequency), round(4 / 7, 4))
+
+    def test_bulk_complete(self):
+        """
+        Test that a list of habits is marked as done in a fixed number of queries, only if all items are valid.
+        """
+
+        data = [
+            {'habit': self.habits[0].pk, 'completed_on': (self.today - datetime.timedelta(days=days_ago)).isoformat()}
+            for days_ago in range(10)
+        ] + [{'habit': self.habits[1].pk}]
+
+        # Habits, stats creation, stats lock, recorded days, completions, stats update and the savepoints
+        with self.assertNumQueries(8):
+            response = self.client.post('/habit/bulk/complete/', data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(stats['habit'], stats['total_completions'], stats['current_streak']) for stats in response.json()],
+            [(self.habits[0].pk, 10, 10), (self.habits[1].pk, 1, 1)]
+        )
+
+        response = self.client.post(
+            '/habit/bulk/complete/', data=[{'habit': self.habits[1].pk}, {'habit': self.habits[2].pk}], format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()[0], {})
+        self.assertIn('habit', response.json()[1])
+
+    def test_stats(self):
+        """
+        Test that the stats of a habit are retrieved in a single query, and are empty before the first completion.
+        """
+
+        response = self.client.get(f'/habit/stats/{self.habits[1].pk}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['total_completions'], 0)
+        self.assertEqual(response.json()['adherence_7d'], 0.0)
+
+        record_completions([(self.habits[0], self.today)])
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/habit/stats/{self.habits[0].pk}/')
+        self.assertEqual(response.json()['current_streak'], 1)
+        self.assertTrue(HabitStats.objects.filter(pk=self.habits[0].pk).exists())
+
+        response = self.client.get(f'/habit/stats/{self.habits[2].pk}/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_stats_frequency_zero(self):
+        """
+        Test that the completions and the stats of a habit with a frequency of 0 are counted as for a daily habit.
+        """
+
+        Habit.objects.filter(pk=self.habits[0].pk).update(frequency=0)
+
+        yesterday = (self.today - datetime.timedelta(days=1)).isoformat()
+        response = self.client.post(f'/habit/complete/{self.habits[0].pk}/', {'completed_on': yesterday})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(f'/habit/complete/{self.habits[0].pk}/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(f'/habit/stats/{self.habits[0].pk}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = response.json()
+        self.assertEqual((stats['current_streak'], stats['longest_streak']), (2, 2))
+        self.assertEqual(stats['adherence_7d'], round(2 / 7, 4))
+
+
+class HabitAnalyticsTestCase(APITestCase):
+    """
+    Test case for the habit analytics of the superusers.
+
+    Methods:
+        setUp(): Creates habits with completions and authenticates a superuser.
+        test_analytics(): Tests the analytics counted in a fixed number of queries and cached.
+        test_empty_analytics(): Tests the analytics of no habits.
+        test_analytics_permission(): Tests that only superusers get the analytics.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating habits with completions and authenticating a superuser.
+        """
+
+        cache.clear()
+        self.user = User.objects.create(email='test_analytics@gmail.com', password='test')
+        self.superuser = User.objects.create(email='test_analytics_admin@gmail.com', is_superuser=True)
+        award = Award.objects.create(user=self.user, reward='test_award')
+
+        habits = [
+            Habit.objects.create(
+                user=self.user, place='test_place', execution_time=execution_time, action=f'action_{i}',
+                frequency=frequency, time_to_complete=time_to_complete, is_pleasant=i == 0,
+                award=award if i == 1 else None, is_published=i < 2
+            )
+            for i, (execution_time, frequency, time_to_complete) in enumerate((
+                ('08:00:00', 1, 30), ('08:30:00', 1, 60), ('21:00:00', 2, 60), ('23:15:00', 7, 120),
+            ))
+        ]
+
+        # January 1, 2024 is a Monday
+        monday = datetime.date(2024, 1, 1)
+        record_completions([(habits[1], monday), (habits[1], monday + datetime.timedelta(days=1)),
+                            (habits[2], monday)])
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.superuser)
+
+    def test_analytics(self):
+        """
+        Test that the analytics are counted in a fixed number of queries and cached.
+        """
+
+        with self.assertNumQueries(6):
+            response = self.client.get('/habit/analytics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        analytics = response.json()
+        self.assertEqual(analytics['habits'], 4)
+        self.assertEqual(
+            analytics['shares'],
+            {'pleasant': 0.25, 'useful': 0.75, 'with_award': 0.25, 'with_related_habit': 0.0, 'published': 0.5}
+        )
+        self.assertEqual(analytics['execution_hours']['counts'][8], 2)
+        self.assertEqual(analytics['execution_hours']['counts'][23], 1)
+        self.assertEqual(analytics['execution_hours']['peak_hour'], 8)
+        self.assertEqual(
+            analytics['frequency'],
+            {
+                'histogram': [{'value': 1, 'count': 2}, {'value': 2, 'count': 1}, {'value': 7, 'count': 1}],
+                'mean': 2.75, 'median': 1, 'p90': 7,
+            }
+        )
+        self.assertEqual(
+            analytics['time_to_complete']['histogram'],
+            [
+                {'from': 30, 'to': 40, 'count': 1}, {'from': 60, 'to': 70, 'count': 2},
+                {'from': 120, 'to': 130, 'count': 1},
+            ]
+        )
+        self.assertEqual(analytics['time_to_complete']['median'], 60)
+        self.assertEqual(
+            analytics['completions'],
+            {
+                'total': 3, 'per_weekday': [2, 1, 0, 0, 0, 0, 0], 'habits_done': 2, 'mean_longest_streak': 1.5,
+                'max_longest_streak': 2,
+            }
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/habit/analytics/').json(), analytics)
+
+    def test_empty_analytics(self):
+        """
+        Test that the analytics of no habits have zero counts and no means or percentiles.
+        """
+
+        analytics = build_habit_analytics({
+            'totals': {'total': 0, 'pleasant': 0, 'with_award': 0, 'with_related_habit': 0, 'published': 0},
+            'hours': [], 'frequency': [], 'time_to_complete': [], 'weekdays': [],
+            'streaks': {'habits_done': 0, 'mean_longest_streak': None, 'max_longest_streak': None},
+        })
+
+        self.assertEqual(analytics['shares']['pleasant'], 0.0)
+        self.assertEqual(analytics['execution_hours'], {'counts': [0] * 24, 'peak_hour': None})
+        self.assertEqual(analytics['frequency'], {'histogram': [], 'mean': None, 'median': None, 'p90': None})
+        self.assertEqual(analytics['time_to_complete']['histogram'], [])
+        self.assertEqual(analytics['completions']['mean_longest_streak'], None)
+
+    def test_analytics_permission(self):
+        """
+        Test that the analytics are forbidden to users who are not superusers.
+        """
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/habit/analytics/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class HabitCalendarTestCase(APITestCase):
+    """
+    Test case for the calendar of the upcoming occurrences of habits.
+
+    Methods:
+        setUp(): Creates a user in the Europe/Minsk timezone with two habits.
+        test_project_occurrences(): Tests the projection of periodic events within a range of days.
+        test_calendar_json(): Tests the calendar as JSON.
+        test_calendar_ics(): Tests the calendar as a streamed iCalendar feed.
+        test_calendar_ics_dst(): Tests the UTC starts of the events over a DST change.
+        test_calendar_range(): Tests the validation of the range of the calendar.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a user in the Europe/Minsk timezone with two habits.
+        """
+
+        self.user = User.objects.create(email='test_calendar@gmail.com', password='test', timezone='Europe/Minsk')
+        self.habits = [
+            Habit.objects.create(
+                user=self.user, place='home; gym', execution_time=execution_time, action=action, frequency=frequency,
+                time_to_complete=60
+            )
+            for execution_time, action, frequency in (
+                ('08:00:00', 'run, then stretch ' + 'very ' * 20 + 'well', 1), ('07:30:00', 'read', 3)
+            )
+        ]
+        # The next occurrences are at 08:00 on January 2 and at 07:30 on January 3, 2024 in Minsk (UTC+3)
+        Habit.objects.filter(pk=self.habits[0].pk).update(
+            next_fire_at=datetime.datetime(2024, 1, 2, 4, 0, tzinfo=timezone.utc)
+        )
+        Habit.objects.filter(pk=self.habits[1].pk).update(
+            next_fire_at=datetime.datetime(2024, 1, 3, 3, 30, tzinfo=timezone.utc)
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_project_occurrences(self):
+        """
+        Test that the occurrences start at the anchor day at the earliest and repeat every `frequency` days.
+        """
+
+        events, dates = project_occurrences(
+            np.array(['2024-01-01', '2024-01-05', '2024-02-01'], dtype='datetime64[D]'),
+            np.array([2, 3, 1]),
+            datetime.date(2024, 1, 4),
+            datetime.date(2024, 1, 10)
+        )
+
+        self.assertEqual(events.tolist(), [0, 0, 0, 1, 1])
+        self.assertEqual(
+            [str(date) for date in dates], ['2024-01-05', '2024-01-07', '2024-01-09', '2024-01-05', '2024-01-08']
+        )
+
+    def test_calendar_json(self):
+        """
+        Test that the calendar lists the local days of the occurrences of every habit in a single query.
+        """
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/habit/calendar/', {'start': '2024-01-01', 'end': '2024-01-09'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        calendar = response.json()
+        self.assertEqual(calendar['timezone'], 'Europe/Minsk')
+        self.assertEqual(
+            [(habit['habit'], habit['execution_time'], habit['dates']) for habit in calendar['habits']],
+            [
+                (self.habits[0].pk, '08:00:00', [f'2024-01-0{day}' for day in range(2, 10)]),
+                (self.habits[1].pk, '07:30:00', ['2024-01-03', '2024-01-06', '2024-01-09']),
+            ]
+        )
+
+    def test_calendar_ics(self):
+        """
+        Test that the calendar is streamed as an iCalendar feed with the events ordered by their start.
+        """
+
+        response = self.client.get(
+            '/habit/calendar/', {'start': '2024-01-03', 'end': '2024-01-03', 'file_format': 'ics'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+
+        feed = b''.join(response.streaming_content).decode()
+        self.assertTrue(feed.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(feed.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(feed.count('BEGIN:VEVENT'), 2)
+        self.assertLess(
+            feed.index('DTSTART:20240103T043000Z'),
+            feed.index('DTSTART:20240103T050000Z')
+        )
+        self.assertNotIn('TZID', feed)
+        self.assertIn(f'UID:{self.habits[1].pk}-20240103@app_of_habits', feed)
+        self.assertIn('LOCATION:home\\; gym', feed)
+        self.assertIn('SUMMARY:run\\, then stretch', feed)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in feed.split('\r\n')))
+        self.assertEqual(fold_ics_line('SUMMARY:' + 'a' * 80), 'SUMMARY:' + 'a' * 67 + '\r\n ' + 'a' * 13 + '\r\n')
+        self.assertEqual(escape_ics_text('run\r\nread\rwalk\n'), 'run\\nread\\nwalk\\n')
+
+    def test_calendar_ics_dst(self):
+        """
+        Test that the events keep their local execution time over a DST change while their starts are given in UTC.
+        """
+
+        # The next reminders set up are kept, as they would be rescheduled by a save of the timezone
+        User.objects.filter(pk=self.user.pk).update(timezone='Europe/Berlin')
+        self.user.timezone = 'Europe/Berlin'
+
+        response = self.client.get(
+            '/habit/calendar/', {'start': '2024-03-30', 'end': '2024-03-31', 'file_format': 'ics'}
+        )
+        feed = b''.join(response.streaming_content).decode()
+        self.assertEqual(
+            [line for line in feed.split('\r\n') if line.startswith('DTSTART')],
+            ['DTSTART:20240330T063000Z', 'DTSTART:20240330T070000Z', 'DTSTART:20240331T060000Z']
+        )
+
+        # Berlin moves from UTC+1 to UTC+2 at 02:00 on March 31, 2024
+        starts = local_to_utc(
+            np.array(['2024-03-30', '2024-03-31', '2024-03-31', '2024-04-01'], dtype='datetime64[D]'),
+            np.array([3600, 3600, 10800, 3600]),
+            zoneinfo.ZoneInfo('Europe/Berlin')
+        )
+        self.assertEqual(
+            np.datetime_as_string(starts).tolist(),
+            ['2024-03-30T00:00:00', '2024-03-31T00:00:00', '2024-03-31T01:00:00', '2024-03-31T23:00:00']
+        )
+
+    def test_calendar_range(self):
+        """
+        Test that invalid, empty and too long ranges and unknown formats are rejected.
+        """
+
+        for params in (
+            {'start': '2024-13-01'},
+            {'start': '2024-01-10', 'end': '2024-01-09'},
+            {'start': '2024-01-01', 'end': '2025-01-01'},
+            {'file_format': 'pdf'},
+        ):
+            response = self.client.get('/habit/calendar/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get('/habit/calendar/', {'start': '2024-01-01'})
+        self.assertEqual(len(response.json()['habits'][0]['dates']), settings.CALENDAR_DEFAULT_DAYS - 1)
+
+
+class RelatedHabitGraphTestCase(APITestCase):
+    """
+    Test case for the chains of related habits.
+
+    Methods:
+        setUp(): Creates a chain of four pleasant habits linked by related habits.
+        test_chain_depth(): Tests that chains longer than `RELATED_HABIT_MAX_DEPTH` links are rejected.
+        test_cycle(): Tests that links making a cycle are rejected.
+        test_graph(): Tests retrieving the habits linked to a habit in a fixed number of queries.
+        test_graph_other_users(): Tests that the habits of other users are hidden from the graph but from superusers.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a chain of four pleasant habits linked by related habits.
+        """
+
+        self.user = User.objects.create(email='test_graph@gmail.com', password='test')
+        self.habits = []
+        for i in range(4):
+            self.habits.append(Habit.objects.create(
+                user=self.user, place='test_place', execution_time='08:00:00', action=f'habit_{i}', frequency=1,
+                time_to_complete=60, is_pleasant=True
+            ))
+        for habit, related_habit in zip(self.habits, self.habits[1:]):
+            Habit.objects.filter(pk=habit.pk).update(related_habit=related_habit)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_chain_depth(self):
+        """
+        Test that a habit cannot start a chain of related habits longer than `RELATED_HABIT_MAX_DEPTH` links.
+        """
+
+        data = {
+            'place': 'test_place', 'execution_time': '09:00:00', 'action': 'new_habit', 'frequency': 1,
+            'time_to_complete': 60, 'award': None, 'is_pleasant': False
+        }
+
+        with mock.patch('config.settings.RELATED_HABIT_MAX_DEPTH', 3):
+            response = self.client.post('/habit/create/', {**data, 'related_habit': self.habits[0].pk}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('related_habit', response.json())
+
+            response = self.client.post('/habit/create/', {**data, 'related_habit': self.habits[1].pk}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+            # Linking the end of the chain to another habit makes the chain longer as well
+            pleasant_habit = Habit.objects.create(
+                user=self.user, place='test_place', execution_time='10:00:00', action='pleasant_habit', frequency=1,
+                time_to_complete=60, is_pleasant=True
+            )
+            response = self.client.patch(
+                f'/habit/update/{self.habits[3].pk}/', {'related_habit': pleasant_habit.pk}, format='json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(
+                response.json(), {'related_habit': ['A chain of related habits cannot be longer than 3 links.']}
+            )
+
+    def test_cycle(self):
+        """
+        Test that a habit cannot be related to itself or to a habit whose chain leads back to it.
+        """
+
+        response = self.client.patch(f'/habit/update/{self.habits[3].pk}/', {'related_habit': self.habits[1].pk})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(), {'related_habit': ['The chain of the related habit leads back to the habit.']}
+        )
+
+        self.assertEqual(
+            check_related_habit(self.habits[0].pk, self.habits[0].pk), 'A habit cannot be related to itself.'
+        )
+        with self.assertNumQueries(1):
+            self.assertIsNone(check_related_habit(self.habits[2].pk, self.habits[3].pk))
+
+    def test_graph(self):
+        """
+        Test that the chain followed from a habit and the habits linked to it are read with a single query.
+        """
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/habit/graph/{self.habits[1].pk}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        graph = response.json()
+        self.assertEqual(graph['related_habit'], self.habits[2].pk)
+        self.assertEqual(
+            [(habit['depth'], habit['pk']) for habit in graph['chain']],
+            [(1, self.habits[2].pk), (2, self.habits[3].pk)]
+        )
+        self.assertEqual([(habit['depth'], habit['pk']) for habit in graph['linked']], [(1, self.habits[0].pk)])
+
+        # A cyclic chain written around the validation is walked up to the limit only
+        Habit.objects.filter(pk=self.habits[3].pk).update(related_habit=self.habits[0])
+        with mock.patch('config.settings.RELATED_HABIT_MAX_DEPTH', 6):
+            graph = self.client.get(f'/habit/graph/{self.habits[0].pk}/').json()
+        self.assertEqual(
+            [habit['pk'] for habit in graph['chain']], [habit.pk for habit in self.habits[1:] + self.habits[:3]]
+        )
+
+    def test_graph_other_users(self):
+        """
+        Test that the walks of the graph stop at the habits of other users, unless a superuser asks for it.
+        """
+
+        other_user = User.objects.create(email='test_graph_other@gmail.com', password='test')
+        other_habits = [
+            Habit.objects.create(
+                user=other_user, place='test_place', execution_time='08:00:00', action=f'secret_{i}', frequency=1,
+                time_to_complete=60, is_pleasant=True
+            )
+            for i in range(2)
+        ]
+        # The other user's habits lead to the chain of the user, whose last habit leads to the other user's habit
+        Habit.objects.filter(pk=other_habits[0].pk).update(related_habit=self.habits[0])
+        Habit.objects.filter(pk=self.habits[3].pk).update(related_habit=other_habits[1])
+
+        graph = self.client.get(f'/habit/graph/{self.habits[1].pk}/').json()
+        self.assertEqual([habit['pk'] for habit in graph['chain']], [self.habits[2].pk, self.habits[3].pk])
+        self.assertEqual([habit['pk'] for habit in graph['linked']], [self.habits[0].pk])
+        self.assertNotIn('secret', str(graph))
+
+        superuser = User.objects.create(email='test_graph_admin@gmail.com', is_superuser=True)
+        self.client.force_authenticate(user=superuser)
+        graph = self.client.get(f'/habit/graph/{self.habits[1].pk}/').json()
+        self.assertEqual(
+            [habit['pk'] for habit in graph['chain']], [self.habits[2].pk, self.habits[3].pk, other_habits[1].pk]
+        )
+        self.assertEqual([habit['pk'] for habit in graph['linked']], [self.habits[0].pk, other_habits[0].pk])
+
+
+class HabitPublicSearchTestCase(APITestCase):
+    """
+    Test case for searching the public habit feed.
+
+    Methods:
+        setUp(): Creates a test user with published habits and a private habit and clears the cache.
+        test_search_text(): Tests that the search text is matched against the action and the place.
+        test_search_filters(): Tests the filters of the execution time, the frequency and the pleasantness.
+        test_search_cursor(): Tests that the results are paginated with a cursor without a count query.
+        test_search_invalid_params(): Tests that invalid query parameters and cursors are rejected.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a test user with published habits and a private habit and clearing
+        the cache.
+        """
+
+        cache.clear()
+        self.user = User.objects.create(
+            email='test_search@gmail.com',
+            password='test'
+        )
+
+        for action, place, execution_time, frequency, is_pleasant, is_published in (
+            ('run_in_park', 'park', '07:00:00', 1, False, True),
+            ('read_a_book', 'home', '21:00:00', 2, False, True),
+            ('drink_tea', 'park_cafe', '22:00:00', 1, True, True),
+            ('run_at_night', 'street', '23:00:00', 1, False, False),
+        ):
+            Habit.objects.create(
+                user=self.user,
+                place=place,
+                execution_time=execution_time,
+                action=action,
+                frequency=frequency,
+                time_to_complete=100,
+                is_pleasant=is_pleasant,
+                is_published=is_published
+            )
+
+    def search(self, **params):
+        """
+        Returns the actions of the habits found by the search.
+        """
+
+        response = self.client.get('/habit/list/public/search/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [habit['action'] for habit in response.json()['results']]
+
+    def test_search_text(self):
+        """
+        Test that the search text is matched against the action and the place of the published habits only.
+        """
+
+        self.assertEqual(self.search(q='run'), ['run_in_park'])
+        self.assertEqual(self.search(q='PARK'), ['run_in_park', 'drink_tea'])
+        self.assertEqual(self.search(q='gym'), [])
+        self.assertEqual(self.search(), ['run_in_park', 'read_a_book', 'drink_tea'])
+
+    def test_search_filters(self):
+        """
+        Test the filters of the execution time, the frequency and the pleasantness.
+        """
+
+        self.assertEqual(self.search(time_from='20:00', time_to='21:30'), ['read_a_book'])
+        self.assertEqual(self.search(frequency=1), ['run_in_park', 'drink_tea'])
+        self.assertEqual(self.search(is_pleasant='true'), ['drink_tea'])
+        self.assertEqual(self.search(q='park', is_pleasant='false'), ['run_in_park'])
+
+    def test_search_cursor(self):
+        """
+        Test that the results are paginated with a cursor, one query per page, and the cached pages are reused.
+        """
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/habit/list/public/search/', {'q': 'park', 'page_size': 1})
+        self.assertEqual([habit['action'] for habit in response.json()['results']], ['run_in_park'])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(response.json()['next'])
+        self.assertEqual([habit['action'] for habit in response.json()['results']], ['drink_tea'])
+        self.assertIsNone(response.json()['next'])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search(q='park', page_size=1), ['run_in_park'])
+
+    def test_search_invalid_params(self):
+        """
+        Test that invalid query parameters and cursors are rejected.
+        """
+
+        response = self.client.get('/habit/list/public/search/', {'frequency': 8, 'time_from': 'morning'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.json()), {'frequency', 'time_from'})
+
+        response = self.client.get('/habit/list/public/search/', {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get('/habit/list/public/search/', {'q': 'park', 'cursor': 'WzFd'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'The full-text and trigram search needs PostgreSQL')
+class HabitPublicPostgresSearchTestCase(APITestCase):
+    """
+    Test case for the full-text and trigram search of the public habit feed on PostgreSQL.
+
+    Methods:
+        setUp(): Creates a test user with published habits and clears the cache.
+        test_search_misspelled(): Tests that misspelled words are found by trigram similarity.
+        test_search_cursor_pages(): Tests that results with equal ranks are paged without repeats or gaps.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a test user with published habits and clearing the cache.
+        """
+
+        cache.clear()
+        self.user = User.objects.create(
+            email='test_postgres_search@gmail.com',
+            password='test'
+        )
+
+        self.habits = Habit.objects.bulk_create(
+            Habit(
+                user=self.user,
+                place=place,
+                execution_time='07:00:00',
+                action=action,
+                time_to_complete=100,
+                is_published=True
+            )
+            for action, place in [('morning exercise', 'home'), ('read a book', 'library')]
+            + [('evening run', 'city park')] * 7
+        )
+
+    def search(self, **params):
+        """
+        Returns the pks of the habits on all pages of the search, following the cursors.
+        """
+
+        pks, url = [], '/habit/list/public/search/'
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pks += [habit['pk'] for habit in response.json()['results']]
+            self.assertLessEqual(len(pks), len(self.habits), 'The cursor repeats results')
+            url, params = response.json()['next'], None
+        return pks
+
+    def test_search_misspelled(self):
+        """
+        Test that misspelled words are found by the trigram word similarity and ranked above weaker matches.
+        """
+
+        self.assertEqual(self.search(q='exercize'), [self.habits[0].pk])
+        self.assertEqual(self.search(q='librari'), [self.habits[1].pk])
+        self.assertEqual(self.search(q='exercise')[0], self.habits[0].pk)
+
+    def test_search_cursor_pages(self):
+        """
+        Test that results with equal ranks are paged by primary key without repeats or gaps.
+        """
+
+        run_pks = [habit.pk for habit in self.habits[2:]]
+        self.assertEqual(self.search(q='park run', page_size=2), run_pks)
+        self.assertEqual(self.search(q='park', page_size=3), run_pks)
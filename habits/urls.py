@@ -1,8 +1,16 @@
 from django.urls import path
 
 from habits.api_views.habit import HabitListAPIView, HabitCreateAPIView, HabitUpdateAPIView, HabitDestroyAPIView, \
-    HabitPublicListAPIView
-from habits.api_views.award import AwardListAPIView, AwardCreateAPIView, AwardUpdateAPIView, AwardDestroyAPIView
+    HabitPublicListAPIView, HabitBulkCreateAPIView, HabitBulkUpdateAPIView, HabitBulkDestroyAPIView, \
+    HabitImportAPIView, HabitGraphAPIView, HabitPublicSearchAPIView
+from habits.api_views.award import AwardListAPIView, AwardCreateAPIView, AwardUpdateAPIView, AwardDestroyAPIView, \
+    AwardBulkCreateAPIView, AwardBulkUpdateAPIView, AwardBulkDestroyAPIView
+from habits.api_views.async_views import AsyncHabitListAPIView, AsyncHabitDetailAPIView, AsyncAwardListAPIView, \
+    AsyncAwardDetailAPIView
+from habits.api_views.analytics import HabitAnalyticsAPIView
+from habits.api_views.calendar import HabitCalendarAPIView
+from habits.api_views.completion import HabitCompleteAPIView, HabitBulkCompleteAPIView, HabitStatsAPIView
+from habits.api_views.export import HabitExportAPIView, AwardExportAPIView
 from habits.apps import HabitsConfig
 
 app_name = HabitsConfig.name
@@ -10,12 +18,32 @@ app_name = HabitsConfig.name
 urlpatterns = [
     path('habit/list/', HabitListAPIView.as_view(), name='habit-list'),
     path('habit/list/public/', HabitPublicListAPIView.as_view(), name='habit-public-list'),
+    path('habit/list/public/search/', HabitPublicSearchAPIView.as_view(), name='habit-public-search'),
     path('habit/create/', HabitCreateAPIView.as_view(), name='habit-create'),
     path('habit/update/<int:pk>/', HabitUpdateAPIView.as_view(), name='habit-update'),
     path('habit/delete/<int:pk>/', HabitDestroyAPIView.as_view(), name='habit-delete'),
+    path('habit/bulk/create/', HabitBulkCreateAPIView.as_view(), name='habit-bulk-create'),
+    path('habit/bulk/update/', HabitBulkUpdateAPIView.as_view(), name='habit-bulk-update'),
+    path('habit/bulk/delete/', HabitBulkDestroyAPIView.as_view(), name='habit-bulk-delete'),
+    path('habit/export/', HabitExportAPIView.as_view(), name='habit-export'),
+    path('habit/import/', HabitImportAPIView.as_view(), name='habit-import'),
+    path('habit/complete/<int:pk>/', HabitCompleteAPIView.as_view(), name='habit-complete'),
+    path('habit/bulk/complete/', HabitBulkCompleteAPIView.as_view(), name='habit-bulk-complete'),
+    path('habit/stats/<int:pk>/', HabitStatsAPIView.as_view(), name='habit-stats'),
+    path('habit/analytics/', HabitAnalyticsAPIView.as_view(), name='habit-analytics'),
+    path('habit/graph/<int:pk>/', HabitGraphAPIView.as_view(), name='habit-graph'),
+    path('habit/calendar/', HabitCalendarAPIView.as_view(), name='habit-calendar'),
+    path('habit/async/list/', AsyncHabitListAPIView.as_view(), name='habit-async-list'),
+    path('habit/async/<int:pk>/', AsyncHabitDetailAPIView.as_view(), name='habit-async-detail'),
 
     path('award/list/', AwardListAPIView.as_view(), name='award-list'),
     path('award/create/', AwardCreateAPIView.as_view(), name='award-create'),
     path('award/update/<int:pk>/', AwardUpdateAPIView.as_view(), name='award-update'),
     path('award/delete/<int:pk>/', AwardDestroyAPIView.as_view(), name='award-delete'),
+    path('award/bulk/create/', AwardBulkCreateAPIView.as_view(), name='award-bulk-create'),
+    path('award/bulk/update/', AwardBulkUpdateAPIView.as_view(), name='award-bulk-update'),
+    path('award/bulk/delete/', AwardBulkDestroyAPIView.as_view(), name='award-bulk-delete'),
+    path('award/export/', AwardExportAPIView.as_view(), name='award-export'),
+    path('award/async/list/', AsyncAwardListAPIView.as_view(), name='award-async-list'),
+    path('award/async/<int:pk>/', AsyncAwardDetailAPIView.as_view(), name='award-async-detail'),
 ]
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from habits.graph import check_related_habit
+
 
 def validator_exclude_award_and_related_habit(value):
     """
@@ -51,6 +53,37 @@ def validator_related_habit(value):
         raise serializers.ValidationError('A related habit should have the hallmark of a pleasant habit')
 
 
+class RelatedHabitChainValidator:
+    """
+    Validator to ensure that a related habit makes no cycle and no chain longer than `RELATED_HABIT_MAX_DEPTH`.
+
+    The whole chain is checked with a single recursive query by `habits.graph.check_related_habit`. The related habit
+    is given as a habit, or by its id by `HabitImportSerializer`.
+    """
+
+    requires_context = True
+
+    def __call__(self, value, serializer):
+        """
+        Args:
+            value (dict): Dictionary containing data to be validated.
+            serializer (Serializer): The serializer of the habit, with the updated habit as `instance`.
+
+        Raises:
+            serializers.ValidationError: Raised if the related habit makes a cycle or a too long chain.
+        """
+
+        related_habit = value.get('related_habit')
+        if related_habit is None:
+            return
+
+        related_habit_id = related_habit if isinstance(related_habit, int) else related_habit.pk
+        instance = getattr(serializer, 'instance', None)
+        error = check_related_habit(instance.pk if instance is not None else None, related_habit_id)
+        if error:
+            raise serializers.ValidationError({'related_habit': [error]})
+
+
 def validator_not_award_or_related_habit(value):
     """
     Validator to ensure that pleasant habits cannot have an award or related habit.
@@ -0,0 +1,53 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from users.cache import get_cached_user
+from users.models import User
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication resolving the user of the token through a cache instead of a query on every request.
+
+    Users are cached by id in a short-lived in-process LRU and in the default cache, the entries are invalidated
+    when a user is saved or deleted, so password changes, deactivation and deletion take effect immediately.
+
+    Methods:
+        get_user(validated_token): Returns the user of the validated token.
+    """
+
+    def get_user(self, validated_token):
+        """
+        Returns the user of the validated token, applying the same checks as `JWTAuthentication`.
+
+        Args:
+            validated_token (Token): The validated token.
+
+        Returns:
+            User: The user of the token.
+
+        Raises:
+            InvalidToken: If the token does not contain the user id.
+            AuthenticationFailed: If the user does not exist, is inactive or has changed the password.
+        """
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = get_cached_user(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != user.password_fingerprint:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -0,0 +1,141 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from config import settings
+from users.models import User
+
+USER_CACHE_KEY = 'users:auth:v2:{}'
+
+# The fields of the users resolved by the authentication, the ones needed by the authentication, the permissions
+# and the views, in the order of the model as `Model.from_db` expects. Other fields, like the password, are loaded
+# from the database when they are accessed.
+AUTH_USER_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in ('id', 'email', 'is_active', 'is_staff', 'is_superuser', 'telegram_id', 'language', 'timezone')
+)
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache whose entries expire after a timeout.
+
+    Attributes:
+        max_size (int): The maximum number of entries, the least recently used entry is evicted when exceeded.
+        timeout (float): The number of seconds an entry is kept.
+
+    Methods:
+        get(key): Returns the value of a key, None if it is missing or expired.
+        set(key, value): Stores the value of a key.
+        delete(key): Removes a key.
+        clear(): Removes all keys.
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        """
+        Returns the value of a key, None if it is missing or expired.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """
+        Stores the value of a key, evicting the least recently used entry if the cache is full.
+        """
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Removes a key.
+        """
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Removes all keys.
+        """
+
+        with self._lock:
+            self._entries.clear()
+
+
+local_user_cache = LRUCache(settings.AUTH_USER_LOCAL_CACHE_SIZE, settings.AUTH_USER_LOCAL_CACHE_TIMEOUT)
+
+
+def get_cached_user(user_id):
+    """
+    Returns the user with the given id, looking it up in the in-process cache, the shared cache and the database.
+
+    Only the values of the `AUTH_USER_FIELDS` are cached, so every call returns a new user instance and changes
+    made to it during a request do not leak into other requests. The password is not cached; when
+    `CHECK_REVOKE_TOKEN` is enabled, only the fingerprint of the password compared with the tokens is cached and
+    set as `password_fingerprint`.
+
+    Args:
+        user_id: The value of the `USER_ID_FIELD` of the user.
+
+    Returns:
+        User: The user, with the other fields deferred.
+
+    Raises:
+        User.DoesNotExist: If there is no user with the given id.
+    """
+
+    key = USER_CACHE_KEY.format(user_id)
+
+    entry = local_user_cache.get(key)
+    if entry is None:
+        entry = cache.get(key)
+        if entry is None:
+            users = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            if api_settings.CHECK_REVOKE_TOKEN:
+                *values, password = users.values_list(*AUTH_USER_FIELDS, 'password').get()
+                entry = (tuple(values), get_md5_hash_password(password))
+            else:
+                entry = (users.values_list(*AUTH_USER_FIELDS).get(), None)
+            cache.set(key, entry, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+        local_user_cache.set(key, entry)
+
+    values, password_fingerprint = entry
+    user = User.from_db('default', AUTH_USER_FIELDS, values)
+    if password_fingerprint is not None:
+        user.password_fingerprint = password_fingerprint
+    return user
+
+
+def invalidate_cached_user(user_id):
+    """
+    Removes the user with the given id from the in-process and the shared cache.
+
+    Other processes keep their in-process entries until they expire after `AUTH_USER_LOCAL_CACHE_TIMEOUT`.
+    """
+
+    key = USER_CACHE_KEY.format(user_id)
+    local_user_cache.delete(key)
+    cache.delete(key)
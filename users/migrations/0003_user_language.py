@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_telegram_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='language',
+            field=models.CharField(choices=[('ru', 'русский'), ('en', 'английский')], default='ru', max_length=2, verbose_name='язык уведомлений'),
+        ),
+    ]
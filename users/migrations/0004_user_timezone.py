@@ -0,0 +1,19 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:06
+
+from django.db import migrations, models
+import users.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_language'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='timezone',
+            field=models.CharField(default='UTC', max_length=64, validators=[users.validators.validator_timezone], verbose_name='часовой пояс'),
+        ),
+    ]
@@ -2,6 +2,12 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 from habits.models import NULLABLE
+from users.validators import validator_timezone
+
+LANGUAGE_CHOICES = (
+    ('ru', 'русский'),
+    ('en', 'английский'),
+)
 
 
 class User(AbstractUser):
@@ -14,6 +20,8 @@ class User(AbstractUser):
         phone (CharField): Phone number of the user.
         country (CharField): Country of the user.
         telegram_id (PositiveIntegerField): Telegram ID for notifications.
+        language (CharField): Language of the notifications.
+        timezone (CharField): IANA timezone the execution times of the habits of the user are given in.
         USERNAME_FIELD (str): Field used for authentication, set to 'email'.
         REQUIRED_FIELDS (list): List of required fields for user creation.
     """
@@ -26,6 +34,9 @@ class User(AbstractUser):
     phone = models.CharField(max_length=40, verbose_name='телефон', **NULLABLE)
     country = models.CharField(max_length=50, verbose_name='страна', **NULLABLE)
     telegram_id = models.PositiveIntegerField(default=None, verbose_name='telegram id для уведомлений', **NULLABLE)
+    language = models.CharField(max_length=2, choices=LANGUAGE_CHOICES, default='ru', verbose_name='язык уведомлений')
+    timezone = models.CharField(max_length=64, default='UTC', validators=[validator_timezone],
+                                verbose_name='часовой пояс')
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
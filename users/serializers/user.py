@@ -43,4 +43,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
-        fields = ('pk', 'password', 'email', 'first_name', 'last_name', 'phone', 'country', 'avatar', 'telegram_id',)
+        fields = (
+            'pk', 'password', 'email', 'first_name', 'last_name', 'phone', 'country', 'avatar', 'telegram_id',
+            'language', 'timezone',
+        )
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from users.cache import invalidate_cached_user
+from users.models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user_on_change(sender, instance, **kwargs):
+    """
+    Invalidates the cached user when the user is saved or deleted, and once more after the transaction commits,
+    so a request running concurrently with the transaction cannot keep the old values cached.
+    """
+
+    user_id = getattr(instance, api_settings.USER_ID_FIELD)
+    invalidate_cached_user(user_id)
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
@@ -1,6 +1,13 @@
+from unittest import mock
+
+from django.core.cache import cache
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
 
+from users.cache import AUTH_USER_FIELDS, USER_CACHE_KEY, local_user_cache
 from users.models import User
 
 
@@ -19,6 +26,7 @@ class UserTestCase(APITestCase):
         test_user_create(): Tests the creation of a User object through the API.
         test_user_list(): Tests the retrieval of a list of User objects through the API.
         test_user_update(): Tests the update of a User object through the API.
+        test_user_timezone(): Tests that only known timezones are accepted through the API.
         test_user_delete(): Tests the deletion of a User object through the API.
     """
 
@@ -80,7 +88,9 @@ class UserTestCase(APITestCase):
                     "phone": None,
                     "country": None,
                     "avatar": None,
-                    "telegram_id": self.user.telegram_id
+                    "telegram_id": self.user.telegram_id,
+                    "language": "ru",
+                    "timezone": "UTC"
                 }
             ]
         )
@@ -109,6 +119,20 @@ class UserTestCase(APITestCase):
             status.HTTP_200_OK
         )
 
+    def test_user_timezone(self):
+        """
+        Test that the timezone of a user is updated through the API and unknown timezones are rejected.
+        """
+
+        response = self.client.patch(f'/users/users/{self.user.pk}/', data={'timezone': 'Mars/Olympus'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('timezone', response.json())
+
+        response = self.client.patch(f'/users/users/{self.user.pk}/', data={'timezone': 'Europe/Minsk'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.timezone, 'Europe/Minsk')
+
     def test_user_delete(self):
         """
         Test the deletion of a User object through the API.
@@ -122,3 +146,117 @@ class UserTestCase(APITestCase):
             response.status_code,
             status.HTTP_204_NO_CONTENT
         )
+
+
+class CachedJWTAuthenticationTestCase(APITestCase):
+    """
+    Test case for resolving the users of JWT tokens through the cache.
+
+    Methods:
+        setUp(): Creates a test user, clears the caches and authenticates the client with an access token.
+        test_user_cached(): Tests that repeated requests resolve the user without a query.
+        test_user_updated(): Tests that a saved user is resolved with the new values.
+        test_user_deactivated(): Tests that a deactivated user is rejected.
+        test_user_deleted(): Tests that a deleted user is rejected.
+        test_password_not_cached(): Tests that the password is not kept in the cache.
+        test_password_changed(): Tests that tokens issued before a password change are revoked if configured.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a test user, clearing the caches and authenticating the client.
+        """
+
+        cache.clear()
+        local_user_cache.clear()
+
+        self.user = User.objects.create(email='test_jwt@gmail.com', telegram_id=123456789)
+        self.user.set_password('password123')
+        self.user.save()
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.url = f'/users/users/{self.user.pk}/'
+
+    def test_user_cached(self):
+        """
+        Test that repeated requests resolve the user without a query, from the shared cache as well.
+        """
+
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        local_user_cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    def test_user_updated(self):
+        """
+        Test that the changes of a saved user, like a password change, are visible to the next request.
+        """
+
+        self.client.get(self.url)
+
+        self.user.set_password('password456')
+        self.user.telegram_id = 987654321
+        self.user.save()
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.json()['telegram_id'], 987654321)
+        self.assertTrue(response.wsgi_request.user.check_password('password456'))
+
+    def test_user_deactivated(self):
+        """
+        Test that a deactivated user is rejected although the user was cached.
+        """
+
+        self.client.get(self.url)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_deleted(self):
+        """
+        Test that a deleted user is rejected although the user was cached.
+        """
+
+        self.client.get(self.url)
+        self.user.delete()
+
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_not_cached(self):
+        """
+        Test that only the fields needed by the authentication are cached, without the password.
+        """
+
+        self.client.get(self.url)
+
+        values, password_fingerprint = cache.get(USER_CACHE_KEY.format(self.user.pk))
+        self.assertEqual(len(values), len(AUTH_USER_FIELDS))
+        self.assertNotIn(self.user.password, values)
+        self.assertIsNone(password_fingerprint)
+
+    def test_password_changed(self):
+        """
+        Test that with `CHECK_REVOKE_TOKEN` the fingerprint of the password is cached instead of the password and
+        the tokens issued before a password change are rejected.
+        """
+
+        with mock.patch.object(api_settings, 'CHECK_REVOKE_TOKEN', True):
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+            values, password_fingerprint = cache.get(USER_CACHE_KEY.format(self.user.pk))
+            self.assertNotIn(self.user.password, values)
+            self.assertEqual(password_fingerprint, get_md5_hash_password(self.user.password))
+
+            self.user.set_password('password456')
+            self.user.save()
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
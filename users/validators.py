@@ -0,0 +1,28 @@
+import zoneinfo
+from functools import lru_cache
+
+from django.core.exceptions import ValidationError
+
+
+@lru_cache(maxsize=1)
+def get_available_timezones():
+    """
+    Returns the names of the IANA timezones, read once from the timezone database.
+    """
+
+    return frozenset(zoneinfo.available_timezones())
+
+
+def validator_timezone(value):
+    """
+    Validator for the timezone of a user.
+
+    Args:
+        value (str): The IANA name of the timezone, e.g. 'Europe/Minsk'.
+
+    Raises:
+        ValidationError: Raised if the timezone is unknown.
+    """
+
+    if value not in get_available_timezones():
+        raise ValidationError(f'Unknown timezone {value}')